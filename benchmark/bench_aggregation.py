@@ -0,0 +1,92 @@
+"""
+Period averages of synthetic multi-year daily data: the former per-uid, per-window loop of
+`DataProcessing.get_average_datas` versus `PeriodAggregator` over all the uids at once.
+
+The frames of `compact_dtypes=True` skip the parsing of the times and numbers sent as strings.
+The loop is timed on the first `loop_uids` uids only and extrapolated, it is too slow for thousands of uids.
+
+Usage:
+    python benchmark/bench_aggregation.py [n_uids] [years] [loop_uids]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from soxai_data import PeriodAggregator  # noqa: E402
+from soxai_data.get_ave_data import DataProcessing  # noqa: E402
+from soxai_data.schema import SCHEMAS  # noqa: E402
+
+
+def daily_rows(n_uids, years, seed=0):
+    """
+    Daily rows shaped like getDailyData(convert_to_local_time=False), starting on a random day per uid.
+    """
+    rng = np.random.default_rng(seed)
+    days = int(years * 365)
+    first = pd.Timestamp('2022-03-01T15:00:00Z')
+    frames = []
+    for i in range(n_uids):
+        offset = int(rng.integers(0, 180))
+        times = pd.date_range(first + pd.Timedelta(days=offset), periods=days - offset, freq='D')
+        n = len(times)
+        frames.append(pd.DataFrame({
+            '_start': '2022-03-01T00:00:00Z', '_stop': '2026-01-01T00:00:00Z',
+            '_time': times.strftime('%Y-%m-%dT%H:%M:%SZ'), '_measurement': 'SX_Daily_Prod', 'uid': f'uid{i:05d}',
+            'month': times.month, 'year': times.year, 'year_week': times.strftime('%Y-%W'), 'workday': times.dayofweek < 5,
+            'utc_offset_mins': 540, 'heart_rate': rng.normal(65, 8, n), 'steps': rng.integers(0, 20000, n),
+            'sleep_score': rng.integers(0, 100, n).astype(str),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def loop_average_datas(processing, df, current_date, period_cnt):
+    # the former implementation of DataProcessing.get_average_datas
+    df_result = pd.DataFrame()
+    df_sorted = processing.sort_df_by_time(df)
+    date_period_list = processing.make_list_period_date(df_sorted, current_date, period_cnt)
+    df_period_list = processing.get_period_date_df(df_sorted, date_period_list)
+    for list_cnt in range(len(date_period_list)):
+        df_group = df_period_list[list_cnt]
+        if len(df_group) < 1:
+            break
+        df_processed = processing.get_average_data(df_group, date_period_list[list_cnt])
+        df_result = pd.concat([df_result, df_processed]).reset_index(drop=True)
+    return df_result
+
+
+def main():
+    n_uids = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    years = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    loop_uids = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    current_date = pd.Timestamp('2025-03-01', tz='UTC')
+    df = daily_rows(n_uids, years)
+    print(f'{n_uids} uids, {len(df)} rows')
+
+    processing = DataProcessing()
+    subset = df[df['uid'].isin(df['uid'].unique()[:loop_uids])]
+    start = time.perf_counter()
+    expected = pd.concat([loop_average_datas(processing, df_uid, current_date, 30)
+                          for _, df_uid in subset.groupby('uid')], ignore_index=True)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = PeriodAggregator(period_days=30).aggregate(df, current_date)
+    vectorised = time.perf_counter() - start
+
+    compact = SCHEMAS['SX_Daily_Prod'].apply(df)
+    start = time.perf_counter()
+    PeriodAggregator(period_days=30).aggregate(compact, current_date)
+    typed = time.perf_counter() - start
+
+    same = result[result['uid'].isin(expected['uid'])].reset_index(drop=True)
+    pd.testing.assert_frame_equal(same, expected, check_dtype=False)
+    print(f'loop:       {loop:8.3f}s for {loop_uids} uids, {loop * n_uids / loop_uids:8.1f}s extrapolated')
+    print(f'vectorised: {vectorised:8.3f}s for {n_uids} uids ({len(result)} periods)')
+    print(f'vectorised: {typed:8.3f}s for {n_uids} uids with compact_dtypes')
+
+
+if __name__ == '__main__':
+    main()
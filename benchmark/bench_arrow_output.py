@@ -0,0 +1,56 @@
+"""
+Time and peak Python memory of getDetailData and getRawData returning NumPy-backed DataFrames (output='pandas'),
+DataFrames with Arrow-backed dtypes (output='arrow') and pyarrow Tables (output='table').
+
+The stub server runs without latency so that the time measures the client. The peak memory is measured by
+tracemalloc in a separate run, since tracing slows the allocations down.
+
+Usage:
+    python benchmark/bench_arrow_output.py [uids] [days]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soxai_data import DataLoader  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def measure(call):
+    call()
+    start = time.perf_counter()
+    result = call()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, len(result)
+
+
+def main():
+    uids = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    uid_list = [f'uid{i:04d}' for i in range(uids)]
+    start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    server = StubServer(detail_step=300, raw_rows=200000, raw_pages=2).start()
+    print(f'getDetailData: {uids} uids over {days} days every 5 minutes; getRawData: 2 pages of 200000 samples, '
+          'as JSON and as Arrow IPC')
+    print(f'{"method":>16} {"output":>7} {"rows":>9} {"time":>9} {"peak":>10}')
+    for output in ('pandas', 'arrow', 'table'):
+        with DataLoader(token='dummy', base_url=server.url, output=output) as loader:
+            for name, call in (
+                    ('getDetailData', lambda: loader.getDetailData(start_date=start_date, uid_list=uid_list, timeout=120)),
+                    ('getRawData', lambda: loader.getRawData('uid0', timeout=120, prefetch=False)),
+                    ('getRawData/arrow', lambda: loader.getRawData('uid0', timeout=120, prefetch=False,
+                                                                   format='arrow'))):
+                elapsed, peak, rows = measure(call)
+                print(f'{name:>16} {output:>7} {rows:>9} {elapsed:8.3f}s {peak / 1024 ** 2:7.1f}MiB')
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Requests/sec of per-call `httpx.get` versus the pooled DataLoader client.
+
+Usage:
+    python benchmark/bench_connection_pool.py [n_requests]
+"""
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soxai_data import DataLoader  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def bench_per_call(url, headers, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        httpx.get(url, headers=headers).json()
+    return n / (time.perf_counter() - start)
+
+
+def bench_pooled(loader, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        loader.getMyInfo()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = StubServer().start()
+    try:
+        with DataLoader(token='dummy', base_url=server.url) as loader:
+            per_call = bench_per_call(loader.url + 'myOrg', loader.headers, n)
+            pooled = bench_pooled(loader, n)
+    finally:
+        server.stop()
+    print(f'requests        : {n}')
+    print(f'per-call httpx  : {per_call:10.1f} req/s')
+    print(f'pooled client   : {pooled:10.1f} req/s')
+    print(f'speedup         : {pooled / per_call:10.2f}x')
+
+
+if __name__ == '__main__':
+    main()
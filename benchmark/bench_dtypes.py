@@ -0,0 +1,45 @@
+"""
+Memory and time of getDetailData with the inferred dtypes and with `compact_dtypes=True`,
+and of the field averaging of `get_ave_data.DataProcessing.get_average_data` on the result.
+
+Usage:
+    python benchmark/bench_dtypes.py [n_uids] [days]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader  # noqa: E402
+from soxai_data.get_ave_data import DataProcessing  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    n_uids = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    server = StubServer(detail_step=60).start()
+    uid_list = [f'uid{i:04d}' for i in range(n_uids)]
+    start_date = pd.Timestamp.now(tz='UTC').floor('D') - pd.Timedelta(days=days)
+    print(f'{"dtypes":>9} {"rows":>8} {"memory":>10} {"fetch":>8} {"average":>8}')
+    try:
+        for compact_dtypes in (False, True):
+            with DataLoader(token='dummy', base_url=server.url, compact_dtypes=compact_dtypes) as loader:
+                start = time.perf_counter()
+                df = loader.getDetailData(start_date=start_date, uid_list=uid_list, convert_to_local_time=False)
+                fetch = time.perf_counter() - start
+            memory = df.memory_usage(deep=True).sum() / 1024 ** 2
+            processing = DataProcessing()
+            start = time.perf_counter()
+            for _, df_uid in df.groupby('uid', observed=True):
+                processing.get_average_data(df_uid, {'start_date': None, 'end_date': None})
+            average = time.perf_counter() - start
+            label = 'compact' if compact_dtypes else 'inferred'
+            print(f'{label:>9} {len(df):8d} {memory:8.1f}MiB {fetch:7.3f}s {average:7.3f}s')
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Writing and reading back detail data as CSV versus PartitionedDataset (Parquet and Feather): time,
+size on disk, and a pruned read of one uid, two columns and three days.
+
+Usage:
+    python benchmark/bench_export.py [n_uids] [days]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader, PartitionedDataset  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def disk_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    n_uids = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    server = StubServer(detail_step=60).start()
+    uid_list = [f'uid{i:04d}' for i in range(n_uids)]
+    start_date = pd.Timestamp.now(tz='UTC').floor('D') - pd.Timedelta(days=days)
+    with DataLoader(token='dummy', base_url=server.url) as loader:
+        df = loader.getDetailData(start_date=start_date, uid_list=uid_list, convert_to_local_time=False)
+    server.stop()
+    first, last = start_date + pd.Timedelta(days=10), start_date + pd.Timedelta(days=13)
+    print(f'{len(df)} rows')
+    print(f'{"format":>8} {"write":>8} {"read":>8} {"pruned read":>12} {"size":>10}')
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'detail.csv')
+        _, write = timed(lambda: df.to_csv(path, index=False))
+        _, read = timed(lambda: pd.read_csv(path))
+
+        def pruned_csv():
+            csv = pd.read_csv(path, usecols=['uid', '_time', 'heart_rate'])
+            times = pd.to_datetime(csv['_time'], utc=True)
+            return csv[(csv['uid'] == uid_list[0]) & (times >= first) & (times < last)]
+
+        _, pruned = timed(pruned_csv)
+        print(f'{"csv":>8} {write:7.3f}s {read:7.3f}s {pruned:11.3f}s {disk_size(path) / 1024 ** 2:7.1f}MiB')
+
+        for format in ('parquet', 'feather'):
+            path = os.path.join(directory, format)
+            dataset = PartitionedDataset(path, format=format, partition='day')
+            _, write = timed(lambda: dataset.write(df))
+            _, read = timed(lambda: dataset.read())
+            _, pruned = timed(lambda: dataset.read(columns=['_time', 'heart_rate'], uid_list=uid_list[:1],
+                                                   start=first, end=last))
+            print(f'{format:>8} {write:7.3f}s {read:7.3f}s {pruned:11.3f}s {disk_size(path) / 1024 ** 2:7.1f}MiB')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Wall time of getDailyInfoV2 over many uids, serial versus concurrent fan-out.
+
+Usage:
+    python benchmark/bench_fan_out.py [n_uids] [latency_seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soxai_data import DataLoader  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    n_uids = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    uid_list = [f'uid{i}' for i in range(n_uids)]
+    server = StubServer(latency=latency).start()
+    try:
+        with DataLoader(token='dummy', base_url=server.url) as loader:
+            for max_workers in (1, 8, 32):
+                start = time.perf_counter()
+                df = loader.getDailyInfoV2('2026-01-01', '2026-01-07', uid_list=uid_list, max_workers=max_workers)
+                elapsed = time.perf_counter() - start
+                print(f'max_workers={max_workers:3d} : {elapsed:7.3f} s, {len(df)} rows')
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+getDetailData of every field versus a `fields` projection of two fields: time and response size.
+
+Usage:
+    python benchmark/bench_fields.py [n_uids] [days]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    n_uids = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    server = StubServer(detail_step=60).start()
+    uid_list = [f'uid{i:04d}' for i in range(n_uids)]
+    start_date = pd.Timestamp.now(tz='UTC').floor('D') - pd.Timedelta(days=days)
+    sizes = []
+
+    def count_bytes(response):
+        response.read()
+        sizes.append(len(response.content))
+
+    print(f'{"fields":>24} {"time":>8} {"response":>10} {"memory":>10} {"columns":>8}')
+    with DataLoader(token='dummy', base_url=server.url) as loader:
+        loader.client.event_hooks = {'response': [count_bytes]}
+        for fields in (None, ['heart_rate', 'steps']):
+            sizes.clear()
+            start = time.perf_counter()
+            df = loader.getDetailData(start_date=start_date, uid_list=uid_list, fields=fields)
+            elapsed = time.perf_counter() - start
+            print(f'{str(fields or "all"):>24} {elapsed:7.3f}s {sum(sizes) / 1024 ** 2:7.1f}MiB '
+                  f'{df.memory_usage(deep=True).sum() / 1024 ** 2:7.1f}MiB {len(df.columns):8d}')
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Bytes on the wire and decoding time of the RawData and DailyInfoV2 responses in each format
+(JSON, CSV, Arrow IPC), with and without gzip compression.
+
+The stub server runs without latency so that the time measures the client. The decode column is the time
+spent parsing the response bodies into DataFrames, from the request events of an EventRecorder.
+
+Usage:
+    python benchmark/bench_formats.py [raw_rows] [raw_pages]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soxai_data import DataLoader, EventRecorder  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    raw_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    raw_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    uid_list = [f'uid{i:04d}' for i in range(50)]
+    print(f'RawData: {raw_pages} pages of {raw_rows} samples; DailyInfoV2: {len(uid_list)} uids of 2000 rows')
+    print(f'{"method":>14} {"format":>7} {"gzip":>5} {"wire":>10} {"decode":>9} {"total":>9}')
+    for compress in (False, True):
+        server = StubServer(raw_rows=raw_rows, raw_pages=raw_pages, rows=2000, compress=compress).start()
+        recorder = EventRecorder()
+        with DataLoader(token='dummy', base_url=server.url, hooks=[recorder]) as loader:
+            for name, call in (
+                    ('getRawData', lambda format: loader.getRawData('uid0', format=format, prefetch=False)),
+                    ('getDailyInfoV2', lambda format: loader.getDailyInfoV2(uid_list=uid_list, format=format,
+                                                                            max_workers=1))):
+                for format in ('json', 'csv', 'arrow'):
+                    call(format)
+                    recorder.clear()
+                    start = time.perf_counter()
+                    call(format)
+                    elapsed = time.perf_counter() - start
+                    events = recorder.events()
+                    requests = events[events['kind'] == 'request']
+                    decode = requests[['phase_decode', 'phase_build']].sum().sum()
+                    print(f'{name:>14} {format:>7} {str(compress):>5} {requests["bytes"].sum() / 1024 ** 2:7.1f}MiB '
+                          f'{decode:8.3f}s {elapsed:8.3f}s')
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Import time of soxai_data measured with `python -X importtime`, and the heavy dependencies each import loads.
+
+Each statement runs in a fresh interpreter. Its time is the sum of the self times reported by -X importtime,
+minus those of an empty interpreter, the median of `--repeat` runs. The heavy dependencies are imported only
+when a method needs them, so importing the package or creating a DataLoader must not import pandas or numpy.
+
+With --check the script exits with status 1 when a statement imports a dependency it must not, or when one
+importing no heavy dependency takes longer than --max-ms, so that it can guard the lazy imports in CI.
+
+Usage:
+    python benchmark/bench_import.py [--repeat 5] [--check] [--max-ms 100]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('pandas', 'numpy', 'httpx', 'pyarrow', 'schedule')
+
+# the statements and the heavy dependencies they may import, None for the references that are not checked
+STATEMENTS = [
+    ('import soxai_data', ()),
+    ('from soxai_data import DataLoader', ()),
+    ('from soxai_data import AsyncDataLoader', ()),
+    ('import soxai_data.get_ave_data', ()),
+    ("from soxai_data import DataLoader; DataLoader(token='dummy').close()", ('httpx',)),
+    ('import pandas, httpx', None),
+]
+
+
+def run(statement):
+    # returns the milliseconds reported by -X importtime and the top-level packages imported
+    code = f'{statement}\nimport sys, json; print(json.dumps(sorted({{name.split(".")[0] for name in sys.modules}})))'
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True)
+    micros = 0
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            self_time = line.split(':', 1)[1].split('|')[0].strip()
+            if self_time.isdigit():
+                micros += int(self_time)
+    return micros / 1000, json.loads(process.stdout.splitlines()[-1])
+
+
+def measure(statement, repeat):
+    run(statement)  # compiles the modules changed since the last run
+    results = [run(statement) for _ in range(repeat)]
+    return statistics.median(ms for ms, _ in results), results[-1][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='the runs of each statement')
+    parser.add_argument('--check', action='store_true', help='exit with status 1 on a regression')
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='the time budget of the statements importing no heavy dependency')
+    args = parser.parse_args()
+
+    baseline, _ = measure('pass', args.repeat)
+    failures = []
+    print(f'{"statement":<72} {"time":>9}  heavy dependencies')
+    for statement, allowed in STATEMENTS:
+        ms, modules = measure(statement, args.repeat)
+        ms = max(0.0, ms - baseline)
+        heavy = [name for name in HEAVY if name in modules]
+        print(f'{statement:<72} {ms:7.1f}ms  {", ".join(heavy) or "-"}')
+        if allowed is None:
+            continue
+        unexpected = [name for name in heavy if name not in allowed]
+        if unexpected:
+            failures.append(f'{statement} imports {", ".join(unexpected)}')
+        if args.max_ms is not None and len(allowed) == 0 and ms > args.max_ms:
+            failures.append(f'{statement} takes {ms:.1f}ms, over {args.max_ms:.1f}ms')
+    for failure in failures:
+        print(f'REGRESSION: {failure}')
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+The overhead of the instrumentation hooks on many small detail queries, and the summary they give.
+
+Usage:
+    python benchmark/bench_instrumentation.py [n_calls]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader, EventRecorder  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    n_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    server = StubServer(detail_step=300).start()
+    start_date = pd.Timestamp.now(tz='UTC').floor('D') - pd.Timedelta(days=1)
+    recorder = EventRecorder()
+    for name, hooks in (('no hooks', None), ('EventRecorder', [recorder])):
+        with DataLoader(token='dummy', base_url=server.url, hooks=hooks) as loader:
+            start = time.perf_counter()
+            for i in range(n_calls):
+                loader.getDetailData(start_date=start_date, uid_list=[f'uid{i % 10}'])
+            elapsed = time.perf_counter() - start
+        print(f'{name:>14}: {elapsed / n_calls * 1000:7.3f} ms per call')
+    server.stop()
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(recorder.summary()[['count', 'mean', 'p50', 'p90', 'p99']].round(5))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Many users opening the same dashboard at once: concurrent identical getMyOrgUsers, getDailyData and
+getDailyInfoV2 calls from a thread pool, without and with a MemoryCache shared by the loaders.
+
+Usage:
+    python benchmark/bench_memo.py [n_users] [latency]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader, MemoryCache  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def dashboard(loader, uid_list, start, stop):
+    loader.getMyOrgUsers()
+    loader.getDailyData(start_date=start, end_date=stop, uid_list=uid_list)
+    loader.getDailyInfoV2(start_date=start.strftime('%Y-%m-%d'), end_date=stop.strftime('%Y-%m-%d'),
+                          uid_list=uid_list)
+
+
+def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    server = StubServer(latency=latency).start()
+    uid_list = [f'uid{i:04d}' for i in range(20)]
+    stop = pd.Timestamp.now(tz='UTC').floor('D')
+    start = stop - pd.Timedelta(days=90)
+    print(f'{n_users} concurrent dashboards, {latency * 1000:.0f}ms latency')
+    for name, memo in (('no memo', None), ('MemoryCache', MemoryCache())):
+        # one loader per web request, as a web service would do
+        loaders = [DataLoader(token='dummy', base_url=server.url, memo=memo) for _ in range(n_users)]
+        requests = server.request_count
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n_users) as executor:
+            list(executor.map(lambda loader: dashboard(loader, uid_list, start, stop), loaders))
+        elapsed = time.perf_counter() - started
+        counters = '' if memo is None else f', {memo.misses} misses {memo.coalesced} coalesced {memo.hits} hits'
+        print(f'{name:>12}: {elapsed:6.2f}s {server.request_count - requests:5d} requests{counters}')
+        for loader in loaders:
+            loader.close()
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
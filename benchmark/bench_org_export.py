@@ -0,0 +1,55 @@
+"""
+An org-wide daily export: a loop over the org users calling getDailyData for each uid and writing its rows,
+against exportOrgData fetching uid batches and time windows concurrently.
+
+Usage:
+    python benchmark/bench_org_export.py [n_users] [days] [latency]
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader, PartitionedDataset  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 730
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    server = StubServer(org_users=n_users, latency=latency).start()
+    stop = pd.Timestamp.now(tz='UTC').floor('D')
+    start = stop - pd.Timedelta(days=days)
+    directory = tempfile.mkdtemp()
+    print(f'{n_users} users, {days} days, {latency * 1000:.0f}ms latency')
+    try:
+        with DataLoader(token='dummy', base_url=server.url) as loader:
+            requests = server.request_count
+            started = time.perf_counter()
+            dataset = PartitionedDataset(os.path.join(directory, 'loop'))
+            rows = 0
+            for uid in loader.getMyOrgUsers()['uid']:
+                df = loader.getDailyData(start_date=start, end_date=stop, uid_list=[uid], convert_to_local_time=False)
+                rows += dataset.write(df)
+            elapsed = time.perf_counter() - started
+            print(f'{"per-uid loop":>14}: {elapsed:7.2f}s {server.request_count - requests:5d} requests '
+                  f'{rows / elapsed:9.0f} rows/s')
+
+            requests = server.request_count
+            with contextlib.redirect_stdout(io.StringIO()):
+                report = loader.exportOrgData(os.path.join(directory, 'export'), start_date=start, end_date=stop)
+            print(f'{"exportOrgData":>14}: {report.seconds:7.2f}s {server.request_count - requests:5d} requests '
+                  f'{report.rows_per_second:9.0f} rows/s')
+    finally:
+        server.stop()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Multi-uid queries against a server failing a share of the requests with a transient 503:
+without retries, with partial results (`return_result=True`) and with a `RetryPolicy`.
+
+Usage:
+    python benchmark/bench_retry.py [n_uids] [fail_rate] [latency]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader, RetryPolicy  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    n_uids = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    fail_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.02
+    server = StubServer(latency=latency, fail_rate=fail_rate).start()
+    uid_list = [f'uid{i:04d}' for i in range(n_uids)]
+    start_date = (pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=365)).strftime('%Y-%m-%d')
+    print(f'{n_uids} uids, {fail_rate:.0%} of the requests failing, {latency * 1000:.0f}ms latency')
+    print(f'{"mode":>28} {"time":>8} {"uids fetched":>13} {"requests":>9}')
+
+    def run(name, retry, return_result):
+        requests = server.request_count
+        with DataLoader(token='dummy', base_url=server.url, retry=retry, uid_batch_size=10) as loader:
+            start = time.perf_counter()
+            # the error messages of the failed requests are not shown
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = loader.getDailyData(start_date=start_date, uid_list=uid_list, convert_to_local_time=False,
+                                             return_result=return_result)
+            elapsed = time.perf_counter() - start
+        if return_result:
+            fetched = len(result.succeeded)
+        else:
+            fetched = 0 if result is None else result['uid'].nunique()
+        print(f'{name:>28} {elapsed:7.3f}s {fetched:13d} {server.request_count - requests:9d}')
+
+    run('no retry', None, False)
+    run('no retry, return_result', None, True)
+    run('RetryPolicy(backoff=0.1)', RetryPolicy(backoff=0.1), True)
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
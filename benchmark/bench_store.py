@@ -0,0 +1,67 @@
+"""
+Repeated and overlapping detail queries with and without a LocalStore: time, and number of API requests.
+
+The first query fills the store, the same query is then answered locally, and a query extending the range
+by a few days only fetches the days the store lacks. The last line reads one field of one uid over
+one day straight from the memory-mapped files.
+
+Usage:
+    python benchmark/bench_store.py [n_uids] [days] [latency]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader, LocalStore  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def timed(server, fn):
+    requests = server.request_count
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start, server.request_count - requests
+
+
+def main():
+    n_uids = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    server = StubServer(detail_step=60, latency=latency).start()
+    uid_list = [f'uid{i:04d}' for i in range(n_uids)]
+    stop = pd.Timestamp.now(tz='UTC').floor('D') - pd.Timedelta(days=2)
+    start = stop - pd.Timedelta(days=days)
+    extended = stop - pd.Timedelta(days=days + 3)
+    directory = tempfile.mkdtemp()
+    try:
+        print(f'{n_uids} uids, {days} days, {latency * 1000:.0f}ms latency')
+        print(f'{"query":>28} {"time":>8} {"requests":>9} {"rows":>9}')
+        with DataLoader(token='dummy', base_url=server.url) as loader:
+            for name, first in (('api', start), ('api, 3 more days', extended)):
+                df, elapsed, count = timed(server, lambda: loader.getDetailData(
+                    start_date=first, end_date=stop, uid_list=uid_list, convert_to_local_time=False))
+                print(f'{name:>28} {elapsed:7.3f}s {count:9d} {len(df):9d}')
+
+        store = LocalStore(directory)
+        with DataLoader(token='dummy', base_url=server.url, store=store) as loader:
+            for name, first in (('store, empty', start), ('store, filled', start),
+                                ('store, 3 more days', extended)):
+                df, elapsed, count = timed(server, lambda: loader.getDetailData(
+                    start_date=first, end_date=stop, uid_list=uid_list, convert_to_local_time=False))
+                print(f'{name:>28} {elapsed:7.3f}s {count:9d} {len(df):9d}')
+
+        df, elapsed, count = timed(server, lambda: store.query(
+            'SX_Detail_Prod', start + pd.Timedelta(days=10), start + pd.Timedelta(days=11), uid_list[:1],
+            fields=['heart_rate']))
+        print(f'{"store.query, 1 uid 1 field":>28} {elapsed:7.3f}s {count:9d} {len(df):9d}')
+    finally:
+        server.stop()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Peak memory and time of getRawData with and without streaming parsing, on synthetic payloads.
+
+Usage:
+    python benchmark/bench_streaming.py [raw_rows]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soxai_data import DataLoader  # noqa: E402
+from stub_server import StubServer, raw_body  # noqa: E402
+
+
+def main():
+    raw_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    server = StubServer(raw_rows=raw_rows).start()
+    body_size = len(raw_body(raw_rows)[0])
+    try:
+        print(f'payload: {raw_rows} rows, {body_size / 2 ** 20:.1f} MiB')
+        for streaming in (False, True):
+            with DataLoader(token='dummy', base_url=server.url, streaming=streaming) as loader:
+                # the time is measured without tracemalloc, which slows down the allocations
+                start = time.perf_counter()
+                df = loader.getRawData('uid0', timeout=120.0)
+                elapsed = time.perf_counter() - start
+                tracemalloc.start()
+                loader.getRawData('uid0', timeout=120.0)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            frame_size = df.memory_usage(deep=True).sum()
+            print(f'streaming={streaming!s:5} : {elapsed:6.2f} s, peak {peak / 2 ** 20:8.1f} MiB, '
+                  f'frame {frame_size / 2 ** 20:6.1f} MiB')
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
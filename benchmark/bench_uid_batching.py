@@ -0,0 +1,36 @@
+"""
+Flux query size and getDailyData latency versus the number of uids, with and without uid batching.
+
+Usage:
+    python benchmark/bench_uid_batching.py [latency_seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soxai_data import DataLoader  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    server = StubServer(latency=latency).start()
+    print(f'{"uids":>6} {"batch":>6} {"queries":>8} {"largest query":>14} {"total bytes":>12} {"time":>8}')
+    try:
+        for n_uids in (10, 100, 1000, 5000):
+            uid_list = [f'uid{i:08d}' for i in range(n_uids)]
+            for batch_size in (None, 100):
+                with DataLoader(token='dummy', base_url=server.url, uid_batch_size=batch_size) as loader:
+                    requests = loader._flux_requests('SX_Daily_Prod', None, None, '-7d', uid_list, 60.0, None)
+                    sizes = [len(request.content.encode()) for request in requests]
+                    start = time.perf_counter()
+                    loader.getDailyData(uid_list=uid_list, convert_to_local_time=False)
+                    elapsed = time.perf_counter() - start
+                print(f'{n_uids:6d} {str(batch_size):>6} {len(requests):8d} {max(sizes):14d} {sum(sizes):12d} {elapsed:7.3f}s')
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
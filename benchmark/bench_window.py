@@ -0,0 +1,52 @@
+"""
+A dashboard series of detail data: full resolution downsampled with pandas versus `every` windows
+aggregated by the server (aggregateWindow), time and response size.
+
+Usage:
+    python benchmark/bench_window.py [n_uids] [days] [every]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def main():
+    n_uids = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    every = sys.argv[3] if len(sys.argv) > 3 else '1h'
+    server = StubServer(detail_step=60).start()
+    uid_list = [f'uid{i:04d}' for i in range(n_uids)]
+    start_date = pd.Timestamp.now(tz='UTC').floor('D') - pd.Timedelta(days=days)
+    fields = ['heart_rate', 'steps']
+    sizes = []
+
+    def count_bytes(response):
+        response.read()
+        sizes.append(len(response.content))
+
+    print(f'{"mode":>20} {"time":>8} {"response":>10} {"rows":>8}')
+    with DataLoader(token='dummy', base_url=server.url) as loader:
+        loader.client.event_hooks = {'response': [count_bytes]}
+        start = time.perf_counter()
+        df = loader.getDetailData(start_date=start_date, uid_list=uid_list, fields=fields, convert_to_local_time=False)
+        df['_time'] = pd.to_datetime(df['_time'])
+        df = df.groupby(['uid', pd.Grouper(key='_time', freq=every)])[fields].mean().reset_index()
+        elapsed = time.perf_counter() - start
+        print(f'{"pandas resample":>20} {elapsed:7.3f}s {sum(sizes) / 1024 ** 2:7.1f}MiB {len(df):8d}')
+
+        sizes.clear()
+        start = time.perf_counter()
+        df = loader.getDetailData(start_date=start_date, uid_list=uid_list, fields=fields, convert_to_local_time=False,
+                                  every=every, agg='mean')
+        elapsed = time.perf_counter() - start
+        print(f'{"aggregateWindow":>20} {elapsed:7.3f}s {sum(sizes) / 1024 ** 2:7.1f}MiB {len(df):8d}')
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+A minimal local stand-in for the SOXAI API used by the benchmarks.
+
+queryData answers the range, measurement, uid filter, field projection and aggregateWindow of the Flux query
+with synthetic rows.
+Uids starting with "fail" get an HTTP 500 from the v2 endpoints.
+A share `fail_rate` of the queryData and v2 requests gets a transient `fail_status` (503 by default),
+with a Retry-After header when `retry_after` is set.
+RawData answers `raw_pages` pages of `raw_rows` samples, then empty pages.
+RawData and the v2 endpoints answer the format=csv and format=arrow (Arrow IPC stream) of the requests,
+and all the responses are gzip compressed for clients accepting it when `compress` is set.
+myOrg answers an organization user of the org 'org0', whose orgUsers are `org_users` users uid0000, uid0001...
+
+Usage:
+    server = StubServer(latency=0.05)
+    server.start()
+    loader = DataLoader(token='dummy', base_url=server.url)
+    ...
+    server.stop()
+
+or from the command line, to point a DataLoader or a script at it:
+    python benchmark/stub_server.py --port 8080 --latency 0.05
+"""
+import csv
+import gzip
+import io
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self._send_body(body)
+
+    def _send_body(self, body, content_type='application/json'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        if self.server.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=1)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_records(self, records, format):
+        # the records as JSON, CSV or an Arrow IPC stream
+        if format == 'csv':
+            self._send_body(csv_body(records), 'text/csv')
+        elif format == 'arrow':
+            self._send_body(arrow_body(records), 'application/vnd.apache.arrow.stream')
+        else:
+            self._send_json(records)
+
+    def _send_error(self, status=500, retry_after=None):
+        body = b'Internal Server Error' if status == 500 else b'Service Unavailable'
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _transient_failure(self):
+        # answers a transient error to a share `fail_rate` of the queries
+        server = self.server
+        with server.lock:
+            failed = server.random.random() < server.fail_rate
+            server.failure_count += failed
+        if failed:
+            self._send_error(server.fail_status, server.retry_after)
+        return failed
+
+    def do_GET(self):
+        self.server.request_count += 1
+        time.sleep(self.server.latency)
+        path = self.path.split('?')[0]
+        format = re.search(r'format=(\w+)', self.path)
+        format = format.group(1) if format else 'json'
+        if path.startswith('/api/myOrg'):
+            self._send_json({'isOrgUser': True, 'myOrg': {'orgId': 'org0'}})
+        elif re.match(r'/api/orgs/[^/]+/orgUsers', path):
+            self._send_json([{'uid': f'uid{i:04d}', 'name': f'user {i}', 'email': f'user{i}@example.com'}
+                             for i in range(self.server.org_users)])
+        elif path.startswith('/api/RawData/'):
+            page = int(re.search(r'page=(\d+)', self.path).group(1))
+            rows = self.server.raw_rows if page < self.server.raw_pages else 0
+            self._send_body(*raw_body(rows, format))
+        elif path.startswith('/api/v2/'):
+            uid = path.rsplit('/', 1)[-1]
+            if uid.startswith('fail'):
+                self._send_error()
+                return
+            if self._transient_failure():
+                return
+            self._send_records([{'uid': uid, 'day': i, 'value': i * 1.5} for i in range(self.server.rows)], format)
+        else:
+            self._send_json([])
+
+    def do_POST(self):
+        self.server.request_count += 1
+        time.sleep(self.server.latency)
+        length = int(self.headers.get('Content-Length', 0))
+        query = self.rfile.read(length).decode()
+        if self._transient_failure():
+            return
+        self._send_json(flux_rows(query, self.server.detail_step))
+
+
+_raw_bodies = {}
+
+
+def raw_samples(rows):
+    """
+    Synthetic RawData sensor samples.
+    """
+    start = 1767225600
+    return [
+        {'time': start + i * 0.04, 'ppg_green': 20000 + i % 997, 'ppg_red': 18000 + i % 89,
+         'acc_x': (i % 200 - 100) / 100.0, 'acc_y': (i % 300 - 150) / 150.0, 'acc_z': 0.98}
+        for i in range(rows)
+    ]
+
+
+def raw_body(rows, format='json'):
+    """
+    A synthetic RawData response and its content type: a JSON array of sensor samples encoded as a JSON string,
+    or the samples as CSV or an Arrow IPC stream.
+    """
+    if (rows, format) not in _raw_bodies:
+        if format == 'csv':
+            body = csv_body(raw_samples(rows)), 'text/csv'
+        elif format == 'arrow':
+            body = arrow_body(raw_samples(rows)), 'application/vnd.apache.arrow.stream'
+        else:
+            body = json.dumps(json.dumps(raw_samples(rows))).encode(), 'application/json'
+        _raw_bodies[rows, format] = body
+    return _raw_bodies[rows, format]
+
+
+def csv_body(records):
+    if len(records) == 0:
+        return b''
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=list(records[0]))
+    writer.writeheader()
+    writer.writerows(records)
+    return text.getvalue().encode()
+
+
+def arrow_body(records):
+    import pyarrow as pa
+
+    table = pa.Table.from_pylist(records)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _flux_time(value, now):
+    value = value.strip()
+    if value == 'now()':
+        return now
+    if value.startswith('-') and value.endswith('d'):
+        return now - int(value[1:-1]) * 86400
+    return int(value)
+
+
+def _iso(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(seconds))
+
+
+def flux_rows(query, detail_step=3600):
+    """
+    Synthetic pivoted rows for a Flux query: one row per day (SX_Daily_Prod) or per `detail_step`
+    seconds (SX_Detail_Prod) for each uid of the filter, within the range of the query.
+    """
+    now = int(time.time())
+    start, stop = re.search(r'range\(start: ([^,]+), stop: (now\(\)|-?\w+)', query).groups()
+    start, stop = _flux_time(start, now), _flux_time(stop, now)
+    measurement = re.search(r'r\["_measurement"\] == "(\w+)"', query).group(1)
+    uids = re.findall(r'r\["uid"\] == "([^"]+)"', query) or ['uid0']
+    fields = re.findall(r'r\["_field"\] == "([^"]+)"', query)
+    if 'r["_field"] !=' in query:
+        # all the fields, the utc offsets are aggregated in a stream of their own
+        fields = []
+    step = 86400 if measurement == 'SX_Daily_Prod' else detail_step
+    every = re.search(r'aggregateWindow\(every: (\d+)s', query)
+    if every:
+        # one row per aggregation window
+        step = max(step, int(every.group(1)))
+    first = -(-start // step) * step
+    rows = []
+    for uid in uids:
+        for t in range(first, stop, step):
+            day = time.gmtime(t)
+            rows.append({
+                '_start': _iso(start), '_stop': _iso(stop), '_time': _iso(t), '_measurement': measurement,
+                'uid': uid, 'utc_offset_mins': 540, 'month': day.tm_mon, 'year': day.tm_year,
+                'year_week': f'{day.tm_year}-{int(time.strftime("%W", day)):02d}', 'workday': day.tm_wday < 5,
+                'heart_rate': 60 + (t // step) % 30, 'steps': (t // step) % 10000, 'sleep_score': '%d' % ((t // step) % 100),
+            })
+            if fields:
+                # the _field filter and keep() of a projection
+                rows[-1] = {key: value for key, value in rows[-1].items() if key in ['_time', 'uid'] + fields}
+    return rows
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubServer:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, rows=10, detail_step=3600, raw_rows=1000, raw_pages=1,
+                 fail_rate=0.0, fail_status=503, retry_after=None, seed=0, org_users=100, compress=False):
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.latency = latency
+        self.httpd.rows = rows
+        self.httpd.detail_step = detail_step
+        self.httpd.raw_rows = raw_rows
+        self.httpd.raw_pages = raw_pages
+        self.httpd.request_count = 0
+        self.httpd.fail_rate = fail_rate
+        self.httpd.fail_status = fail_status
+        self.httpd.retry_after = retry_after
+        self.httpd.random = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.failure_count = 0
+        self.httpd.org_users = org_users
+        self.httpd.compress = compress
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    @property
+    def failure_count(self):
+        return self.httpd.failure_count
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/api/'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='A local stand-in for the SOXAI API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to each response')
+    parser.add_argument('--rows', type=int, default=10, help='rows of the v2 responses')
+    parser.add_argument('--detail-step', type=int, default=3600, help='seconds between two detail rows')
+    parser.add_argument('--raw-rows', type=int, default=1000, help='samples of a RawData page')
+    parser.add_argument('--raw-pages', type=int, default=1, help='non-empty RawData pages')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='share of the queries failing with a 503')
+    parser.add_argument('--org-users', type=int, default=100)
+    parser.add_argument('--compress', action='store_true', help='gzip the responses for the clients accepting it')
+    args = parser.parse_args()
+    server = StubServer(host=args.host, port=args.port, latency=args.latency, rows=args.rows,
+                        detail_step=args.detail_step, raw_rows=args.raw_rows, raw_pages=args.raw_pages,
+                        fail_rate=args.fail_rate, org_users=args.org_users,
+                        compress=args.compress).start()
+    print(f'serving on {server.url}, Ctrl+C to stop')
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""
+Latency, throughput and peak memory of each DataLoader method and of AverageDataExecutor against the local
+stub server, written to a JSON report that can be compared with the report of another version.
+
+Each scenario is run once to warm up, then `--repeat` times to measure its latency (p50, p95) and throughput
+(calls and rows per second), then once more under tracemalloc to measure the peak memory allocated by Python
+and numpy during the call. The data size is set by the number of uids, days and the stub options, the
+network by `--latency`.
+
+Usage:
+    python benchmark/suite.py --output report-new.json
+    python benchmark/suite.py --uids 50 --days 90 --latency 0.05 --only getDetailData,getDailyInfoV2
+    python benchmark/suite.py --compare report-old.json report-new.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from soxai_data import DataLoader  # noqa: E402
+from soxai_data.get_ave_data import AverageDataExecutor  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def _rows(result):
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict) and all(isinstance(value, int) for value in result.values()):
+        # the rows appended per uid of a sync
+        return sum(result.values())
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    return 0
+
+
+def scenarios(loader, server, args):
+    """
+    The scenarios, as a dict mapping their name to a function running one call and returning its result.
+    """
+    uid_list = [f'uid{i:04d}' for i in range(args.uids)]
+    stop = pd.Timestamp.now(tz='UTC').floor('D')
+    start = stop - pd.Timedelta(days=args.days)
+    uid_filter = ' or '.join(f'r["uid"] == "{uid}"' for uid in uid_list)
+    query = (f'from(bucket: "soxai") |> range(start: {int(start.timestamp())}, stop: {int(stop.timestamp())}) '
+             f'|> filter(fn: (r) => r["_measurement"] == "SX_Daily_Prod") |> filter(fn: (r) => {uid_filter})')
+
+    def iter_query_data():
+        return sum(len(df) for df in loader.iterQueryData(query))
+
+    def sync(method):
+        def run():
+            directory = tempfile.mkdtemp()
+            try:
+                return method(directory, uid_list, start_date=start)
+            finally:
+                shutil.rmtree(directory)
+        return run
+
+    def average_data_executor():
+        directory = tempfile.mkdtemp()
+        try:
+            input_file = os.path.join(directory, 'uids.csv')
+            pd.DataFrame({'UID list': uid_list}).to_csv(input_file, index=False)
+            executor = AverageDataExecutor('dummy', 30, input_file, directory, max_workers=loader.max_workers,
+                                           base_url=server.url)
+            executor.execute()
+            results = [name for name in os.listdir(directory) if name.endswith('_user_uid.csv')]
+            return len(pd.read_csv(os.path.join(directory, results[0]))) if results else 0
+        finally:
+            shutil.rmtree(directory)
+
+    return {
+        'getMyInfo': lambda: loader.getMyInfo(),
+        'getMyOrgUsers': lambda: loader.getMyOrgUsers(),
+        'getDailyData': lambda: loader.getDailyData(start_date=start, end_date=stop, uid_list=uid_list),
+        'getDetailData': lambda: loader.getDetailData(start_date=start, end_date=stop, uid_list=uid_list),
+        'iterQueryData': iter_query_data,
+        'getRawData': lambda: loader.getRawData(uid_list[0], start_date=start, end_date=stop),
+        'getDailyInfoV2': lambda: loader.getDailyInfoV2(start_date=start.strftime('%Y-%m-%d'),
+                                                        end_date=stop.strftime('%Y-%m-%d'), uid_list=uid_list),
+        'getDailyDataV2': lambda: loader.getDailyDataV2(start.isoformat(), stop.isoformat(), uid_list=uid_list),
+        'syncDailyData': sync(loader.syncDailyData),
+        'syncDetailData': sync(loader.syncDetailData),
+        'AverageDataExecutor': average_data_executor,
+    }
+
+
+def measure(fn, server, repeat):
+    """
+    Runs `fn` and returns its latency, throughput, requests and peak memory.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = _rows(fn())
+        requests = server.request_count
+        seconds = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            seconds.append(time.perf_counter() - started)
+        requests = (server.request_count - requests) / repeat
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    seconds = np.array(seconds)
+    return {
+        'repeat': repeat,
+        'rows': rows,
+        'requests': requests,
+        'mean_s': float(seconds.mean()),
+        'p50_s': float(np.percentile(seconds, 50)),
+        'p95_s': float(np.percentile(seconds, 95)),
+        'max_s': float(seconds.max()),
+        'calls_per_s': float(1 / seconds.mean()),
+        'rows_per_s': float(rows / seconds.mean()),
+        'peak_mib': peak / 2 ** 20,
+    }
+
+
+def version():
+    try:
+        from importlib.metadata import version
+        return version('soxai_data')
+    except Exception:
+        with open(os.path.join(ROOT, 'pyproject.toml')) as f:
+            return re.search(r'^version = "([^"]+)"', f.read(), re.M).group(1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(args):
+    server = StubServer(latency=args.latency, rows=args.rows, detail_step=args.detail_step, raw_rows=args.raw_rows,
+                        raw_pages=args.raw_pages, org_users=args.uids).start()
+    report = {
+        'meta': {
+            'version': version(), 'git': git_revision(), 'python': platform.python_version(),
+            'pandas': pd.__version__, 'platform': platform.platform(),
+            'time': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        },
+        'config': {key: value for key, value in vars(args).items() if key not in ['output', 'compare']},
+        'results': {},
+    }
+    print(f'soxai_data {report["meta"]["version"]} ({report["meta"]["git"]}), {args.uids} uids, {args.days} days, '
+          f'{args.latency * 1000:.0f}ms latency')
+    print(f'{"scenario":>20} {"rows":>9} {"requests":>9} {"p50":>9} {"p95":>9} {"rows/s":>11} {"peak":>10}')
+    try:
+        with DataLoader(token='dummy', base_url=server.url, max_workers=args.max_workers) as loader:
+            loader.getMyInfo()
+            for name, fn in scenarios(loader, server, args).items():
+                if args.only and name not in args.only:
+                    continue
+                result = measure(fn, server, args.repeat)
+                report['results'][name] = result
+                print(f'{name:>20} {result["rows"]:9d} {result["requests"]:9.1f} {result["p50_s"]:8.3f}s '
+                      f'{result["p95_s"]:8.3f}s {result["rows_per_s"]:11.0f} {result["peak_mib"]:7.1f}MiB')
+    finally:
+        server.stop()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'report written to {args.output}')
+    return report
+
+
+def compare(old_path, new_path):
+    """
+    Prints the ratio new / old of the latency, throughput and peak memory of the scenarios of both reports.
+    """
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    for label, report in (('old', old), ('new', new)):
+        meta = report['meta']
+        print(f'{label}: soxai_data {meta["version"]} ({meta["git"]}), python {meta["python"]}, '
+              f'pandas {meta["pandas"]}, {meta["time"]}')
+    # the number of calls and the scenarios run do not change the measures
+    changed = [key for key in old['config']
+               if key not in ['repeat', 'only'] and old['config'][key] != new['config'].get(key)]
+    if changed:
+        print(f'warning: the reports differ in {", ".join(changed)}')
+    print(f'{"scenario":>20} {"p50 old":>9} {"p50 new":>9} {"p50":>7} {"rows/s":>7} {"peak":>7}')
+    for name in new['results']:
+        if name not in old['results']:
+            continue
+        a, b = old['results'][name], new['results'][name]
+        print(f'{name:>20} {a["p50_s"]:8.3f}s {b["p50_s"]:8.3f}s {b["p50_s"] / a["p50_s"]:6.2f}x '
+              f'{b["rows_per_s"] / a["rows_per_s"] if a["rows_per_s"] else float("nan"):6.2f}x '
+              f'{b["peak_mib"] / a["peak_mib"]:6.2f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the soxai_data loaders against a local stub server.')
+    parser.add_argument('--uids', type=int, default=20, help='uids queried, also the users of the org')
+    parser.add_argument('--days', type=int, default=30, help='days queried')
+    parser.add_argument('--latency', type=float, default=0.01, help='seconds added to each response')
+    parser.add_argument('--rows', type=int, default=10, help='rows of each v2 response')
+    parser.add_argument('--detail-step', type=int, default=3600, help='seconds between two detail rows')
+    parser.add_argument('--raw-rows', type=int, default=1000, help='samples of a RawData page')
+    parser.add_argument('--raw-pages', type=int, default=5, help='non-empty RawData pages')
+    parser.add_argument('--max-workers', type=int, default=8, help='max_workers of the DataLoader')
+    parser.add_argument('--repeat', type=int, default=5, help='measured calls per scenario')
+    parser.add_argument('--only', type=lambda value: value.split(','), help='comma-separated scenarios to run')
+    parser.add_argument('--output', help='the JSON report to write')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two JSON reports')
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,48 @@
-from .soxai_data import DataLoader
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+# The classes are imported from their modules when first used, so that `import soxai_data` stays cheap
+# and e.g. a process using only LocalStore never imports httpx.
+_EXPORTS = {
+    'DataLoader': 'soxai_data',
+    'AsyncDataLoader': 'async_data_loader',
+    'DiskCache': 'cache',
+    'SyncedDataset': 'sync',
+    'PeriodAggregator': 'aggregation',
+    'PartitionedDataset': 'partitioned',
+    'LocalStore': 'store',
+    'BatchResult': 'retry',
+    'RetryPolicy': 'retry',
+    'Event': 'instrumentation',
+    'EventRecorder': 'instrumentation',
+    'JsonlExporter': 'instrumentation',
+    'ExportReport': 'export',
+    'MemoryCache': 'memo',
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .soxai_data import DataLoader
+    from .async_data_loader import AsyncDataLoader
+    from .cache import DiskCache
+    from .sync import SyncedDataset
+    from .aggregation import PeriodAggregator
+    from .partitioned import PartitionedDataset
+    from .store import LocalStore
+    from .retry import BatchResult, RetryPolicy
+    from .instrumentation import Event, EventRecorder, JsonlExporter
+    from .export import ExportReport
+    from .memo import MemoryCache
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
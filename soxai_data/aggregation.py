@@ -0,0 +1,110 @@
+from .lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# the columns of the Flux results that are not averaged
+METADATA_COLUMNS = ['_start', '_stop', '_measurement', '_time', 'month', 'uid', 'workday', 'year', 'year_week']
+
+
+class PeriodAggregator():
+    def __init__(self, period_days=30, agg='mean', anchor=None, stop_at_empty=True, exclude=METADATA_COLUMNS):
+        """
+        Aggregates the fields of each uid over consecutive periods of `period_days` days, all the uids at once.
+
+        A period starting at `start` covers the rows from `start` to `start + period_days - 1` days, both
+        included, and the next period starts one day later, like `DataProcessing.get_average_datas`.
+        The periods are generated until the first one ending after `current_date`.
+
+        Parameters:
+        period_days (int, optional): The number of days of a period. Defaults to 30.
+        agg (str, function, list or dict, optional): The aggregation of the fields, anything accepted by
+            `DataFrameGroupBy.agg`, e.g. 'mean', ['mean', 'max'] or {'steps': 'sum'}. With several aggregations
+            the result columns are named `<field>_<aggregation>`. Defaults to 'mean'.
+        anchor (str or pd.Timestamp, optional): The start of the first period of every uid. Defaults to the
+            first `_time` of each uid.
+        stop_at_empty (bool, optional): Drop the periods of a uid following its first period without rows.
+            Defaults to True.
+        exclude (list, optional): The columns that are not aggregated. Defaults to the Flux metadata columns.
+
+        Usage:
+
+        ```python
+        from soxai_data import DataLoader, PeriodAggregator
+
+        df = DataLoader(token=<Your-soxai-api-token>).getDailyData(start_date='2024-01-01', convert_to_local_time=False)
+        monthly = PeriodAggregator(period_days=30, agg=['mean', 'max']).aggregate(df, pd.Timestamp.now(tz='UTC'))
+        ```
+        """
+        self.period_days = period_days
+        self.agg = agg
+        self.anchor = anchor
+        self.stop_at_empty = stop_at_empty
+        self.exclude = list(exclude)
+
+    def _fields(self, df):
+        fields = df.drop(columns=self.exclude, errors='ignore')
+        for column in fields.columns:
+            if not pd.api.types.is_numeric_dtype(fields[column]):
+                # e.g. numbers sent as strings, empty values become NaN
+                fields[column] = pd.to_numeric(fields[column], errors='coerce')
+        return fields
+
+    def aggregate(self, df, current_date):
+        """
+        Aggregates the fields of `df` per uid and period.
+
+        Args:
+            df (pd.DataFrame): The rows of one or several uids, with the raw `uid` and `_time` columns
+                (`convert_to_local_time=False`).
+            current_date (datetime): The date the last period must reach.
+
+        Returns:
+            pd.DataFrame: One row per uid and period, sorted by uid and period, with the `uid`, `start_date`
+            and `end_date` columns followed by the aggregated fields. Empty if `df` is.
+        """
+        if len(df) == 0:
+            return pd.DataFrame()
+        period = pd.Timedelta(days=self.period_days)
+        span = period - pd.Timedelta(days=1)
+        times = pd.to_datetime(df['_time'])
+        uids = df['uid'].rename('uid')
+        current_date = pd.Timestamp(current_date)
+        if times.dt.tz is not None and current_date.tz is None:
+            current_date = current_date.tz_localize(times.dt.tz)
+
+        if self.anchor is None:
+            anchors = times.groupby(uids, observed=True, sort=False).transform('min')
+        else:
+            anchor = pd.Timestamp(self.anchor)
+            if times.dt.tz is not None and anchor.tz is None:
+                anchor = anchor.tz_localize(times.dt.tz)
+            anchors = pd.Series(anchor, index=df.index)
+
+        # the period of each row, and the last period of its uid
+        elapsed = times - anchors
+        periods = (elapsed // period).rename('period')
+        last_periods = np.ceil((current_date - anchors - span) / period).clip(lower=0)
+        # the rows in the day between the end of a period and the start of the next one are not in any period
+        keep = times.notna() & (elapsed >= pd.Timedelta(0)) & (elapsed - periods * period <= span) & \
+            (periods <= last_periods)
+
+        keys = [uids[keep], periods[keep].astype(np.int64)]
+        result = self._fields(df)[keep].groupby(keys, sort=True, observed=True).agg(self.agg)
+        if isinstance(result.columns, pd.MultiIndex):
+            result.columns = ['_'.join(str(part) for part in column) for column in result.columns]
+
+        group_periods = pd.Series(result.index.get_level_values('period'), index=result.index)
+        if self.stop_at_empty:
+            # the periods of a uid are consecutive until the first empty one
+            by_uid = group_periods.groupby(level='uid', observed=True, sort=False)
+            consecutive = (group_periods - by_uid.transform('min') == by_uid.cumcount()).to_numpy()
+            result, group_periods = result[consecutive], group_periods[consecutive]
+
+        group_anchors = anchors[keep].groupby(keys[0], observed=True, sort=False).first()
+        start_dates = group_anchors.reindex(result.index.get_level_values('uid')).reset_index(drop=True) + \
+            pd.to_timedelta(group_periods.to_numpy() * self.period_days, unit='D')
+        result = result.reset_index(level='period', drop=True).reset_index()
+        result.insert(1, 'start_date', start_dates)
+        result.insert(2, 'end_date', start_dates + span)
+        return result
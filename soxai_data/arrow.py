@@ -0,0 +1,82 @@
+from .lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+# The Arrow counterparts of the DataFrame building steps, used by the loaders created with output='arrow' or
+# output='table' (requires pyarrow). The results stay pyarrow Tables from the decoded payload to the returned
+# value, so no intermediate NumPy-backed DataFrame is built.
+
+
+def records_table(records):
+    """
+    Returns the `pyarrow.Table` of a list of JSON records.
+    """
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pylist(records)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # a field mixing numbers and strings is kept as strings
+        df = pd.DataFrame(records)
+        for column in df.columns:
+            if df[column].dtype == object:
+                df[column] = df[column].map(lambda value: None if value is None else str(value))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def concat_tables(tables):
+    """
+    Concatenates tables, widening the types of the columns that differ (e.g. int64 and double).
+    """
+    import pyarrow as pa
+
+    if len(tables) == 1:
+        return tables[0]
+    if int(pa.__version__.split('.')[0]) >= 14:
+        return pa.concat_tables(tables, promote_options='permissive')
+    return pa.concat_tables(tables, promote=True)
+
+
+def merge_flux_tables(tables, failed):
+    """
+    The Arrow version of `_BaseDataLoader._merge_flux`: concatenates the tables of the windows and uid batches,
+    removes the rows of the failed uids and the duplicated boundary points, and sorts by uid and time.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    table = concat_tables(tables)
+    names = table.column_names
+    if len(failed) > 0 and 'uid' in names:
+        failed_uids = pa.array([str(uid) for uid in failed if uid is not None], type=pa.string())
+        table = table.filter(pc.invert(pc.is_in(table['uid'].cast(pa.string()), value_set=failed_uids)))
+    if len(tables) > 1 and '_time' in names and table.num_rows > 1:
+        keys = [column for column in ['uid', '_time'] if column in names]
+        table = table.sort_by([(key, 'ascending') for key in keys])
+        # a sorted row is a duplicate when all its keys equal those of the previous row
+        changed = None
+        for key in keys:
+            column = table[key]
+            differs = pc.fill_null(pc.not_equal(column.slice(1), column.slice(0, table.num_rows - 1)), True)
+            changed = differs if changed is None else pc.or_(changed, differs)
+        table = table.filter(pa.chunked_array([pa.array([True])] + changed.chunks))
+    return table
+
+
+def local_time_table(table):
+    """
+    The Arrow version of `_BaseDataLoader.post_process_data`: adds the `local_time` column, `_time` shifted by
+    `utc_offset_mins`, as the first column and drops the `_start`, `_stop`, `_time` and `_measurement` columns.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    times = table['_time']
+    if not pa.types.is_timestamp(times.type):
+        # ISO 8601 strings such as 2026-01-01T00:00:00Z
+        times = pc.cast(times, pa.timestamp('ns', tz='UTC'))
+    offsets = pc.multiply(pc.cast(table['utc_offset_mins'], pa.int64()), 60 * 10 ** 9).cast(pa.duration('ns'))
+    local_time = pc.add(times, offsets)
+    table = table.select([name for name in table.column_names
+                          if name not in ('_start', '_stop', '_time', '_measurement')])
+    return table.add_column(0, 'local_time', local_time)
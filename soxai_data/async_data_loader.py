@@ -0,0 +1,380 @@
+import asyncio
+import time
+from .export import _ExportProgress
+from .instrumentation import instrumented
+from .lazy import lazy_import
+from .partitioned import PartitionedDataset
+from .soxai_data import _BaseDataLoader
+from .sync import SyncedDataset
+
+httpx = lazy_import('httpx')
+
+
+class AsyncDataLoader(_BaseDataLoader):
+    def __init__(self, token, **kwargs):
+        """
+        Initializes an instance of the class.
+
+        The asyncio counterpart of `DataLoader`: it takes the same parameters and every query method
+        has the same arguments and return value, but must be awaited.
+
+        Usage:
+
+        ```python
+        import asyncio
+        from soxai_data import AsyncDataLoader
+
+        async def main():
+            async with AsyncDataLoader(token=<Your-soxai-api-token>) as sx_data:
+                daily, detail = await asyncio.gather(
+                    sx_data.getDailyData(uid_list=['uid1']),
+                    sx_data.getDetailData(uid_list=['uid1']),
+                )
+
+        asyncio.run(main())
+        ```
+        """
+        super().__init__(token, **kwargs)
+
+    def _create_client(self, **kwargs):
+        return httpx.AsyncClient(**kwargs)
+
+    async def aclose(self):
+        """
+        Close the HTTP client and release the pooled connections.
+        """
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def _send(self, request, stream=False, stats=None):
+        # sends the request, retrying the transient failures as configured by self.retry
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt_started = time.perf_counter()
+            http_request = self.client.build_request(request.method, request.url, params=request.params,
+                                                     content=request.content, headers=self.headers,
+                                                     timeout=self._attempt_timeout(request, started))
+            try:
+                response = await self.client.send(http_request, stream=stream)
+            except httpx.TransportError as e:
+                delay = self._retry_delay(attempt, started, error=e)
+                if delay is None:
+                    self._record_attempt(stats, attempt, attempt_started)
+                    raise
+            else:
+                delay = self._retry_delay(attempt, started, response=response)
+                if delay is None:
+                    self._record_attempt(stats, attempt, attempt_started, response)
+                    if self._exhausted(response):
+                        await response.aclose()
+                        response.raise_for_status()
+                    return response
+                await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _iter_frames(self, request, chunk_rows=None, stats=None):
+        # sends the request and parses the response while it is downloaded,
+        # only the opening of the response is retried
+        stream = self._frame_stream(request, chunk_rows)
+        response = await self._send(request, stream=True, stats=stats)
+        started = time.perf_counter()
+        try:
+            response.raise_for_status()
+            async for text in response.aiter_text():
+                for df in stream.feed(text):
+                    yield df
+        finally:
+            await response.aclose()
+        for df in stream.close():
+            yield df
+        if stats is not None:
+            stats['bytes'] = response.num_bytes_downloaded
+            stats['phases']['stream'] = time.perf_counter() - started
+
+    async def _fetch(self, request, parse):
+        # sends the request and parses its response, unless the result is cached or the same request is in flight
+        key = self._memo_key(request)
+        if key is None:
+            return (await self._fetch_once(request, parse))[0]
+        return await self.memo.acall(key, self._fetch_once, request, parse)
+
+    async def _fetch_once(self, request, parse):
+        # returns the result and whether it was successfully fetched
+        stats = self._request_stats()
+        try:
+            result, success = await self._fetch_result(request, parse, stats)
+        except Exception as e:
+            self._emit_request(request, stats, error=e)
+            raise
+        self._emit_request(request, stats, result)
+        return result, success
+
+    async def _fetch_result(self, request, parse, stats):
+        loop = asyncio.get_running_loop()
+        key, result = None, None
+        if self.cache is not None and request.cache is not None:
+            # the cache files are read and written in a thread, not to block the event loop
+            key, result = await loop.run_in_executor(None, self._cache_lookup, request)
+        self._record_cache(stats, key, result)
+        if result is not None:
+            return result, True
+        if self.streaming and request.stream is not None:
+            result = self._as_table(self._concat_frames([df async for df in self._iter_frames(request, stats=stats)]))
+            if key is not None:
+                await loop.run_in_executor(None, self.cache.put, key, result, request.cache == 'recent')
+            return result, True
+        response = await self._send(request, stream=stats is not None, stats=stats)
+        if stats is not None:
+            # the body is read here to time its download apart from the wait for the response
+            started = time.perf_counter()
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            stats['phases']['download'] = time.perf_counter() - started
+        result = self._parse(response, parse, stats)
+        if key is not None:
+            await loop.run_in_executor(None, self._cache_store, key, request, response, result)
+        return result, response.is_success
+
+    async def map_concurrently(self, fn, items, max_workers=None):
+        """
+        Awaits `fn(item)` for every item with at most `max_workers` calls in flight.
+
+        Args:
+            fn (coroutine function): The function to call.
+            items (list): The arguments of the calls.
+            max_workers (int, optional): The maximum number of calls in flight. Defaults to `self.max_workers`.
+
+        Returns:
+            list: The return value, or the raised exception, of each call in the order of `items`.
+        """
+        max_workers = self.max_workers if max_workers is None else max_workers
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def bounded(item):
+            async with semaphore:
+                return await fn(item)
+
+        return list(await asyncio.gather(*[bounded(item) for item in items], return_exceptions=True))
+
+    async def iterQueryData(self, query, chunk_rows=None, timeout=60.0):
+        """
+        Runs a Flux query and yields the result as DataFrames parsed while the response is downloaded.
+        See `DataLoader.iterQueryData`, iterate with `async for`.
+        """
+        async for df in self._iter_frames(self._query_request(query, timeout), chunk_rows):
+            yield self._output_frame(df)
+
+    @instrumented
+    async def getMyInfo(self):
+        """
+        Get the account information. See `DataLoader.getMyInfo`.
+        """
+        return self._read_org_id(await self._fetch(self._my_info_request(), self._parse_my_info))
+
+    @instrumented
+    async def getMyOrgUsers(self, org_id=None):
+        """
+        Retrieves the users associated with the specified organization. See `DataLoader.getMyOrgUsers`.
+        """
+        if org_id is None and self.org_id is None:
+            _ = await self.getMyInfo()
+            if self.org_id is None:
+                return None
+        return self._output_frame(await self._fetch(self._org_users_request(org_id), self._parse_org_users))
+
+    async def _flux_data(self, measurement, start_date, end_date, default_start, convert_to_local_time, uid_list,
+                         timeout, chunk, max_workers, fields, every, agg, return_result):
+        async def fetch(request):
+            return await self._fetch(request, self._parse_flux)
+
+        fields = self._query_fields(fields, convert_to_local_time)
+        if self.store is None or len(uid_list) == 0 or every is not None:
+            if self._bucket_cached(start_date, uid_list, chunk):
+                # the cache files are read and written in a thread, not to block the event loop
+                loop = asyncio.get_running_loop()
+                span, keys, found, requests, request_buckets = await loop.run_in_executor(
+                    None, self._bucket_requests, measurement, start_date, end_date, uid_list, timeout, chunk, fields,
+                    every, agg)
+                results = await self.map_concurrently(fetch, requests, max_workers)
+                return await loop.run_in_executor(
+                    None, self._bucket_frame, results, convert_to_local_time, measurement, span, uid_list, keys, found,
+                    request_buckets, return_result)
+            requests = self._flux_requests(measurement, start_date, end_date, default_start, uid_list, timeout, chunk,
+                                           fields, every, agg)
+            results = await self.map_concurrently(fetch, requests, max_workers)
+            return self._flux_frame(results, convert_to_local_time, measurement, uid_list, return_result)
+        span, covered, requests, request_uids = self._store_requests(measurement, start_date, end_date, default_start,
+                                                                     uid_list, timeout, chunk)
+        results = await self.map_concurrently(fetch, requests, max_workers)
+        # the store files are written and read in a thread, not to block the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._store_frame, results, convert_to_local_time, measurement, span, uid_list, covered,
+            request_uids, fields, return_result)
+
+    @instrumented
+    async def getDailyData(self, start_date=None, end_date=None, convert_to_local_time=True, uid_list:list = [], timeout=60.0,
+                           chunk=None, max_workers=None, fields=None, every=None, agg='mean',
+                           return_result=False):
+        """
+        Retrieves daily data from the SOXAI database. See `DataLoader.getDailyData`.
+        """
+        chunk = self.daily_chunk if chunk is None else chunk
+        return await self._flux_data('SX_Daily_Prod', start_date, end_date, '-7d', convert_to_local_time, uid_list,
+                                     timeout, chunk, max_workers, fields, every, agg, return_result)
+
+    @instrumented
+    async def getDetailData(self, start_date=None, end_date=None, convert_to_local_time=True, uid_list:list = [], timeout=60.0,
+                            chunk=None, max_workers=None, fields=None, every=None, agg='mean',
+                            return_result=False):
+        """
+        Retrieves daily detail data from the SOXAI database. See `DataLoader.getDetailData`.
+        """
+        chunk = self.detail_chunk if chunk is None else chunk
+        return await self._flux_data('SX_Detail_Prod', start_date, end_date, '-1d', convert_to_local_time, uid_list,
+                                     timeout, chunk, max_workers, fields, every, agg, return_result)
+
+    async def iterRawData(self, uid, start_date=None, end_date=None, timeout=5.0, prefetch=True, max_pages=None,
+                          format='json'):
+        """
+        Retrieves raw data page by page. See `DataLoader.iterRawData`, iterate with `async for`.
+        """
+        self._check_format(format)
+        parse = self._format_parser(format, self._parse_raw_data)
+
+        async def fetch(page):
+            return await self._fetch(self._raw_data_request(uid, start_date, end_date, timeout, page, format), parse)
+
+        page, pending = 0, None
+        try:
+            while max_pages is None or page < max_pages:
+                df = await (fetch(page) if pending is None else pending)
+                pending = None
+                if len(df) == 0:
+                    return
+                page += 1
+                if prefetch and (max_pages is None or page < max_pages):
+                    pending = asyncio.ensure_future(fetch(page))
+                yield self._output_frame(df)
+        finally:
+            # the iteration was stopped early, the prefetched page is not needed
+            if pending is not None:
+                pending.cancel()
+
+    @instrumented
+    async def getRawData(self, uid, start_date=None, end_date=None, timeout=5.0, prefetch=True, max_pages=None,
+                         format='json'):
+        """
+        Retrieves raw data from the SOXAI database. See `DataLoader.getRawData`.
+        """
+        try:
+            return self._concat_frames([df async for df in self.iterRawData(uid, start_date, end_date, timeout,
+                                                                            prefetch, max_pages, format)])
+        except Exception as e:
+            print("Error in querying the data", e)
+            return None
+
+    async def _sync(self, measurement, get_data, data_dir, uid_list, start_date, timeout, max_workers):
+        loop = asyncio.get_running_loop()
+        # the files are read and written in a thread, not to block the event loop
+        dataset = await loop.run_in_executor(None, SyncedDataset, data_dir, measurement)
+
+        async def sync(uid):
+            start = dataset.high_water_mark(uid) or start_date
+            df = await get_data(start_date=start, convert_to_local_time=False, uid_list=[uid], timeout=timeout,
+                                max_workers=1)
+            if df is None:
+                raise Exception(f"Error in querying the data since {start}")
+            return await loop.run_in_executor(None, dataset.append, uid, self._to_pandas(df))
+
+        return self._collect_sync(uid_list, await self.map_concurrently(sync, uid_list, max_workers))
+
+    @instrumented
+    async def syncDailyData(self, data_dir, uid_list:list, start_date='2022-03-01', timeout=60.0, max_workers=None):
+        """
+        Downloads the daily data of each uid newer than the last synced row. See `DataLoader.syncDailyData`.
+        """
+        return await self._sync('SX_Daily_Prod', self.getDailyData, data_dir, uid_list, start_date, timeout,
+                                max_workers)
+
+    @instrumented
+    async def syncDetailData(self, data_dir, uid_list:list, start_date, timeout=60.0, max_workers=None):
+        """
+        Downloads the detail data of each uid newer than the last synced row. See `DataLoader.syncDetailData`.
+        """
+        return await self._sync('SX_Detail_Prod', self.getDetailData, data_dir, uid_list, start_date, timeout,
+                                max_workers)
+
+    @instrumented
+    async def exportOrgData(self, path, kind='daily', start_date='2022-03-01', end_date=None, uid_list:list = None,
+                            org_id=None, window=None, format='parquet', partition='month', timeout=60.0,
+                            max_workers=None, progress=True):
+        """
+        Exports the data of all the users of an organization into a local dataset. See `DataLoader.exportOrgData`.
+        """
+        if uid_list is None:
+            org_users = self._to_pandas(await self.getMyOrgUsers(org_id))
+            if org_users is None:
+                print("Error in querying the organization users")
+                return None
+            uid_list = list(org_users['uid']) if 'uid' in org_users.columns else []
+        dataset = PartitionedDataset(path, format=format, partition=partition)
+        units = self._export_units(kind, start_date, end_date, uid_list, window, timeout)
+        tracker = _ExportProgress(len(units), progress)
+        loop = asyncio.get_running_loop()
+
+        async def export(unit):
+            rows = {}
+            try:
+                df = await self._fetch(unit.request, unit.parse)
+                # the files are written in a thread, not to block the event loop
+                rows = await loop.run_in_executor(None, self._export_write, dataset, unit, df)
+                return rows
+            finally:
+                tracker.update(sum(rows.values()))
+
+        results = await self.map_concurrently(export, units, max_workers)
+        return self._export_report(dataset.path, uid_list, units, results, tracker)
+
+    @instrumented
+    async def getDailyInfoV2(self, start_date=None, end_date=None, uid_list:list = [], timeout=60.0, max_workers=None,
+                             return_result=False, format='json'):
+        """
+        Retrieves daily info data from the SOXAI v2 API. See `DataLoader.getDailyInfoV2`.
+        """
+        self._check_format(format)
+        buckets = [self._daily_info_v2_requests(first_day, last_day, uid_list, timeout, format)
+                   for first_day, last_day in self._daily_info_v2_buckets(start_date, end_date)]
+        parse = self._format_parser(format, self._parse_daily_info_v2)
+
+        async def fetch(item):
+            uid, requests = item
+            return await self._fetch(requests[uid], parse)
+
+        results = await self.map_concurrently(fetch, [(uid, requests) for uid in uid_list for requests in buckets],
+                                              max_workers)
+        return self._v2_result(uid_list, self._join_buckets(uid_list, results), 'date', 'DailyInfoV2', return_result)
+
+    @instrumented
+    async def getDailyDataV2(self, start_datetime: str, end_datetime: str, uid_list: list = [], timeout: float = 60.0,
+                             max_workers: int = None, return_result: bool = False, format: str = 'json'):
+        """
+        Retrieves daily detail data from the SOXAI v2 API. See `DataLoader.getDailyDataV2`.
+        """
+        self._check_format(format)
+        requests = self._daily_data_v2_requests(start_datetime, end_datetime, uid_list, timeout, format)
+        parse = self._format_parser(format, self._parse_daily_data_v2)
+
+        async def fetch(uid):
+            return await self._fetch(requests[uid], parse)
+
+        results = await self.map_concurrently(fetch, uid_list, max_workers)
+        return self._v2_result(uid_list, results, 'datetime', 'DailyDataV2', return_result)
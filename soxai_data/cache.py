@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+import time
+from .lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+
+def _require_pyarrow(feature):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"{feature} requires pyarrow, install it with `pip install soxai_data[parquet]`")
+
+
+class DiskCache():
+    def __init__(self, cache_dir, max_bytes=1024 ** 3, ttl=600.0):
+        """
+        A persistent cache of query results stored as Parquet files (requires `pyarrow`).
+
+        DataLoader stores the Flux queries per uid and time bucket aligned on fixed boundaries, and the other
+        queries per request, so repeated reads of the same historical range hit the same entries. Entries
+        reaching the present keep changing and expire after `ttl` seconds, the others never expire. The least recently used entries are evicted once the
+        cache grows over `max_bytes`. The entries are keyed by API token (hashed, never stored in clear), so
+        loaders with different tokens can share a cache directory without reading each other's data.
+
+        Parameters:
+        cache_dir (str): The directory of the cache files. Created if missing.
+        max_bytes (int, optional): The maximum total size of the cache files. Defaults to 1 GiB.
+        ttl (float, optional): The seconds a window reaching the present is kept. Defaults to 600.
+
+        Usage:
+
+        ```python
+        from soxai_data import DataLoader, DiskCache
+
+        sx_data = DataLoader(token=<Your-soxai-api-token>, cache=DiskCache('~/.cache/soxai_data'))
+        ```
+        """
+        _require_pyarrow('DiskCache')
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entries())
+
+    def _entries(self):
+        return [entry.path for entry in os.scandir(self.cache_dir) if entry.name.endswith('.parquet')]
+
+    def key(self, *parts):
+        """
+        Returns the cache key of a query made of the given parts (token, endpoint, parameters, body...).
+        """
+        return hashlib.sha256('\n'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def _path(self, key, recent):
+        return os.path.join(self.cache_dir, key + ('.recent' if recent else '') + '.parquet')
+
+    def get(self, key):
+        """
+        Returns the cached DataFrame of `key`, or None when it is missing or expired.
+        """
+        now = time.time()
+        for recent in (False, True):
+            path = self._path(key, recent)
+            try:
+                stat = os.stat(path)
+                if recent and now - stat.st_mtime > self.ttl:
+                    self._remove(path)
+                    continue
+                df = pd.read_parquet(path)
+                # the access time orders the LRU eviction, the modification time the expiry
+                os.utime(path, (now, stat.st_mtime))
+            except OSError:
+                continue
+            with self._lock:
+                self.hits += 1
+            return df
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, df, recent=False):
+        """
+        Stores `df`, a DataFrame or a `pyarrow.Table`, under `key`. `recent` entries expire after `self.ttl` seconds.
+        """
+        path = self._path(key, recent)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            if isinstance(df, pd.DataFrame):
+                df.to_parquet(tmp_path)
+            else:
+                import pyarrow.parquet as pq
+
+                pq.write_table(df, tmp_path)
+        except Exception:
+            # a frame that cannot be stored as Parquet (e.g. mixed-type columns) is simply not cached
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            if os.path.exists(path):
+                self._size -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._size += size
+        self.evict()
+
+    def _remove(self, path):
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in `self.max_bytes`.
+        """
+        if self._size <= self.max_bytes:
+            return
+        entries = []
+        for path in self._entries():
+            try:
+                entries.append((os.stat(path).st_atime, path))
+            except OSError:
+                pass
+        for _, path in sorted(entries):
+            if self._size <= self.max_bytes:
+                break
+            self._remove(path)
+
+    def clear(self):
+        """
+        Removes all the cache entries.
+        """
+        for path in self._entries():
+            self._remove(path)
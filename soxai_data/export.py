@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import namedtuple
+
+# the kinds of data exported by `exportOrgData`
+EXPORT_KINDS = ('daily', 'detail', 'daily_info_v2', 'daily_data_v2')
+
+# One work unit of an export: the request of a uid batch over a time window, whose rows are written
+# to the files named `name` in the partitions of the dataset.
+_ExportUnit = namedtuple('_ExportUnit', ['uids', 'request', 'parse', 'kind', 'name'])
+
+
+class ExportReport(namedtuple('ExportReport', ['path', 'rows', 'failed', 'units', 'seconds'])):
+    """
+    The outcome of `exportOrgData`.
+
+    Attributes:
+    path (str): The directory of the exported `PartitionedDataset`.
+    rows (dict): The number of rows written for each uid.
+    failed (dict): The uids with a work unit that could not be exported, mapped to the error. Their other
+        units are written, exporting them again to the same path replaces the rows instead of duplicating them.
+    units (int): The number of work units (uid batch and time window) of the export.
+    seconds (float): The duration of the export.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """
+        True when no uid failed.
+        """
+        return len(self.failed) == 0
+
+    @property
+    def rows_per_second(self):
+        """
+        The throughput of the export.
+        """
+        return sum(self.rows.values()) / self.seconds if self.seconds > 0 else 0.0
+
+
+class _ExportProgress():
+    # counts the exported units and rows, reporting them at most every `interval` seconds
+    def __init__(self, units, progress=True, interval=1.0):
+        self.units = units
+        self.progress = progress
+        self.interval = interval
+        self.done = 0
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._reported = self.started
+        self._lock = threading.Lock()
+
+    def update(self, rows):
+        with self._lock:
+            self.done += 1
+            self.rows += rows
+            now = time.perf_counter()
+            if self.done < self.units and now - self._reported < self.interval:
+                return
+            self._reported = now
+            done, total_rows, seconds = self.done, self.rows, now - self.started
+        if callable(self.progress):
+            self.progress(done, self.units, total_rows, seconds)
+        elif self.progress:
+            remaining = seconds / done * (self.units - done)
+            print(f'exported {done}/{self.units} units ({done / self.units:.0%}), {total_rows} rows, '
+                  f'{total_rows / seconds if seconds > 0 else 0:.0f} rows/s, {remaining:.0f}s remaining')
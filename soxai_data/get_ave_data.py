@@ -1,7 +1,18 @@
-from soxai_data import DataLoader
-import pandas as pd
+from soxai_data import DataLoader, PartitionedDataset, SyncedDataset
+from soxai_data.aggregation import PeriodAggregator
+from soxai_data.lazy import lazy_import
+from soxai_data.soxai_data import DEFAULT_BASE_URL
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 import datetime
-import schedule
+import functools
+import json
+import multiprocessing
+import os
+import signal
+import threading
+
+# pandas は最初に使用する時にインポートする
+pd = lazy_import('pandas')
 
 
 class CsvFile:
@@ -20,18 +31,101 @@ class CsvFile:
         df_sorted = df.sort_values(['uid', 'start_date']).reset_index(drop=True)
         df_sorted.to_csv(input_file, mode='w')
 
+    def append_df_csv(self, df, output_file):
+        # 既存ファイルの列に合わせて追記する
+        if not os.path.exists(output_file) or os.path.getsize(output_file) == 0:
+            df.to_csv(output_file, index=False)
+            return
+        self.truncate_incomplete_line(output_file)
+        columns = list(pd.read_csv(output_file, nrows=0).columns)
+        if any(column not in columns for column in df.columns):
+            # 新しい列がある場合はファイル全体を書き直す
+            df_all = pd.concat([self.read_appended_csv(output_file), df], ignore_index=True)
+            df_all.to_csv(f'{output_file}.tmp', index=False)
+            os.replace(f'{output_file}.tmp', output_file)
+        else:
+            df.reindex(columns=columns).to_csv(output_file, mode='a', header=False, index=False)
+
+    def read_appended_csv(self, input_file):
+        # 追記したファイルを読み込む（浮動小数点数は書き込んだ値のまま読み込む）
+        self.truncate_incomplete_line(input_file)
+        return pd.read_csv(input_file, float_precision='round_trip')
+
+    def truncate_incomplete_line(self, input_file):
+        # 書き込み途中で中断された最後の行を削除する
+        with open(input_file, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b'\n') + 1)
+
+
+class Checkpoint:
+
+    def __init__(self, checkpoint_file):
+        # 1行目に実行開始時間、以降の各行にUID毎の処理結果 ('done' or 'failed') を追記する
+        self.checkpoint_file = checkpoint_file
+
+    def load(self):
+        # 前回中断した実行の開始時間とUID毎の処理結果を返す（チェックポイントがない場合は None, {}）
+        if not os.path.exists(self.checkpoint_file):
+            return None, {}
+        run_datetime = None
+        statuses = {}
+        with open(self.checkpoint_file) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中で中断された行
+                    continue
+                if 'run_datetime' in record:
+                    run_datetime = datetime.datetime.fromisoformat(record['run_datetime'])
+                else:
+                    statuses[record['uid']] = record['status']
+        return run_datetime, statuses
+
+    def start(self, run_datetime):
+        with open(self.checkpoint_file, 'w') as f:
+            f.write(json.dumps({'run_datetime': run_datetime.isoformat()}) + '\n')
+
+    def record(self, uid, status):
+        with open(self.checkpoint_file, 'a') as f:
+            f.write(json.dumps({'uid': uid, 'status': status}) + '\n')
+
+    def remove(self):
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
 
 
 class InfluxDb:
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL):
         self.api_key = api_key
+        # base_url: APIのURL（ベンチマーク等でローカルのサーバーに接続する場合に指定する）
+        self.base_url = base_url
         self.sx_data = self.initialize_dataloder()
 
     def initialize_dataloder(self):
-        sx_data = DataLoader(token=self.api_key)
+        sx_data = DataLoader(token=self.api_key, base_url=self.base_url)
         return sx_data
 
+    def close(self):
+        # DataLoader のコネクションプールを解放する
+        self.sx_data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def get_daily_data_by_uid(self, start_date=None, end_date=None, convert_to_local_time=False, uid_list=[], timeout=60.0):
         try:
             df = self.sx_data.getDailyData(start_date, end_date, convert_to_local_time, uid_list, timeout)
@@ -40,6 +134,18 @@ class InfluxDb:
             print(f'failed to get data from influxdb  {e}')
             return None
 
+    def sync_daily_data_by_uid(self, data_dir, uid, start_date, timeout=60.0):
+        # 前回取得分以降のデータだけを取得してローカルに追記し、ローカルの全データを返す
+        try:
+            appended = self.sx_data.syncDailyData(data_dir, [uid], start_date, timeout)
+            # failed_uids は他のスレッドの同期で上書きされるため、戻り値で成功を確認する
+            if uid not in appended:
+                return None
+            return SyncedDataset(data_dir, 'SX_Daily_Prod').read([uid])
+        except Exception as e:
+            print(f'failed to sync data from influxdb  {e}')
+            return None
+
 class DataProcessing:
 
     def __init__(self):
@@ -101,35 +207,40 @@ class DataProcessing:
         return df_period_list
 
     def get_average_datas(self, df, current_date, period_cnt):
-        # 返却値
-        df_result = pd.DataFrame()
-        # _timeで日付順にする
-        df_sorted = self.sort_df_by_time(df)
-        # 1番最初の日付から今日まで、30日毎の開始日と終了日を格納したリストを作成する
-        date_period_list = self.make_list_period_date(df_sorted, current_date, period_cnt)
-        # 取得した期間のデータを取得する
-        df_period_list = self.get_period_date_df(df_sorted, date_period_list)
-        # ループ開始
-        for list_cnt in range(len(date_period_list)):
-            # 指定数のデータを取得する
-            df_group = df_period_list[list_cnt]
-            # 取得したデータが0件の場合、ループ終了
-            if len(df_group) < 1:
-                break
-            # 指定数のデータの平均値を取得する
-            df_processed = self.get_average_data(df_group, date_period_list[list_cnt])
-            # 結合した結果をresult dataframeに追加していく
-            df_result = pd.concat([df_result, df_processed]).reset_index(drop=True)
-        return df_result
+        # 1番最初の日付から今日まで、period_cnt日毎の期間の平均値を全UIDまとめて計算する
+        # (期間の区切り方と空の期間で終了する動作は make_list_period_date / get_period_date_df と同じ)
+        return PeriodAggregator(period_days=period_cnt).aggregate(df, current_date)
+
+
+def aggregate_uid_data(df, current_date, period_cnt):
+    # プロセスプールで実行できるようにモジュールレベルの関数にする
+    return DataProcessing().get_average_datas(df, current_date, period_cnt)
+
 
 class AverageDataExecutor:
 
-    def __init__(self, api_key: str, period_cnt: int, input_file: str, output_file_path: str):
+    def __init__(self, api_key: str, period_cnt: int, input_file: str, output_file_path: str, data_dir: str = None,
+                 max_workers: int = 8, max_processes: int = 0, output_format: str = 'csv',
+                 base_url: str = DEFAULT_BASE_URL):
+        # data_dir: 指定した場合、取得したデータをローカルに保存し、次回以降は差分のみ取得する
+        # max_workers: 同時にデータを取得するUIDの数
+        # max_processes: 集計を行うプロセスの数（0の場合は取得したスレッドで集計する）
+        # output_format: 'parquet' または 'feather' の場合、結果をUID毎に分割したディレクトリに出力する
+        # base_url: APIのURL
         self.api_key = api_key
         self.period_cnt = period_cnt
         self.input_file = input_file
         self.output_file_path = output_file_path
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self.max_processes = max_processes
+        self.output_format = output_format
+        self.base_url = base_url
         self.task_executed = False
+        # 指定時間の終了または stop_scheduler により、全UIDを処理する前に終了したかどうか
+        self.interrupted = False
+        self.scheduler = None
+        self.stop_event = threading.Event()
 
     def within_time_range(self, start_time, end_time):
         if start_time is None:
@@ -150,6 +261,77 @@ class AverageDataExecutor:
         except Exception as e:
             print('input time is not correct : ', e)
 
+    def get_checkpoint_file(self):
+        # 入力ファイル毎のチェックポイント
+        return f'{self.output_file_path}/{os.path.basename(self.input_file)}.checkpoint.jsonl'
+
+    def fetch_uid_data(self, influxDb, uid, start_date):
+        # InfluxDBからデータを取得
+        if self.data_dir is None:
+            return influxDb.get_daily_data_by_uid(start_date, None, False, [uid], 60.0)
+        return influxDb.sync_daily_data_by_uid(self.data_dir, uid, start_date, 60.0)
+
+    def process_uids(self, uid_list, fetch, aggregate, start_time, end_time):
+        # UID毎に 取得 → 集計 を並行して行い、(uid, 集計結果) を完了した順に返す
+        # 集計結果は、取得に失敗した場合 None、データが0件の場合は空のDataFrame
+        fetchers = ThreadPoolExecutor(max_workers=self.max_workers)
+        aggregators = fetchers
+        if self.max_processes > 0:
+            # 取得中のスレッドの通信を引き継がないよう、forkではなくspawnでプロセスを起動する
+            aggregators = ProcessPoolExecutor(max_workers=self.max_processes,
+                                              mp_context=multiprocessing.get_context('spawn'))
+        uids = iter(uid_list)
+        stages = {}
+        fetching = 0
+        self.interrupted = False
+        try:
+            while True:
+                # 取得中のUIDが max_workers 未満の間、次のUIDの取得を開始する
+                while fetching < self.max_workers and not self.interrupted:
+                    uid = next(uids, uids)
+                    if uid is uids:
+                        break
+                    if not self.within_time_range(start_time, end_time):
+                        # 指定時間内でなければ新しいUIDの処理を開始しない
+                        self.interrupted = True
+                        self.task_executed = True
+                        print('ended tasks for today')
+                        break
+                    if self.stop_event.is_set():
+                        # 終了が要求された場合も同様に、取得中のUIDの処理だけを終える
+                        self.interrupted = True
+                        print('stopping')
+                        break
+                    print(f'processing uid {uid}')
+                    stages[fetchers.submit(fetch, uid)] = ('fetch', uid)
+                    fetching += 1
+                if len(stages) == 0:
+                    return
+                done, _ = wait(stages, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, uid = stages.pop(future)
+                    if stage == 'fetch':
+                        fetching -= 1
+                        df = future.result()
+                        if df is None:
+                            print('failed_get_from_influxDB')
+                            yield uid, None
+                        elif len(df) < 1:
+                            yield uid, pd.DataFrame()
+                        else:
+                            # データ加工
+                            stages[aggregators.submit(aggregate, df)] = ('aggregate', uid)
+                    else:
+                        try:
+                            yield uid, future.result()
+                        except Exception as e:
+                            print(f'Error in process data : {e}')
+                            yield uid, None
+        finally:
+            fetchers.shutdown()
+            if aggregators is not fetchers:
+                aggregators.shutdown()
+
     def execute(self, process_start_time=None, process_end_time=None):
 
         # プログラム実行時の引数（処理開始時間、終了時間）を取得する
@@ -164,58 +346,88 @@ class AverageDataExecutor:
         # 開始時間測定
         start_datetime = datetime.datetime.now(datetime.timezone.utc)
 
+        # 前回の実行が中断されている場合、その実行の開始時間と処理結果を引き継ぎ、未処理のUIDから再開する
+        checkpoint = Checkpoint(self.get_checkpoint_file())
+        run_datetime, uid_statuses = checkpoint.load()
+        if run_datetime is None:
+            run_datetime = start_datetime
+            checkpoint.start(run_datetime)
+        else:
+            print(f'resuming the run started at {run_datetime}')
+
         # 定数
         input_file = self.input_file
-        output_file_path = f'{self.output_file_path}/{start_datetime.strftime("%Y%m%d%H%M%S")}_user_uid.csv'
-        not_processed_uid_path = f'{self.output_file_path}/{start_datetime.strftime("%Y%m%d%H%M%S")}_not_processed_uid.csv'
-        failed_processed_uid_path = f'{self.output_file_path}/{start_datetime.strftime("%Y%m%d%H%M%S")}_failed_uid.csv'
+        output_file_path = f'{self.output_file_path}/{run_datetime.strftime("%Y%m%d%H%M%S")}_user_uid.csv'
+        output_dataset_path = f'{self.output_file_path}/{run_datetime.strftime("%Y%m%d%H%M%S")}_user_uid'
+        partial_file_path = f'{self.output_file_path}/{run_datetime.strftime("%Y%m%d%H%M%S")}_user_uid.partial.csv'
+        not_processed_uid_path = f'{self.output_file_path}/{run_datetime.strftime("%Y%m%d%H%M%S")}_not_processed_uid.csv'
+        failed_processed_uid_path = f'{self.output_file_path}/{run_datetime.strftime("%Y%m%d%H%M%S")}_failed_uid.csv'
         # 取得開始日指定
         start_date = datetime.datetime(year=2022, month=3, day=1, hour=0, minute=0, second=0)
 
         # 変数
-        # 処理済みのDataFrameを保存
-        df_result_list = pd.DataFrame()
         # 失敗したUIDを保存
         failed_processed_uid_list = []
 
         # インスタンス作成
         csvFile = CsvFile()
-        influxDb = InfluxDb(self.api_key)
-        dataProcessing = DataProcessing()
+        influxDb = InfluxDb(self.api_key, self.base_url)
 
         # CSVから入力されたUIDを取得
         df_uid_list = csvFile.read_csv_df(input_file)
+        # 前回までに処理済みのUIDを除く
+        uid_list = [uid for uid in df_uid_list['UID list'] if uid_statuses.get(uid) != 'done']
+
+        def fetch(uid):
+            return self.fetch_uid_data(influxDb, uid, start_date)
 
+        # プロセスプールに渡せるようにpickle可能な関数にする
+        aggregate = functools.partial(aggregate_uid_data, current_date=run_datetime, period_cnt=self.period_cnt)
+
+        # 全UIDの処理を試みたかどうか
+        completed = False
         try:
-            for uid in df_uid_list['UID list']:
-                print(f'processing uid {uid}')
-                if not self.within_time_range(start_time, end_time):
-                    # 指定時間内でなければ処理を終了する
-                    self.task_executed = True
-                    print('ended tasks for today')
-                    break
-                else:
-                    # InfluxDBからデータを取得
-                    df = influxDb.get_daily_data_by_uid(start_date, None, False, [uid], 60.0)
-                    if df is None:
-                        # 取得に失敗した場合、取得失敗リストに追加
-                        failed_processed_uid_list.append(uid)
-                        print('failed_get_from_influxDB')
-                        continue
-                    if len(df) < 1:
-                        continue
-                    # データ加工
-                    df_result = dataProcessing.get_average_datas(df, start_datetime, self.period_cnt)
-                    # 結果リストに追加
-                    df_result_list = pd.concat([df_result_list, df_result], axis=0)
+            for uid, df_result in self.process_uids(uid_list, fetch, aggregate, start_time, end_time):
+                if df_result is None:
+                    # 取得に失敗した場合、取得失敗リストに追加
+                    failed_processed_uid_list.append(uid)
+                    checkpoint.record(uid, 'failed')
+                    continue
+                if len(df_result) > 0:
+                    # 結果を途中結果ファイルに追記する
+                    csvFile.append_df_csv(df_result, partial_file_path)
+                checkpoint.record(uid, 'done')
+            completed = not self.interrupted
 
         except Exception as e:
             print(f'Error in process data : {e}')
+        finally:
+            # 実行毎にコネクションプールを作成するため、スケジューラで繰り返し実行しても残らないよう解放する
+            influxDb.close()
+
+        # 前回までの結果も含めて途中結果ファイルを読み込む（中断時に重複した結果は最後のものを使う）
+        df_result_list = pd.DataFrame()
+        if os.path.exists(partial_file_path):
+            df_result_list = csvFile.read_appended_csv(partial_file_path)
+            df_result_list = df_result_list.drop_duplicates(subset=['uid', 'start_date'], keep='last')
+
+        # 中断した実行で出力した未処理・失敗UIDのファイルは今回の結果で置き換える
+        for previous_file_path in [not_processed_uid_path, failed_processed_uid_path]:
+            if os.path.exists(previous_file_path):
+                os.remove(previous_file_path)
 
         if len(df_result_list) > 0:
 
             # 取得したデータをUID、開始時間にソートし、indexの振り直しを行いCSV出力を行う
-            csvFile.write_csv_sort_index(df_result_list, output_file_path)
+            if self.output_format == 'csv':
+                csvFile.write_csv_sort_index(df_result_list, output_file_path)
+            else:
+                # UID、開始日の年毎に分割して出力する（再開した場合は全体を書き直す）
+                df_sorted = df_result_list.sort_values(['uid', 'start_date']).reset_index(drop=True)
+                df_sorted['end_date'] = pd.to_datetime(df_sorted['end_date'], utc=True, format='ISO8601')
+                dataset = PartitionedDataset(output_dataset_path, format=self.output_format, partition='year',
+                                             time_column='start_date')
+                dataset.write(df_sorted, mode='overwrite')
 
             # 未処理のUIDをnot_processed_uid.csvに出力する
             df_not_processed_uid = df_uid_list[~df_uid_list['UID list'].isin(df_result_list['uid'])]
@@ -229,6 +441,12 @@ class AverageDataExecutor:
             # 失敗したUIDをfailed_processed_uid_list.csvに出力する
             csvFile.write_df_csv(pd.DataFrame(failed_processed_uid_list, columns=['UID list']), failed_processed_uid_path)
 
+        # 全UIDの処理を試みた場合、チェックポイントと途中結果ファイルを削除する
+        if completed:
+            checkpoint.remove()
+            if os.path.exists(partial_file_path):
+                os.remove(partial_file_path)
+
         # 未処理のUIDが存在しない場合、処理終了フラグをTrueにする
         if len(df_not_processed_uid) == 0:
             self.task_executed = True
@@ -241,19 +459,63 @@ class AverageDataExecutor:
         print(f'gap_time : {end_datetime - start_datetime}')
 
 
-    def execute_scheduler(self, schedule_start_time, schedule_end_time):
+    def execute_window(self, process_start_time, process_end_time):
+        self.execute(process_start_time=process_start_time, process_end_time=process_end_time)
+        if self.interrupted and not self.stop_event.is_set():
+            # 指定時間で中断した場合、次の時間帯（時間帯が1つの場合は翌日）にチェックポイントから再開する
+            self.task_executed = False
+
+    def next_run_time(self):
+        # 次回の実行予定時間（スケジューラを実行していない場合は None）
+        if self.scheduler is None:
+            return None
+        return self.scheduler.next_run
+
+    def stop_scheduler(self):
+        # 実行中の処理は新しいUIDの取得を開始せずに終了し、スケジューラの待機も終了する
+        self.stop_event.set()
+
+    def execute_scheduler(self, schedule_start_time=None, schedule_end_time=None, windows=None):
         # The format of schedule_start_time and schedule_end_time is "hh:mm"
+        # windows: 1日に複数の時間帯に処理する場合 [("hh:mm", "hh:mm"), ...] で指定する
 
         # 処理開始時間、処理終了時間を取得する
-        print(f'this program will start at {schedule_start_time} and end at {schedule_end_time}')
+        windows = windows or [(schedule_start_time, schedule_end_time)]
+        for window_start_time, window_end_time in windows:
+            print(f'this program will start at {window_start_time} and end at {window_end_time}')
+
+        # スケジューラにタスクをセット（schedule はスケジューラを実行する場合のみ必要なため、ここでインポートする）
+        import schedule
 
-        # スケジューラにタスクをセット
-        schedule.every().day.at(schedule_start_time).do(self.execute, process_start_time=schedule_start_time, process_end_time=schedule_end_time)
+        self.scheduler = schedule.Scheduler()
+        for window_start_time, window_end_time in windows:
+            self.scheduler.every().day.at(window_start_time).do(self.execute_window, window_start_time,
+                                                               window_end_time)
         # タスク終了時にTrue
         self.task_executed = False
+        self.stop_event.clear()
 
-        while not self.task_executed:
-            # 時間まで待機
-            schedule.run_pending()
+        # SIGINT, SIGTERM で実行中の処理を区切りの良いところで終了する（シグナルはメインスレッドでのみ受け取れる）
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous_handlers[signum] = signal.signal(signum, lambda signum, frame: self.stop_scheduler())
 
-        print('All done')
\ No newline at end of file
+        try:
+            next_run = None
+            while not self.task_executed and not self.stop_event.is_set():
+                self.scheduler.run_pending()
+                if self.task_executed:
+                    break
+                if self.scheduler.next_run != next_run:
+                    next_run = self.scheduler.next_run
+                    print(f'next run at {next_run}')
+                # 次の実行時間まで待機する（時計の変更に追従するため、最長60秒毎に確認する）
+                idle_seconds = self.scheduler.idle_seconds
+                self.stop_event.wait(min(max(idle_seconds, 0), 60) if idle_seconds is not None else 60)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            self.scheduler.clear()
+
+        print('All done')
@@ -0,0 +1,185 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque, namedtuple
+from .lazy import is_dataframe, lazy_import
+
+pd = lazy_import('pandas')
+
+# One measurement sent to the hooks of a loader.
+# kind is 'request' for an HTTP request (name is the endpoint, e.g. 'queryData'), 'phase' for a step of
+# building the DataFrame (name is the step, e.g. 'post_process_data') and 'call' for a call of a public
+# method (name is the method). seconds is the wall time of the whole measurement, and phases the seconds
+# of its parts: 'wait' (sending the request until the response headers, i.e. the network and server time),
+# 'download', 'decode' (JSON), 'build' (DataFrame) and 'retrying' (the failed attempts and their backoff) for
+# requests, or 'stream' when the response is parsed while downloaded. bytes is the size of the response body as transferred.
+Event = namedtuple('Event', ['kind', 'name', 'seconds', 'phases', 'bytes', 'rows', 'status', 'retries', 'cache',
+                             'error', 'time'],
+                   defaults=(None, None, None, None, None, None, None, None))
+
+
+def _rows(result):
+    # the number of rows of a method result, a DataFrame, a pyarrow Table or a BatchResult
+    data = getattr(result, 'data', result)
+    if is_dataframe(data):
+        return len(data)
+    return getattr(data, 'num_rows', None)
+
+
+def instrumented(method):
+    """
+    Sends a 'call' event to the hooks of the loader for each call of the decorated method.
+    """
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            if not self.hooks:
+                return await method(self, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = await method(self, *args, **kwargs)
+            except Exception as e:
+                self._emit('call', method.__name__, time.perf_counter() - started, error=repr(e))
+                raise
+            self._emit('call', method.__name__, time.perf_counter() - started, rows=_rows(result))
+            return result
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.hooks:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception as e:
+            self._emit('call', method.__name__, time.perf_counter() - started, error=repr(e))
+            raise
+        self._emit('call', method.__name__, time.perf_counter() - started, rows=_rows(result))
+        return result
+    return wrapper
+
+
+class EventRecorder():
+    def __init__(self, max_events=100000):
+        """
+        A hook keeping the last events of a loader in memory, summarised with percentiles.
+
+        Parameters:
+        max_events (int, optional): The number of events kept, the older ones are dropped. Defaults to 100000.
+
+        Usage:
+
+        ```python
+        from soxai_data import DataLoader, EventRecorder
+
+        recorder = EventRecorder()
+        sx_data = DataLoader(token=<Your-soxai-api-token>, hooks=[recorder])
+        sx_data.getDetailData(start_date='2026-01-01', uid_list=uids)
+        print(recorder.summary())
+        ```
+        """
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self._events.append(event)
+
+    def clear(self):
+        """
+        Forgets the recorded events.
+        """
+        with self._lock:
+            self._events.clear()
+
+    def events(self):
+        """
+        Returns the recorded events as a DataFrame, one row per event and one `phase_<name>` column per phase.
+        """
+        with self._lock:
+            events = list(self._events)
+        if len(events) == 0:
+            return pd.DataFrame(columns=list(Event._fields))
+        rows = []
+        for event in events:
+            row = event._asdict()
+            phases = row.pop('phases') or {}
+            row.update({f'phase_{name}': seconds for name, seconds in phases.items()})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def summary(self, percentiles=(0.5, 0.9, 0.99)):
+        """
+        Summarises the recorded events per kind, name and phase.
+
+        Args:
+            percentiles (tuple, optional): The percentiles of the seconds. Defaults to p50, p90 and p99.
+
+        Returns:
+            pd.DataFrame: Indexed by kind, name and phase ('total' for the whole event), with the count, mean,
+            percentiles and max of the seconds. The 'total' rows also sum the bytes, rows, retries, errors and
+            cache hits.
+        """
+        df = self.events()
+        if len(df) == 0:
+            return pd.DataFrame()
+        phases = [column for column in df.columns if column.startswith('phase_')]
+        long = df[['kind', 'name', 'seconds']].assign(phase='total')
+        for column in phases:
+            long = pd.concat([long, df[['kind', 'name', column]].rename(columns={column: 'seconds'})
+                              .assign(phase=column[len('phase_'):]).dropna(subset=['seconds'])], ignore_index=True)
+        seconds = long.groupby(['kind', 'name', 'phase'], sort=True)['seconds']
+        summary = seconds.agg(['count', 'mean']).join(
+            seconds.quantile(list(percentiles)).unstack().rename(columns=lambda p: f'p{round(p * 100):d}'))
+        summary = summary.join(seconds.max().rename('max'))
+        totals = df.assign(errors=df['error'].notna(), cache_hits=df['cache'] == 'hit').groupby(['kind', 'name'])[
+            ['bytes', 'rows', 'retries', 'errors', 'cache_hits']].sum(min_count=1)
+        totals = totals.assign(phase='total').set_index('phase', append=True)
+        return summary.join(totals)
+
+
+class JsonlExporter():
+    def __init__(self, path):
+        """
+        A hook appending each event of a loader to a JSON Lines file, e.g. to compare runs.
+
+        Parameters:
+        path (str): The file the events are appended to.
+
+        Usage:
+
+        ```python
+        from soxai_data import DataLoader, JsonlExporter
+
+        exporter = JsonlExporter('soxai_events.jsonl')
+        sx_data = DataLoader(token=<Your-soxai-api-token>, hooks=[exporter])
+        ...
+        exporter.close()
+        df = pd.read_json('soxai_events.jsonl', lines=True)
+        ```
+        """
+        self.path = path
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event._asdict(), default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        """
+        Closes the file.
+        """
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
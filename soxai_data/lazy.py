@@ -0,0 +1,34 @@
+import importlib
+import sys
+
+# The heavy dependencies (pandas, numpy, httpx) are imported the first time they are used rather than when
+# soxai_data is imported, so that short-lived processes only pay for the ones their calls need.
+
+
+class _LazyModule():
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        # only called for the attributes not resolved yet, the resolved ones are plain attributes
+        value = getattr(importlib.import_module(self._name), attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}'>"
+
+
+def lazy_import(name):
+    """
+    Returns a stand-in of the module `name`, which is imported when one of its attributes is first used.
+    """
+    return _LazyModule(name)
+
+
+def is_dataframe(value):
+    """
+    Returns whether `value` is a pandas DataFrame, without importing pandas: none can exist before it is imported.
+    """
+    pd = sys.modules.get('pandas')
+    return pd is not None and isinstance(value, pd.DataFrame)
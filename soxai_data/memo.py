@@ -0,0 +1,130 @@
+import asyncio
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from .lazy import is_dataframe
+
+
+def _copy(value):
+    # every caller gets its own copy, the query methods modify the frames they return
+    if is_dataframe(value):
+        return value.copy()
+    if type(value).__module__.startswith('pyarrow'):
+        # the Arrow tables are immutable
+        return value
+    return copy.deepcopy(value)
+
+
+class MemoryCache():
+    def __init__(self, max_entries=256, ttl=30.0):
+        """
+        An in-memory cache of request results, coalescing the identical requests in flight.
+
+        When several calls, from threads or asyncio tasks, send the same request at the same time, only the
+        first one reaches the server and the others wait for its result. The successful results are then kept
+        `ttl` seconds, the least recently used ones being dropped beyond `max_entries`. A cache can be shared by
+        several DataLoader and AsyncDataLoader instances, the results are keyed by token and output.
+
+        Parameters:
+        max_entries (int, optional): The maximum number of results kept. Defaults to 256.
+        ttl (float, optional): The seconds a result is kept. Defaults to 30.
+
+        Usage:
+
+        ```python
+        from soxai_data import DataLoader, MemoryCache
+
+        memo = MemoryCache(max_entries=1024, ttl=60)
+        sx_data = DataLoader(token=<Your-soxai-api-token>, memo=memo)
+        ...
+        print(memo.hits, memo.coalesced, memo.misses)
+        ```
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def key(self, *parts):
+        """
+        Returns the key of a request made of the given parts (token, endpoint, parameters, body...).
+        """
+        return hashlib.sha256('\n'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def _lookup(self, key):
+        # returns whether the caller sends the request, and the cached result or the future of the request in flight
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if time.monotonic() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return False, entry
+                del self._entries[key]
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return False, future
+            self.misses += 1
+            future = self._inflight[key] = Future()
+            return True, future
+
+    def _done(self, key, future, value=None, cacheable=False, error=None):
+        with self._lock:
+            del self._inflight[key]
+            if cacheable:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+    def call(self, key, fn, *args):
+        """
+        Returns the result of `fn(*args)` for `key`, cached or shared with a call in flight.
+        `fn` returns the result and whether it can be cached.
+        """
+        send, found = self._lookup(key)
+        if not send:
+            return _copy(found[1] if isinstance(found, tuple) else found.result())
+        try:
+            value, cacheable = fn(*args)
+        except BaseException as e:
+            self._done(key, found, error=e)
+            raise
+        self._done(key, found, value, cacheable)
+        return _copy(value)
+
+    async def acall(self, key, fn, *args):
+        """
+        The asyncio counterpart of `call`, awaiting the coroutine function `fn`.
+        """
+        send, found = self._lookup(key)
+        if not send:
+            return _copy(found[1] if isinstance(found, tuple) else await asyncio.wrap_future(found))
+        try:
+            value, cacheable = await fn(*args)
+        except BaseException as e:
+            self._done(key, found, error=e)
+            raise
+        self._done(key, found, value, cacheable)
+        return _copy(value)
+
+    def clear(self):
+        """
+        Drops the cached results and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.coalesced = 0
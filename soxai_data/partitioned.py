@@ -0,0 +1,225 @@
+import os
+import time
+from .cache import _require_pyarrow
+from .lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# the partition column holding the day, month or year of the rows
+PARTITION_COLUMN = 'partition_date'
+
+_PARTITION_FORMATS = {'day': '%Y-%m-%d', 'month': '%Y-%m', 'year': '%Y'}
+_PARTITION_UNITS = {'day': 'datetime64[D]', 'month': 'datetime64[M]', 'year': 'datetime64[Y]'}
+_TIME_COLUMNS = ['_time', 'start_date', 'datetime', 'date', 'time']
+_EXTENSIONS = {'parquet': 'parquet', 'feather': 'feather'}
+
+
+class PartitionedDataset():
+    def __init__(self, path, format='parquet', partition='month', time_column=None):
+        """
+        A directory of DataFrames stored as Parquet or Feather files partitioned by uid and date
+        (requires `pyarrow`).
+
+        The rows are written under `<path>/uid=<uid>/partition_date=<date>/`, so reading some uids or a time
+        range only opens the matching files, and Parquet row groups outside the range are skipped using their
+        statistics. Unlike CSV the dtypes are stored with the data and nothing is inferred on reload.
+
+        Parameters:
+        path (str): The directory of the dataset. Created on the first write.
+        format (str, optional): 'parquet' (default) or 'feather'.
+        partition (str, optional): The date granularity of the partitions: 'day', 'month' (default), 'year',
+            or None to partition by uid only.
+        time_column (str, optional): The column (or index) of the row times. Defaults to the first of
+            '_time', 'start_date', 'datetime', 'date' and 'time' found, or the DatetimeIndex.
+
+        Usage:
+
+        ```python
+        from soxai_data import DataLoader, PartitionedDataset
+
+        dataset = PartitionedDataset('~/soxai/detail', partition='day')
+        dataset.write(sx_data.getDetailData(start_date='2026-01-01', uid_list=uids, convert_to_local_time=False))
+        df = dataset.read(columns=['uid', '_time', 'heart_rate'], uid_list=['uid1'], start='2026-01-05')
+        ```
+        """
+        _require_pyarrow('PartitionedDataset')
+        if format not in _EXTENSIONS:
+            raise ValueError(f"Incorrect format({format}), should be 'parquet' or 'feather'")
+        if partition is not None and partition not in _PARTITION_FORMATS:
+            raise ValueError(f"Incorrect partition({partition}), should be 'day', 'month', 'year' or None")
+        self.path = os.path.expanduser(path)
+        self.format = format
+        self.partition = partition
+        self.time_column = time_column
+
+    def _find_time_column(self, names, index_name=None):
+        if self.time_column is not None:
+            return self.time_column
+        for column in _TIME_COLUMNS:
+            if column in names:
+                return column
+        return index_name
+
+    def _times(self, values):
+        if pd.api.types.is_numeric_dtype(values):
+            # epoch seconds, e.g. the raw data
+            return pd.to_datetime(values, unit='s', utc=True)
+        return pd.to_datetime(values, utc=True, format='ISO8601')
+
+    def write(self, df, uid=None, mode='append', name=None):
+        """
+        Writes the rows of `df` into the dataset.
+
+        Args:
+            df (pd.DataFrame): The rows to write, with a `uid` column unless `uid` is given.
+            uid (str, optional): The uid of all the rows, for frames without a `uid` column (e.g. `getRawData`).
+            mode (str, optional): 'append' (default) adds the rows next to the stored ones, 'overwrite' replaces
+                the stored rows of the partitions written. The other partitions are kept in both cases.
+            name (str, optional): The name of the files written. A write with the name of a previous one replaces
+                its files in the partitions written, so that retrying a write does not duplicate the rows.
+                Defaults to a unique name.
+
+        Returns:
+            int: The number of rows written.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if mode not in ('append', 'overwrite'):
+            raise ValueError(f"Incorrect mode({mode}), should be 'append' or 'overwrite'")
+        if len(df) == 0:
+            return 0
+        if uid is not None:
+            df = df.assign(uid=uid)
+        partitioning = []
+        if 'uid' in df.columns:
+            df = df.assign(uid=df['uid'].astype(str))
+            partitioning.append('uid')
+
+        is_datetime_index = isinstance(df.index, pd.DatetimeIndex)
+        time_column = self._find_time_column(df.columns, df.index.name if is_datetime_index else None)
+        if time_column in df.columns:
+            times = self._times(df[time_column])
+            if not pd.api.types.is_numeric_dtype(df[time_column]):
+                # the times are stored as timestamps, so that the ranges read are pruned on their statistics
+                df = df.assign(**{time_column: times})
+        elif time_column is not None and is_datetime_index:
+            times = pd.Series(df.index, index=df.index)
+        else:
+            times = None
+        if self.partition is not None and times is not None:
+            if times.dt.tz is not None:
+                times = times.dt.tz_convert(None)
+            # numpy formats the truncated dates as the strftime formats of _PARTITION_FORMATS, 20x faster
+            dates = np.datetime_as_string(times.to_numpy().astype(_PARTITION_UNITS[self.partition]))
+            df = df.assign(**{PARTITION_COLUMN: dates})
+            partitioning.append(PARTITION_COLUMN)
+
+        table = pa.Table.from_pandas(df, preserve_index=not isinstance(df.index, pd.RangeIndex))
+        file_options = None
+        if self.format == 'feather':
+            # compressed like pyarrow.feather.write_feather
+            file_options = ds.IpcFileFormat().make_write_options(compression='lz4')
+        ds.write_dataset(
+            table, self.path, format=self.format, partitioning=partitioning, partitioning_flavor='hive',
+            file_options=file_options,
+            basename_template=f'{name or f"part-{time.time_ns()}"}-{{i}}.{_EXTENSIONS[self.format]}',
+            existing_data_behavior='overwrite_or_ignore' if mode == 'append' else 'delete_matching',
+        )
+        return len(df)
+
+    def _partitioning(self):
+        # the partition keys are typed as written, as strings: inferred from the directory names, the partitions
+        # of a year would be integers and a uid such as '00123' would lose its zeros
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        keys = []
+        for root, directories, files in os.walk(self.path):
+            keys = [part.split('=', 1)[0] for part in os.path.relpath(root, self.path).split(os.sep) if '=' in part]
+            if len(files) > 0:
+                break
+        return ds.partitioning(pa.schema([(key, pa.string()) for key in keys]), flavor='hive')
+
+    def dataset(self):
+        """
+        Returns the `pyarrow.dataset.Dataset` of the stored files, to scan them lazily.
+        Its schema unifies the schemas of all the files: the writes may add columns or widen numeric types,
+        but a column cannot change kind (e.g. frames built with and without `compact_dtypes` cannot be mixed).
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        partitioning = self._partitioning()
+        dataset = ds.dataset(self.path, format=self.format, partitioning=partitioning)
+        schemas = [dataset.schema] + [fragment.physical_schema for fragment in dataset.get_fragments()]
+        if int(pa.__version__.split('.')[0]) >= 14:
+            # e.g. an integer field stored as int8 by one write and int16 by another
+            schema = pa.unify_schemas(schemas, promote_options='permissive')
+        else:
+            schema = pa.unify_schemas(schemas)
+        return ds.dataset(self.path, schema=schema, format=self.format, partitioning=partitioning)
+
+    def read(self, columns=None, uid_list=None, start=None, end=None):
+        """
+        Reads the stored rows, opening only the files of the requested uids and time range.
+
+        Args:
+            columns (list, optional): The columns to read. Defaults to all the columns.
+            uid_list (list, optional): The uids to read. Defaults to all the uids.
+            start (str or datetime, optional): The first time to read (included).
+            end (str or datetime, optional): The last time to read (excluded).
+
+        Returns:
+            pd.DataFrame: The rows, sorted by uid and time when written with them, or an empty DataFrame.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if not os.path.isdir(self.path):
+            return pd.DataFrame()
+        dataset = self.dataset()
+        names = dataset.schema.names
+        pandas_metadata = dataset.schema.pandas_metadata or {}
+        index_columns = [column for column in pandas_metadata.get('index_columns', []) if isinstance(column, str)]
+        time_column = self._find_time_column(names, index_columns[0] if index_columns else None)
+
+        filters = []
+        if uid_list is not None and 'uid' in names:
+            filters.append(ds.field('uid').isin([str(uid) for uid in uid_list]))
+        for bound, compare in ((start, 'ge'), (end, 'lt')):
+            if bound is None or time_column not in names:
+                continue
+            bound = pd.Timestamp(bound)
+            bound = bound.tz_localize('UTC') if bound.tz is None else bound.tz_convert('UTC')
+            field = ds.field(time_column)
+            value = bound
+            if not pa.types.is_timestamp(dataset.schema.field(time_column).type):
+                # epoch seconds
+                value = bound.timestamp()
+            filters.append(field >= value if compare == 'ge' else field < value)
+            if PARTITION_COLUMN in names and self.partition is not None:
+                # the partitions outside the range are not opened
+                date = bound.strftime(_PARTITION_FORMATS[self.partition])
+                partition = ds.field(PARTITION_COLUMN)
+                filters.append(partition >= date if compare == 'ge' else partition <= date)
+        expression = None
+        for condition in filters:
+            expression = condition if expression is None else expression & condition
+
+        read_columns = None
+        if columns is not None:
+            read_columns = list(columns) + [column for column in index_columns + ['uid', time_column]
+                                            if column in names and column not in columns]
+        df = dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+        df = df.drop(columns=[PARTITION_COLUMN], errors='ignore')
+        sort_keys = [key for key in ['uid', time_column] if key is not None and (key in df.columns or key == df.index.name)]
+        if len(sort_keys) > 0:
+            df = df.sort_values(sort_keys, kind='stable')
+        if columns is None:
+            # the partition columns are read last, they are put back in the written order
+            written = [column['name'] for column in pandas_metadata.get('columns', [])]
+            columns = [column for column in written if column in df.columns] + \
+                [column for column in df.columns if column not in written]
+        return df[[column for column in columns if column in df.columns]]
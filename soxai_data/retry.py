@@ -0,0 +1,110 @@
+import random
+from collections import namedtuple
+from datetime import datetime, timezone
+from .lazy import lazy_import
+
+httpx = lazy_import('httpx')
+
+# the statuses of transient server errors, 429 being the rate limit
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy():
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30.0, jitter=True, statuses=RETRY_STATUSES,
+                 deadline=None):
+        """
+        How `DataLoader(retry=...)` retries the requests failing with a transient error.
+
+        A request is retried when the connection fails or times out, or when the server answers one of
+        `statuses`. The n-th retry waits `backoff * 2 ** n` seconds, at most `max_backoff`, randomised between
+        zero and that value with `jitter` so that concurrent requests do not retry in lockstep. A `Retry-After`
+        header (sent with 429 and 503) is honoured when it asks for a longer wait.
+
+        Parameters:
+        retries (int, optional): The maximum number of retries of a request. Defaults to 3.
+        backoff (float, optional): The wait in seconds before the first retry, doubled for each next one.
+            Defaults to 0.5.
+        max_backoff (float, optional): The maximum wait in seconds computed from `backoff`. Defaults to 30.0.
+        jitter (bool, optional): Wait a random time up to the computed one. Defaults to True.
+        statuses (tuple, optional): The HTTP statuses retried. Defaults to 429, 500, 502, 503 and 504.
+            If the last attempt still gets one of them, an `httpx.HTTPStatusError` is raised.
+        deadline (float, optional): The maximum seconds spent on a request, all the attempts and waits
+            included. The timeout of each attempt is shortened to fit. Defaults to no deadline.
+
+        Usage:
+
+        ```python
+        from soxai_data import DataLoader, RetryPolicy
+
+        sx_data = DataLoader(token=<Your-soxai-api-token>, retry=RetryPolicy(retries=5, deadline=300))
+        ```
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = tuple(statuses)
+        self.deadline = deadline
+
+    def should_retry(self, attempt, error=None, response=None):
+        """
+        Returns whether the attempt number `attempt` (0 for the first one) is retried, given its `response`
+        or the `error` it raised.
+        """
+        if attempt >= self.retries:
+            return False
+        if response is not None:
+            return response.status_code in self.statuses
+        # connection failures and timeouts
+        return isinstance(error, httpx.TransportError)
+
+    def retry_after(self, response):
+        """
+        Returns the seconds to wait asked by the `Retry-After` header of `response`, or None.
+        """
+        value = None if response is None else response.headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            # an HTTP date, rarely sent, email.utils is imported only then
+            from email.utils import parsedate_to_datetime
+
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt, response=None):
+        """
+        Returns the seconds to wait before retrying the attempt number `attempt`.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        retry_after = self.retry_after(response)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class BatchResult(namedtuple('BatchResult', ['data', 'succeeded', 'failed'])):
+    """
+    The outcome of a multi-uid query called with `return_result=True`.
+
+    Attributes:
+    data (pd.DataFrame): The rows of the succeeded uids, or None if no data was fetched.
+    succeeded (list): The uids fetched, in the order of `uid_list`.
+    failed (dict): The uids that could not be fetched, mapped to their error. A query without `uid_list`
+        that failed is recorded under the None key.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """
+        True when no uid failed.
+        """
+        return len(self.failed) == 0
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+def _is_text(series):
+    return series.dtype == object or pd.api.types.is_string_dtype(series)
+
+
+def _compact_numeric(series):
+    """
+    Returns `series` with the smallest numeric dtype holding its values exactly, or unchanged when it is not
+    numeric. Integer columns get the smallest integer dtype. Float columns become float32 only when all their
+    values survive the round trip through float32 (e.g. 72.5, but not 0.1), and float64 otherwise. A float
+    column stays a float even when all its values are whole, so the dtype of a field does not depend on them.
+    Text columns holding numbers (e.g. '72') are converted, empty strings become NaN.
+    """
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if _is_text(series):
+        missing = series.isna() | (series == '')
+        numeric = pd.to_numeric(series.where(~missing), errors='coerce')
+        if (numeric.isna() != missing).any():
+            # the column holds text, not numbers
+            return series
+        series = numeric
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if not pd.api.types.is_float_dtype(series):
+        return series
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(over='ignore'):
+        compact = values.astype(np.float32)
+    # NaN is kept as NaN, a value out of the float32 range becomes inf and fails the comparison
+    if ((compact.astype(np.float64) == values) | np.isnan(values)).all():
+        return pd.Series(compact, index=series.index, name=series.name)
+    return series.astype(np.float64)
+
+
+class Schema():
+    def __init__(self, times=(), categories=(), dtypes=None):
+        """
+        The dtypes of the columns of one kind of SOXAI DataFrame.
+
+        The `times` columns are parsed as tz-aware UTC datetimes, the `categories` columns become categoricals,
+        the `dtypes` columns are cast as given, and the other columns get the smallest numeric dtype holding
+        their values exactly (int8/int16/... for integers, float32 for the floats float32 represents exactly,
+        float64 otherwise). Columns that are not numbers are left unchanged.
+
+        Parameters:
+        times (tuple, optional): The columns of ISO 8601 UTC times.
+        categories (tuple, optional): The columns with few distinct values, e.g. the uid.
+        dtypes (dict, optional): The explicit dtype of some columns.
+        """
+        self.times = tuple(times)
+        self.categories = tuple(categories)
+        self.dtypes = dict(dtypes or {})
+
+    def apply(self, df):
+        """
+        Returns `df` with the compact dtypes. Columns missing from `df` are ignored.
+        """
+        columns = {}
+        for column in df.columns:
+            series = df[column]
+            if column in self.times:
+                if not isinstance(series.dtype, pd.DatetimeTZDtype):
+                    series = pd.to_datetime(series, utc=True, format='ISO8601')
+            elif column in self.categories:
+                series = series.astype('category')
+            elif column in self.dtypes:
+                try:
+                    series = series.astype(self.dtypes[column])
+                except (TypeError, ValueError):
+                    # e.g. missing values in an integer column
+                    series = _compact_numeric(series)
+            else:
+                series = _compact_numeric(series)
+            columns[column] = series
+        return pd.DataFrame(columns, index=df.index)
+
+
+_FLUX_SCHEMA = dict(
+    times=('_start', '_stop', '_time'),
+    categories=('uid', '_measurement', 'year_week'),
+    dtypes={'utc_offset_mins': np.int16, 'year': np.int16, 'month': np.int8},
+)
+
+# The schema of each query method, applied by the loaders created with `compact_dtypes=True`.
+SCHEMAS = {
+    'SX_Daily_Prod': Schema(**_FLUX_SCHEMA),
+    'SX_Detail_Prod': Schema(**_FLUX_SCHEMA),
+    'DailyInfoV2': Schema(categories=('uid',)),
+    'DailyDataV2': Schema(categories=('uid',)),
+}
@@ -1,83 +1,297 @@
+import importlib.util
+import io
 import re
-import httpx
-import pandas as pd
+import time
 import json
-from datetime import datetime, timezone
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from .arrow import concat_tables, local_time_table, merge_flux_tables, records_table
+from .cache import _require_pyarrow
+from .export import EXPORT_KINDS, ExportReport, _ExportProgress, _ExportUnit
+from .instrumentation import Event, _rows, instrumented
+from .lazy import lazy_import
+from .partitioned import PartitionedDataset
+from .retry import BatchResult
+from .streaming import FrameStream
+from .sync import SyncedDataset
 
-class DataLoader():
-    def __init__(self, token):
-        """
-        Initializes an instance of the class.
+httpx = lazy_import('httpx')
+pd = lazy_import('pandas')
 
-        Parameters:
-        token (str): The token used for authentication, please go to https://soxai-web-api-tiufu2wgva-df.a.run.app/ and login to generate one token.
+# found without importing it, httpx imports h2 when an HTTP/2 client is created
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
 
-        Attributes:
-        url (str): The base URL of the API.
-        headers (dict): The headers used for the API requests.
-        org_id (str): The ID of the organization. Will be none for normal users.
+DEFAULT_BASE_URL = 'https://soxai-firebase.df.r.appspot.com/api/'
 
-        Usage:
+# the aggregate functions of aggregateWindow accepted by getDailyData and getDetailData
+WINDOW_AGGREGATES = ('mean', 'min', 'max', 'first', 'last', 'count', 'sum', 'median')
 
-        ##Plot the daily info data
-        ```python
-        from soxai_data import DataLoader
+# the formats of the RawData and V2 responses, see `_parse_formatted`
+RESPONSE_FORMATS = ('json', 'csv', 'arrow')
 
-        sx_data = DataLoader(token=<Your-soxai-api-token>)
-        df = sx_data.getDailyData()
-        df.plot()
-        ```
-        """
-        self.url = 'https://soxai-firebase.df.r.appspot.com/api/'
+_ARROW_STREAM_TYPE = 'application/vnd.apache.arrow.stream'
+
+# the types of the query results: NumPy-backed DataFrames, DataFrames with Arrow-backed dtypes, pyarrow Tables
+OUTPUT_TYPES = ('pandas', 'arrow', 'table')
+
+_DATETIME_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}$')
+
+# One HTTP request of a query. The loaders build the requests and parse the responses,
+# only sending them differs between DataLoader and AsyncDataLoader.
+# cache is None when the result must not be cached (relative ranges), 'historical' when the
+# requested range is in the past and 'recent' when it reaches the present.
+# stream is 'array' when the response is a JSON array of records, 'string' when that array is
+# itself encoded as a JSON string, and None when the response cannot be parsed as a stream.
+_Request = namedtuple('_Request', ['method', 'url', 'params', 'content', 'timeout', 'cache', 'stream'],
+                      defaults=(None, None, None, None, None))
+
+
+class _BaseDataLoader():
+    """
+    The query building, validation and parsing shared by DataLoader and AsyncDataLoader.
+    """
+
+    def __init__(self, token, base_url=DEFAULT_BASE_URL, max_connections=20, max_keepalive_connections=10,
+                 keepalive_expiry=30.0, http2=True, max_workers=8, daily_chunk='90D', detail_chunk='7D',
+                 uid_batch_size=100, cache=None, streaming=False, chunk_rows=100000, compact_dtypes=False,
+                 store=None, retry=None, hooks=None, memo=None, compression=True, output='pandas'):
+        if output not in OUTPUT_TYPES:
+            raise ValueError(f"Incorrect output({output}), should be one of {', '.join(OUTPUT_TYPES)}")
+        if output != 'pandas':
+            _require_pyarrow(f"output='{output}'")
+        self.url = base_url
         self.headers = {
             'Content-Type': 'text/plain',
             'soxai-api-key': token
         }
+        if not compression:
+            self.headers['Accept-Encoding'] = 'identity'
         self.org_id = None
+        self.max_workers = max_workers
+        self.daily_chunk = daily_chunk
+        self.detail_chunk = detail_chunk
+        self.uid_batch_size = uid_batch_size
+        self.cache = cache
+        self.streaming = streaming
+        self.chunk_rows = chunk_rows
+        self.compact_dtypes = compact_dtypes
+        self.store = store
+        self.retry = retry
+        self.hooks = list(hooks) if hooks else []
+        self.memo = memo
+        self.output = output
+        self.failed_uids = {}
+        self.client = self._create_client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2 and HTTP2_AVAILABLE,
+        )
 
-    def getMyInfo(self):
-        """
-        Get the account information.
+    def _create_client(self, **kwargs):
+        raise NotImplementedError
 
-        Returns:
-        dict: my personal information.
-        """
-        url = self.url + 'myOrg'
-        response = httpx.get(url, headers=self.headers)
-        data = response.json()
-        # return response.json()
+    def _attempt_timeout(self, request, started):
+        # the timeout of one attempt, shortened to end by the deadline of the request
+        if self.retry is None or self.retry.deadline is None:
+            return httpx.USE_CLIENT_DEFAULT if request.timeout is None else httpx.Timeout(request.timeout)
+        remaining = max(0.001, self.retry.deadline - (time.monotonic() - started))
+        return httpx.Timeout(remaining if request.timeout is None else min(request.timeout, remaining))
+
+    def _retry_delay(self, attempt, started, error=None, response=None):
+        # the seconds to wait before retrying the failed attempt, or None to give up
+        if self.retry is None or not self.retry.should_retry(attempt, error, response):
+            return None
+        delay = self.retry.delay(attempt, response)
+        if self.retry.deadline is not None and time.monotonic() - started + delay >= self.retry.deadline:
+            return None
+        return delay
+
+    def _emit(self, kind, name, seconds, **fields):
+        # sends an event to the hooks, a failing hook does not fail the query
+        event = Event(kind, name, seconds, time=time.time(), **fields)
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print("Error in the instrumentation hook", e)
+
+    def _timed(self, name, fn, *args, **kwargs):
+        # calls fn, sending a 'phase' event to the hooks
+        if not self.hooks:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self._emit('phase', name, time.perf_counter() - started, rows=_rows(result))
+        return result
+
+    def _endpoint(self, request):
+        # the path of the request without the base url, uid and query, e.g. 'v2/DailyInfoData'
+        path = request.url[len(self.url):] if request.url.startswith(self.url) else request.url
+        path = path.split('?')[0]
+        for endpoint in ('RawData', 'v2/DailyInfoData', 'v2/DailyDetailData'):
+            if path.startswith(endpoint + '/'):
+                return endpoint
+        return path
+
+    def _request_stats(self):
+        # the measurements of one request, only collected when the loader has hooks
+        return {'started': time.perf_counter(), 'phases': {}} if self.hooks else None
+
+    def _record_cache(self, stats, key, result):
+        if stats is not None and key is not None:
+            stats['cache'] = 'miss' if result is None else 'hit'
+
+    def _record_attempt(self, stats, attempt, attempt_started, response=None):
+        # the last attempt of a request, after `attempt` retries
+        if stats is None:
+            return
+        stats['retries'] = attempt
+        stats['phases']['wait'] = time.perf_counter() - attempt_started
+        if attempt > 0:
+            # the failed attempts and the backoff
+            stats['phases']['retrying'] = attempt_started - stats['started']
+        if response is not None:
+            stats['status'] = response.status_code
+
+    def _parse(self, response, parse, stats):
+        if stats is None:
+            return parse(response)
+        stats['bytes'] = response.num_bytes_downloaded
+        # response.json is wrapped to time the JSON decoding apart from the DataFrame building
+        json_method = response.json
+        decode = [0.0]
+
+        def timed_json(**kwargs):
+            started = time.perf_counter()
+            try:
+                return json_method(**kwargs)
+            finally:
+                decode[0] += time.perf_counter() - started
+
+        response.json = timed_json
+        started = time.perf_counter()
+        result = parse(response)
+        stats['phases']['decode'] = decode[0]
+        stats['phases']['build'] = time.perf_counter() - started - decode[0]
+        return result
+
+    def _emit_request(self, request, stats, result=None, error=None):
+        if stats is None:
+            return
+        self._emit('request', self._endpoint(request), time.perf_counter() - stats['started'],
+                   phases=stats['phases'], bytes=stats.get('bytes'), rows=_rows(result), status=stats.get('status'),
+                   retries=stats.get('retries', 0), cache=stats.get('cache'),
+                   error=None if error is None else repr(error))
+
+    def _exhausted(self, response):
+        # a retried status still answered by the last attempt is raised instead of parsed
+        return self.retry is not None and response.status_code in self.retry.statuses
+
+    def _cache_lookup(self, request):
+        # returns the cache key of the request, or None, and the cached result, or None
+        if self.cache is None or request.cache is None:
+            return None, None
+        params = sorted(request.params.items()) if request.params else None
+        # the results are keyed by token, the loaders sharing a cache directory only read their own data
+        key = self.cache.key(self.headers['soxai-api-key'], request.method, request.url, params, request.content)
+        return key, self._as_table(self.cache.get(key))
+
+    def _cache_store(self, key, request, response, result):
+        if key is not None and response.is_success:
+            self.cache.put(key, result, recent=request.cache == 'recent')
+
+    def _memo_key(self, request):
+        # the key of the request in self.memo, from its normalised parameters and body, or None. The parsed
+        # results are DataFrames or Tables depending on the output, which is part of the key of a shared memo
+        if self.memo is None:
+            return None
+        params = sorted(request.params.items()) if request.params else None
+        content = ' '.join(request.content.split()) if request.content else None
+        return self.memo.key(self.headers['soxai-api-key'], self.output, request.method, request.url, params, content)
+
+    def _cache_state(self, start, stop):
+        # start and stop are epoch seconds, or relative Flux times such as '-7d' and 'now()'
+        if isinstance(start, str):
+            return None
+        if isinstance(stop, str) or stop > self._to_epoch(pd.Timestamp.now(tz='UTC')):
+            return 'recent'
+        return 'historical'
+
+    def _frame_stream(self, request, chunk_rows=None):
+        return FrameStream(double_encoded=request.stream == 'string',
+                           chunk_rows=self.chunk_rows if chunk_rows is None else chunk_rows)
+
+    def _concat_frames(self, frames):
+        if len(frames) == 0:
+            return self._output_frame(pd.DataFrame())
+        if not isinstance(frames[0], pd.DataFrame):
+            return concat_tables(frames)
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def _records_frame(self, records):
+        # the frame of decoded JSON records, a pyarrow Table unless the output is 'pandas'
+        if self.output == 'pandas':
+            return pd.DataFrame(records)
+        return records_table(records)
+
+    def _as_table(self, frame):
+        # the frames built as DataFrames (streamed, cached or read from the store) join the Tables of the other results
+        if self.output == 'pandas' or not isinstance(frame, pd.DataFrame):
+            return frame
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+    def _to_pandas(self, frame):
+        # the DataFrame of a result, for the steps writing DataFrames (store, sync, export)
+        if frame is None or isinstance(frame, pd.DataFrame):
+            return frame
+        return frame.to_pandas()
+
+    def _output_frame(self, frame, local_time=False):
+        # the value returned by a query method: the DataFrame, the Table, or the DataFrame with Arrow-backed
+        # dtypes of the Table, indexed by local time like post_process_data
+        if frame is None or self.output == 'pandas':
+            return frame
+        table = self._as_table(frame)
+        if self.output == 'table':
+            return table
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        return df.set_index('local_time') if local_time else df
+
+    def _local_time(self, frame):
+        if isinstance(frame, pd.DataFrame):
+            return self.post_process_data(frame)
+        return local_time_table(frame)
+
+    def _query_request(self, query, timeout):
+        return _Request('POST', self.url + 'queryData', content=query, timeout=timeout, stream='array')
+
+    def _my_info_request(self):
+        return _Request('GET', self.url + 'myOrg')
+
+    def _parse_my_info(self, response):
+        return response.json()
+
+    def _read_org_id(self, data):
         try:
             if 'isOrgUser' in data.keys() and data['isOrgUser']:
                 self.org_id = data['myOrg']['orgId']
         except:
             pass
         return data
-            
-    
-    def getMyOrgUsers(self, org_id=None):
-        """
-        Retrieves the users associated with the specified organization.
 
-        Args:
-            org_id (str, optional): The ID of the organization. If not provided, the method will use the default organization ID.
+    def _org_users_request(self, org_id=None):
+        return _Request('GET', self.url + 'orgs/' + (org_id or self.org_id) + '/orgUsers')
 
-        Returns:
-            pd.DataFrame: The DataFrame containing the users associated with the specified organization.
-
-        Raises:
-            None
-
-        """
-        if self.org_id is None:
-            _ = self.getMyInfo()
-            if self.org_id is None:
-                return None
-        org_id = self.org_id if org_id is None else org_id
-        url = self.url + 'orgs/' + self.org_id + '/orgUsers'
-        response = httpx.get(url, headers=self.headers)
+    def _parse_org_users(self, response):
         try:
             data = response.json()
-            return pd.DataFrame(data)
+            return self._records_frame(data)
         except:
             return None
 
@@ -96,99 +310,337 @@ class DataLoader():
         # If the range statement is not found, the original query statement is returned directly
         raise Exception('Cannot find range statement in flux query')
 
-    def getDailyData(self, start_date=None, end_date=None, convert_to_local_time=True, uid_list:list = [], timeout=60.0):
-        """
-        Retrieves daily data from the SOXAI database within the specified date range.
+    def _to_epoch(self, date):
+        return int(pd.Timestamp(date).timestamp())
 
-        Args:
-            start_date (str, optional): The start date of the data range. Defaults to '-7d'.
-            end_date (str, optional): The end date of the data range. Defaults to 'now()'.
-            convert_to_local_time (booleanm, optional): The flag to change to local time.
-            uid_list (list): The uid to specify in the condition.
-            timeout (float, optional): The timeout in seconds. (Up to 120.0)
+    def _query_fields(self, fields, convert_to_local_time):
+        # the fields of the projection, the time and uid columns are always returned
+        if not fields:
+            return None
+        fields = [field for field in fields if field not in ('_time', 'uid')]
+        if convert_to_local_time and 'utc_offset_mins' not in fields:
+            fields.append('utc_offset_mins')
+        return fields
 
-        Returns:
-            pandas.DataFrame: A DataFrame containing the retrieved data.
+    def _window_seconds(self, every, agg):
+        # the length of the aggregation windows in whole seconds
+        if agg not in WINDOW_AGGREGATES:
+            raise ValueError(f"Incorrect agg({agg}), should be one of {', '.join(WINDOW_AGGREGATES)}")
+        seconds = int(pd.Timedelta(every).total_seconds())
+        if seconds < 1:
+            raise ValueError(f"Incorrect every({every}), should be at least one second")
+        return seconds
 
-        Raises:
-            Exception: If there is an error in querying the data.
+    def _flux_steps(self, fields, every, agg, exclude=None):
+        # the field filter and window aggregation of one stream of the query
+        steps = ''
+        if fields is not None:
+            field_filter = ' or '.join([f'r["_field"] == "{field}"' for field in fields])
+            steps += """|> filter(fn: (r) => {})
+                    """.format(field_filter)
+        elif exclude is not None:
+            steps += """|> filter(fn: (r) => r["_field"] != "{}")
+                    """.format(exclude)
+        if every is not None:
+            # each field is downsampled by the server, a row is stamped with the start of its window
+            steps += """|> aggregateWindow(every: {}s, fn: {}, timeSrc: "_start", createEmpty: false)
+                    """.format(self._window_seconds(every, agg), agg)
+        return steps
 
-        """
-        url = self.url + 'queryData'
-        if start_date is None:
-            start_date = '-7d'
-        else:
-            start_date = int(pd.Timestamp(start_date).timestamp())
-        if end_date is None:
-            end_date = 'now()'
+    def _flux_query(self, measurement, start, stop, uid_list, fields=None, every=None, agg='mean'):
+        source = """from(bucket: "SOXAI")
+                    |> range(start: {}, stop: {} )
+                    |> filter(fn: (r) => r["_measurement"] == "{}")
+                    """.format(start, stop, measurement)
+        if every is not None and agg != 'last' and (fields is None or 'utc_offset_mins' in fields):
+            # the sum or count of the utc offsets is no offset: the last one of each window is aggregated in a
+            # stream of its own, which is merged with the stream of the other fields before the pivot
+            others = None if fields is None else [field for field in fields if field != 'utc_offset_mins']
+            streams = [self._flux_steps(['utc_offset_mins'], every, 'last')]
+            if others is None or len(others) > 0:
+                streams.insert(0, self._flux_steps(others, every, agg, exclude='utc_offset_mins'))
+            query = """data = {}
+                union(tables: [
+                    {}
+                ])
+                    """.format(source.rstrip(), ',\n                    '.join(
+                        'data\n                    ' + stream.rstrip() for stream in streams))
         else:
-            end_date = int(pd.Timestamp(end_date).timestamp())
+            query = source + self._flux_steps(fields, every, agg)
+        if fields is not None:
+            # the _start, _stop and _measurement columns are dropped before the pivot
+            query += """|> keep(columns: ["_time", "uid", "_field", "_value"])
+                    """
+        query += """|> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+                """
 
-        query = """from(bucket: "SOXAI")
-                    |> range(start: {}, stop: {} )
-                    |> filter(fn: (r) => r["_measurement"] == "SX_Daily_Prod") 
-                    |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
-                """.format(start_date, end_date)
-        
         if len(uid_list) > 0:
             query = self.add_uid_filter_to_flux_query(query, uid_list)
+        return query
 
-        try:
-            response = httpx.post(url, headers=self.headers, data=query, timeout=httpx.Timeout(timeout))
-            data = response.json()
-            df =  pd.DataFrame(data)
-            if convert_to_local_time:
-                df = self.post_process_data(df)
-            return df
-        except Exception as e:
-            print("Error in querying the data", e)
-            return None
-        
-    def getDetailData(self, start_date=None, end_date=None, convert_to_local_time=True, uid_list:list = [], timeout=60.0):
+    def split_time_range(self, start, stop, chunk):
         """
-        Retrieves daily detail data from the SOXAI database.
+        Splits a time range into consecutive windows aligned on multiples of `chunk` since the epoch.
 
         Args:
-            start_date (str or None): The start date of the data range in the format 'YYYY-MM-DD'. If None, the default is '-1d' (one day ago).
-            end_date (str or None): The end date of the data range in the format 'YYYY-MM-DD'. If None, the default is 'now()' (current date and time).
-            convert_to_local_time (booleanm, optional): The flag to change to local time.
-            uid_list (list): The uid to specify in the condition.
-            timeout (float, optional): The timeout in seconds. (Up to 120.0)
+            start (int): The start of the range in epoch seconds.
+            stop (int or str): The end of the range in epoch seconds, or 'now()'.
+            chunk (str or pd.Timedelta): The window length, e.g. '7D'. None returns the range as one window.
 
         Returns:
-            pandas.DataFrame or None: The retrieved data as a pandas DataFrame, or None if an error occurred during the data retrieval.
+            list: The (start, stop) of each window. The last window keeps `stop` as given.
+        """
+        if chunk is None:
+            return [(start, stop)]
+        step = int(pd.Timedelta(chunk).total_seconds())
+        end = self._to_epoch(pd.Timestamp.now(tz='UTC')) if stop == 'now()' else stop
+        windows = []
+        window_start = start
+        window_stop = (start // step + 1) * step
+        while window_stop < end:
+            windows.append((window_start, window_stop))
+            window_start, window_stop = window_stop, window_stop + step
+        windows.append((window_start, stop))
+        return windows
+
+    def split_uid_list(self, uid_list, batch_size=None):
+        """
+        Splits a uid list into batches of at most `batch_size` uids.
 
+        Args:
+            uid_list (list): The uids to split. An empty list (no uid filter) gives one empty batch.
+            batch_size (int, optional): The maximum number of uids per batch. Defaults to `self.uid_batch_size`.
+
+        Returns:
+            list: The uid batches.
         """
-        url = self.url + 'queryData'
+        batch_size = self.uid_batch_size if batch_size is None else batch_size
+        if len(uid_list) == 0 or not batch_size:
+            return [list(uid_list)]
+        return [list(uid_list[i:i + batch_size]) for i in range(0, len(uid_list), batch_size)]
+
+    def _flux_requests(self, measurement, start_date, end_date, default_start, uid_list, timeout, chunk,
+                       fields=None, every=None, agg='mean'):
+        end = 'now()' if end_date is None else self._to_epoch(end_date)
+        if every is not None and chunk is not None:
+            # the query windows are multiples of the aggregation windows, which never straddle two queries
+            every_delta = pd.Timedelta(seconds=self._window_seconds(every, agg))
+            chunk = every_delta * max(1, -(-pd.Timedelta(chunk) // every_delta))
         if start_date is None:
-            start_date = '-1d'
-        else:
-            start_date = int(pd.Timestamp(start_date).timestamp())
-        if end_date is None:
-            end_date = 'now()'
+            # relative ranges are short, they are sent as one query
+            windows = [(default_start, end)]
         else:
-            end_date = int(pd.Timestamp(end_date).timestamp())
+            windows = self.split_time_range(self._to_epoch(start_date), end, chunk)
+        return [
+            _Request('POST', self.url + 'queryData', content=self._flux_query(measurement, start, stop, uid_batch, fields, every, agg),
+                     timeout=timeout, cache=self._cache_state(start, stop), stream='array')
+            for start, stop in windows
+            for uid_batch in self.split_uid_list(uid_list)
+        ]
 
-        query = """from(bucket: "SOXAI")
-                    |> range(start: {}, stop: {} )
-                    |> filter(fn: (r) => r["_measurement"] == "SX_Detail_Prod") 
-                    |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
-                """.format(start_date, end_date)
+    def _parse_flux(self, response):
+        return self._records_frame(response.json())
 
-        if len(uid_list) > 0:
-            query = self.add_uid_filter_to_flux_query(query, uid_list)
+    def _compact(self, df, kind):
+        # kind is the measurement, or the V2 method, keying the schema
+        if not self.compact_dtypes or not isinstance(df, pd.DataFrame):
+            return df
+        from .schema import SCHEMAS
+
+        return self._timed('compact', SCHEMAS[kind].apply, df)
 
+    def _request_uids(self, uid_list, n_requests):
+        # the uid batch of each request built by _flux_requests, ordered by window then uid batch
+        batches = self.split_uid_list(uid_list)
+        return [batches[i % len(batches)] for i in range(n_requests)]
+
+    def _failed_uids(self, request_uids, results):
+        # the error of each uid whose request failed, a failed query without uid filter is keyed by None
+        failed = {}
+        for uids, result in zip(request_uids, results):
+            if isinstance(result, Exception):
+                for uid in uids or [None]:
+                    failed.setdefault(uid, result)
+        return failed
+
+    def _batch_result(self, data, uid_list, failed):
+        for uid, error in failed.items():
+            if uid is not None:
+                print(f"Error in querying the data (uid: {uid})", error)
+        return BatchResult(data, [uid for uid in uid_list if uid not in failed], failed)
+
+    def _merge_flux(self, results, failed):
+        if not isinstance(results[0], pd.DataFrame):
+            return merge_flux_tables(results, failed)
+        df = pd.concat(results, ignore_index=True) if len(results) > 1 else results[0]
+        if len(failed) > 0 and 'uid' in df.columns:
+            # a uid missing some windows is failed rather than returned incomplete
+            df = df[~df['uid'].isin(list(failed))].reset_index(drop=True)
+        if len(results) > 1 and '_time' in df.columns:
+            # the same point may be returned by the two windows sharing a boundary,
+            # sorting by uid restores the grouping of a single query
+            keys = [column for column in ['uid', '_time'] if column in df.columns]
+            df = df.drop_duplicates(subset=keys).sort_values(keys, kind='stable').reset_index(drop=True)
+        return df
+
+    def _flux_frame(self, results, convert_to_local_time, measurement, uid_list=(), return_result=False):
+        # results are the DataFrame or the raised exception of each window and uid batch
+        failed = self._failed_uids(self._request_uids(uid_list, len(results)), results)
+        df = None
         try:
-            response = httpx.post(url, headers=self.headers, data=query, timeout=httpx.Timeout(timeout))
-            data = response.json()
-            df =  pd.DataFrame(data)
-            if convert_to_local_time:
-                df = self.post_process_data(df)
-            return df
+            if len(failed) > 0 and (not return_result or None in failed):
+                # without return_result, one failed request fails the whole query
+                raise next(iter(failed.values()))
+            results = [result for result in results if not isinstance(result, Exception)]
+            if len(results) > 0:
+                df = self._timed('merge', self._merge_flux, results, failed)
+                df = self._compact(df, measurement)
+                if convert_to_local_time:
+                    df = self._timed('post_process_data', self._local_time, df)
+                df = self._output_frame(df, convert_to_local_time)
         except Exception as e:
             print("Error in querying the data", e)
-            return None
-        
+            df = None
+        if return_result:
+            return self._batch_result(df, uid_list, failed)
+        return df
+
+    def _store_requests(self, measurement, start_date, end_date, default_start, uid_list, timeout, chunk):
+        # the absolute range of a query answered from the store, the ranges missing from the store
+        # for each uid, and the requests fetching them with their uid batches
+        now = pd.Timestamp.now(tz='UTC').floor('s')
+        start = now + pd.Timedelta(default_start) if start_date is None else pd.Timestamp(start_date)
+        stop = now if end_date is None else pd.Timestamp(end_date)
+        missing = {}
+        for uid in uid_list:
+            for gap in self.store.missing(measurement, uid, start, stop):
+                missing.setdefault(gap, []).append(uid)
+        covered = {}
+        requests = []
+        request_uids = []
+        for (gap_start, gap_stop), uids in missing.items():
+            # the uids missing the same range, usually all of them, are fetched together
+            for uid in uids:
+                covered.setdefault(uid, []).append((gap_start, gap_stop))
+            gap_requests = self._flux_requests(measurement, gap_start, gap_stop, default_start, uids, timeout, chunk)
+            requests += gap_requests
+            request_uids += self._request_uids(uids, len(gap_requests))
+        return (start, stop), covered, requests, request_uids
+
+    def _store_frame(self, results, convert_to_local_time, measurement, span, uid_list, covered, request_uids,
+                     fields=None, return_result=False):
+        # writes the fetched ranges through to the store, then answers the query from the store
+        failed = self._failed_uids(request_uids, results)
+        df = None
+        try:
+            if len(failed) > 0 and not return_result:
+                raise next(iter(failed.values()))
+            frames = [self._to_pandas(result) for result in results
+                      if not isinstance(result, Exception) and len(result) > 0]
+            rows = {}
+            if len(frames) > 0:
+                df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+                rows = {uid: df_uid for uid, df_uid in df.groupby('uid', sort=False)}
+            for uid, gaps in covered.items():
+                if uid not in failed:
+                    self._timed('store_write', self.store.write, measurement, uid, rows.get(uid, pd.DataFrame()),
+                                covered=gaps)
+            succeeded = [uid for uid in uid_list if uid not in failed]
+            df = None
+            if len(succeeded) > 0:
+                # the store keeps all the fields, the projection is applied when reading it
+                df = self._timed('store_query', self.store.query, measurement, span[0], span[1], succeeded, fields)
+                df = self._compact(self._as_table(df), measurement)
+                if convert_to_local_time:
+                    df = self._timed('post_process_data', self._local_time, df)
+                df = self._output_frame(df, convert_to_local_time)
+        except Exception as e:
+            print("Error in querying the data", e)
+            df = None
+        if return_result:
+            return self._batch_result(df, uid_list, failed)
+        return df
+
+    def _bucket_cached(self, start_date, uid_list, chunk):
+        # whether a Flux query is cached per uid and bucket, the relative ranges are never cached
+        return self.cache is not None and start_date is not None and len(uid_list) > 0 and chunk is not None
+
+    def _bucket_requests(self, measurement, start_date, end_date, uid_list, timeout, chunk, fields, every, agg):
+        # a cached query covers whole buckets of `chunk` aligned on the epoch, each uid of each bucket being an
+        # entry of the cache. Returns the range of the query, the cache key of each (bucket, uid), the cached
+        # frames found, and the requests of the missing entries with their bucket and uid batch
+        start = self._to_epoch(start_date)
+        stop = self._to_epoch(pd.Timestamp.now(tz='UTC') if end_date is None else end_date)
+        step = int(pd.Timedelta(chunk).total_seconds())
+        if every is not None:
+            # the buckets are multiples of the aggregation windows, the window holding start is returned whole
+            every_seconds = self._window_seconds(every, agg)
+            step = every_seconds * max(1, -(-step // every_seconds))
+            start = start // every_seconds * every_seconds
+        token = self.headers['soxai-api-key']
+        keys, found, missing = {}, {}, {}
+        for bucket_start in range(start // step * step, stop, step):
+            bucket = (bucket_start, bucket_start + step)
+            for uid in uid_list:
+                # the key of the query of this uid alone, keyed by token like those of _cache_lookup
+                content = self._flux_query(measurement, *bucket, [uid], fields, every, agg)
+                keys[bucket, uid] = self.cache.key(token, 'POST', self.url + 'queryData', None, content)
+                df = self.cache.get(keys[bucket, uid])
+                if df is None:
+                    missing.setdefault(bucket, []).append(uid)
+                else:
+                    found[bucket, uid] = df
+        requests = []
+        request_buckets = []
+        for bucket, uids in missing.items():
+            # the uids missing the same bucket are fetched together, the entries are written by _bucket_frame
+            for uid_batch in self.split_uid_list(uids):
+                requests.append(_Request('POST', self.url + 'queryData', timeout=timeout, stream='array',
+                                         content=self._flux_query(measurement, *bucket, uid_batch, fields, every, agg)))
+                request_buckets.append((bucket, uid_batch))
+        return (start, stop), keys, found, requests, request_buckets
+
+    def _bucket_frame(self, results, convert_to_local_time, measurement, span, uid_list, keys, found, request_buckets,
+                      return_result=False):
+        # writes the fetched buckets to the cache split by uid, then answers the query from the buckets
+        failed = self._failed_uids([uids for _, uids in request_buckets], results)
+        df = None
+        try:
+            if len(failed) > 0 and not return_result:
+                raise next(iter(failed.values()))
+            now = self._to_epoch(pd.Timestamp.now(tz='UTC'))
+            frames = dict(found)
+            for (bucket, uids), result in zip(request_buckets, results):
+                if isinstance(result, Exception):
+                    continue
+                result = self._to_pandas(result)
+                rows = {uid: df_uid for uid, df_uid in result.groupby('uid', sort=False)} if len(result) > 0 else {}
+                for uid in uids:
+                    # the uids without rows are cached too, as empty entries
+                    frames[bucket, uid] = rows.get(uid, result.iloc[:0]).reset_index(drop=True)
+                    self._timed('cache_write', self.cache.put, keys[bucket, uid], frames[bucket, uid],
+                                recent=bucket[1] > now)
+            frames = [frames[entry] for entry in keys if entry[1] not in failed]
+            if len(frames) > 0:
+                df = pd.concat(frames, ignore_index=True)
+                if '_time' in df.columns:
+                    # the buckets are trimmed to the range of the query
+                    times = pd.to_datetime(df['_time'], utc=True, format='ISO8601')
+                    df = df[(times >= pd.Timestamp(span[0], unit='s', tz='UTC'))
+                            & (times < pd.Timestamp(span[1], unit='s', tz='UTC'))]
+                    columns = [column for column in ['uid', '_time'] if column in df.columns]
+                    df = df.sort_values(columns, kind='stable').reset_index(drop=True)
+                df = self._compact(self._as_table(df), measurement)
+                if convert_to_local_time:
+                    df = self._timed('post_process_data', self._local_time, df)
+                df = self._output_frame(df, convert_to_local_time)
+        except Exception as e:
+            print("Error in querying the data", e)
+            df = None
+        if return_result:
+            return self._batch_result(df, uid_list, failed)
+        return df
+
     def post_process_data(self,df):
         """
         Post process the data to make it more readable.
@@ -202,68 +654,55 @@ class DataLoader():
         """
         df['local_time'] = pd.to_datetime(df['_time']) + pd.to_timedelta(df['utc_offset_mins'], unit='minutes')
         # drop ['_start', '_stop', '_time'] columns
-        df.drop(['_start', '_stop', '_time', '_measurement'], axis=1, inplace=True)
+        df.drop(['_start', '_stop', '_time', '_measurement'], axis=1, inplace=True, errors='ignore')
         df = df.set_index('local_time')
         return df
-    
 
-    def getRawData(self, uid, start_date=None, end_date=None, timeout=5.0):
-        """
-        Retrieves raw data from the SOXAI database within the specified date range.
+    def _check_format(self, format):
+        if format not in RESPONSE_FORMATS:
+            raise ValueError(f"Incorrect format({format}), should be one of {', '.join(RESPONSE_FORMATS)}")
+        if format == 'arrow':
+            _require_pyarrow("format='arrow'")
 
-        Args:
-            uid (str): The uid to specify in the condition
-            start_date (str, optional): The start date of the data range. Defaults to '-7d'.
-            end_date (str, optional): The end date of the data range. Defaults to 'now()'.
-            convert_to_local_time (booleanm, optional): The flag to change to local time
-            timeout (float, optional): The timeout in seconds (Up to 60.0)
+    def _format_parser(self, format, parse):
+        # the JSON responses are parsed by `parse`, the other formats by _parse_formatted
+        if format == 'json':
+            return parse
+        return lambda response: self._parse_formatted(response, parse)
 
-        Returns:
-            pandas.DataFrame: A DataFrame containing the retrieved data.
-
-        Raises:
-            Exception: If there is an error in querying the data.
-
-        """
-        if start_date is None:
-            start_date = '-7d'
-        else:
-            start_date = int(pd.Timestamp(start_date).timestamp())
-        if end_date is None:
-            end_date = 'now()'
-        else:
-            end_date = int(pd.Timestamp(end_date).timestamp())
+    def _parse_formatted(self, response, parse):
+        # the response is parsed as announced by its Content-Type, as JSON if the server ignored the format
+        content_type = response.headers.get('Content-Type', '')
+        if content_type.startswith('text/csv'):
+            if len(response.content) == 0:
+                return self._records_frame([])
+            if self.output != 'pandas':
+                import pyarrow.csv
 
-        url = self.url + f'RawData/{uid}'
-        query = f"?page=0&start_time={start_date}&stop_time={end_date}&format=json"
+                return pyarrow.csv.read_csv(io.BytesIO(response.content))
+            return pd.read_csv(io.BytesIO(response.content))
+        if content_type.startswith(_ARROW_STREAM_TYPE):
+            import pyarrow as pa
 
-        try:
-            response = httpx.get(url + query, headers=self.headers, timeout=httpx.Timeout(timeout))
-            data = json.loads(response.json())
-            df =  pd.DataFrame(data)
-            return df
-        except Exception as e:
-            print("Error in querying the data", e)
-            return None
+            stream = pa.ipc.open_stream(response.content)
+            return stream.read_pandas() if self.output == 'pandas' else stream.read_all()
+        return parse(response)
 
-    def getDailyInfoV2(self, start_date=None, end_date=None, uid_list:list = [], timeout=60.0):
-        """
-        Retrieves daily info data from the SOXAI database within the specified date range.
+    def _raw_data_request(self, uid, start_date, end_date, timeout, page=0, format='json'):
+        start_date = '-7d' if start_date is None else self._to_epoch(start_date)
+        end_date = 'now()' if end_date is None else self._to_epoch(end_date)
 
-        Args:
-            start_date (str, optional): The start date of the data range. Formats like 'YYYY-MM-DD'. Defaults to 7 days before the current date.
-            end_date (str, optional): The end date of the data range. Formats like 'YYYY-MM-DD'. Defaults to the current date.
-            uid_list (list): The uid to specify in the condition.
-            timeout (float, optional): The timeout in seconds. (Up to 120.0)
-        
-        Returns:
-            pandas.DataFrame: A DataFrame containing the retrieved data.
+        url = self.url + f'RawData/{uid}'
+        query = f"?page={page}&start_time={start_date}&stop_time={end_date}&format={format}"
+        return _Request('GET', url + query, timeout=timeout, cache=self._cache_state(start_date, end_date),
+                        stream='string' if format == 'json' else None)
 
-        Raises:
-            Exception: If there is an error in querying the data.
-        """
-        url = self.url + 'v2/DailyInfoData/'
+    def _parse_raw_data(self, response):
+        data = json.loads(response.json())
+        df = self._records_frame(data)
+        return df
 
+    def _daily_info_v2_range(self, start_date, end_date):
         # date format check
         if start_date:
             try:
@@ -273,7 +712,7 @@ class DataLoader():
         else:
             # calculate the before 7 days date from now
             start_date = (datetime.now(timezone.utc) - pd.Timedelta(days=7)).date().strftime("%Y-%m-%d")
-        
+
         if end_date:
             try:
                 datetime.strptime(end_date, "%Y-%m-%d")
@@ -285,44 +724,36 @@ class DataLoader():
         # date range check
         if datetime.strptime(start_date, "%Y-%m-%d") > datetime.strptime(end_date, "%Y-%m-%d"):
             raise ValueError(f"start_date({start_date}) must not be after end_date({end_date})")
+        return start_date, end_date
 
-        # send request for each uid and combine the data
-        fetched_data_list = []
-        for uid in uid_list:
-            request_url = url + f"{uid}?start_day={start_date}&end_day={end_date}&format=json"
-            try:
-                response = httpx.get(request_url, headers=self.headers, timeout=httpx.Timeout(timeout))
-                data = response.json()
-                fetched_data_list.extend(data)
-            except Exception as e:
-                print("Error in querying the data", e)
-                return None
-            
-        # data length check
-        if len(fetched_data_list) == 0:
-            print("No data fetched for the given uid list and date range.")
-            return None
-        
-        # cpmvert the data to dataframe
-        df = pd.DataFrame(fetched_data_list)
-        return df
-    
-    def getDailyDataV2(self, start_datetime: str, end_datetime: str, uid_list: list = [], timeout: float = 60.0):
-        """
-        Retrieves daily detail data from the SOXAI v2 API within the specified datetime range.
+    def _daily_info_v2_buckets(self, start_date, end_date):
+        # the day ranges the V2 daily info is queried in. With a cache, the last days, which keep changing, are
+        # queried apart so that only their entry expires and the older days stay cached
+        start_date, end_date = self._daily_info_v2_range(start_date, end_date)
+        recent = (datetime.now(timezone.utc) - timedelta(days=1)).date()
+        first = datetime.strptime(start_date, "%Y-%m-%d").date()
+        last = datetime.strptime(end_date, "%Y-%m-%d").date()
+        if self.cache is None or first >= recent or last < recent:
+            return [(start_date, end_date)]
+        return [(start_date, (recent - timedelta(days=1)).strftime("%Y-%m-%d")), (recent.strftime("%Y-%m-%d"), end_date)]
 
-        args:
-            - start_datetime : Start datetime string in 'YYYY-MM-DDThh:mm:ss+HH:MM' format (timezone required). e.g. '2026-01-20T00:00:00+09:00'
-            - end_datetime : End datetime string in 'YYYY-MM-DDThh:mm:ss+HH:MM' format (timezone required). e.g. '2026-01-20T02:00:00+09:00'
-            - uid_list : List of uids to fetch data for.
-            - timeout : Timeout in seconds. (Up to 120.0)
-        returns:
-            - pandas.DataFrame containing the retrieved data, or None if no data or error.
-        raises:
-            - ValueError: If the datetime format is invalid, timezone is missing, or start_datetime is not before end_datetime.
-        """
+    def _daily_info_v2_requests(self, start_date, end_date, uid_list, timeout, format='json'):
+        url = self.url + 'v2/DailyInfoData/'
+        start_date, end_date = self._daily_info_v2_range(start_date, end_date)
+
+        # the last days may still be updated, whatever the timezone of the user
+        recent = datetime.strptime(end_date, "%Y-%m-%d").date() >= (datetime.now(timezone.utc) - timedelta(days=1)).date()
+        return {
+            uid: _Request('GET', url + f"{uid}?start_day={start_date}&end_day={end_date}&format={format}", timeout=timeout,
+                          cache='recent' if recent else 'historical', stream='array' if format == 'json' else None)
+            for uid in uid_list
+        }
+
+    def _parse_daily_info_v2(self, response):
+        return self._records_frame(response.json())
+
+    def _daily_data_v2_requests(self, start_datetime, end_datetime, uid_list, timeout, format='json'):
         url = self.url + 'v2/DailyDetailData/'
-        _DATETIME_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}$')
 
         # validate start_datetime
         if not _DATETIME_PATTERN.fullmatch(start_datetime):
@@ -352,30 +783,707 @@ class DataLoader():
                 f"start_datetime({start_datetime}) must be before end_datetime({end_datetime})"
             )
 
-        # send request for each uid and combine the data
+        params = {
+            "start_day": start_datetime,
+            "end_day": end_datetime,
+            "format": format,
+        }
+        cache = 'recent' if parsed_end >= datetime.now(timezone.utc) else 'historical'
+        return {
+            uid: _Request('GET', url + uid, params=params, timeout=timeout, cache=cache,
+                          stream='array' if format == 'json' else None)
+            for uid in uid_list
+        }
+
+    def _parse_daily_data_v2(self, response):
+        data = response.json()
+        if not isinstance(data, list):
+            return self._records_frame([])
+        return self._records_frame(data)
+
+    def _join_buckets(self, uid_list, results):
+        # results are ordered by uid then bucket, a uid fails when one of its buckets failed
+        n_buckets = len(results) // len(uid_list) if len(uid_list) > 0 else 0
+        joined = []
+        for i in range(len(uid_list)):
+            parts = results[i * n_buckets:(i + 1) * n_buckets]
+            errors = [part for part in parts if isinstance(part, Exception)]
+            joined.append(errors[0] if len(errors) > 0 else self._concat_frames(parts))
+        return joined
+
+    def _collect_per_uid(self, uid_list, results):
+        # results are the fetched DataFrame or the raised exception of each uid
+        self.failed_uids = {}
         fetched_data_list = []
-        for uid in uid_list:
-            request_url = url + uid
-            params = {
-                "start_day": start_datetime,
-                "end_day": end_datetime,
-                "format": "json",
-            }
-            try:
-                response = httpx.get(request_url, headers=self.headers, params=params, timeout=httpx.Timeout(timeout))
-                data = response.json()
-                if not isinstance(data, list):
-                    continue
-                fetched_data_list.extend(data)
-            except Exception as e:
-                print("Error in querying the data", e)
-                return None
+        for uid, result in zip(uid_list, results):
+            if isinstance(result, Exception):
+                print(f"Error in querying the data (uid: {uid})", result)
+                self.failed_uids[uid] = result
+            else:
+                fetched_data_list.append(result)
+        return fetched_data_list
+
+    def _collect_sync(self, uid_list, results):
+        # results are the number of appended rows or the raised exception of each uid
+        self.failed_uids = {}
+        appended = {}
+        for uid, result in zip(uid_list, results):
+            if isinstance(result, Exception):
+                print(f"Error in syncing the data (uid: {uid})", result)
+                self.failed_uids[uid] = result
+            else:
+                appended[uid] = result
+        return appended
 
+    def _v2_frame(self, fetched_data_list, range_name, kind):
         # data length check
+        fetched_data_list = [df for df in fetched_data_list if len(df) > 0]
         if len(fetched_data_list) == 0:
-            print("No data fetched for the given uid list and datetime range.")
+            print(f"No data fetched for the given uid list and {range_name} range.")
             return None
 
-        df = pd.DataFrame(fetched_data_list)
+        # combine the data of the uids
+        df = self._timed('merge', self._concat_frames, fetched_data_list)
+        return self._compact(df, kind)
+
+    def _export_units(self, kind, start_date, end_date, uid_list, window, timeout):
+        # the work units of an export: the uid batches of each time window for the Flux data, each uid of each
+        # time window for the V2 data. The files of a unit are named after its window, so exporting a window
+        # again replaces its rows.
+        if kind not in EXPORT_KINDS:
+            raise ValueError(f"Incorrect kind({kind}), should be one of {', '.join(EXPORT_KINDS)}")
+        start = self._to_epoch(start_date)
+        stop = self._to_epoch(pd.Timestamp.now(tz='UTC').floor('s') if end_date is None else end_date)
+        if start >= stop:
+            raise ValueError(f"start_date({start_date}) must be before end_date({end_date})")
+        if len(uid_list) == 0:
+            # an empty uid list would query the data of every uid
+            return []
+        if kind in ('daily', 'detail'):
+            measurement = 'SX_Daily_Prod' if kind == 'daily' else 'SX_Detail_Prod'
+            window = window or (self.daily_chunk if kind == 'daily' else self.detail_chunk)
+            return [
+                _ExportUnit(uid_batch, _Request('POST', self.url + 'queryData',
+                                                content=self._flux_query(measurement, window_start, window_stop, uid_batch),
+                                                timeout=timeout, cache=self._cache_state(window_start, window_stop),
+                                                stream='array'),
+                            self._parse_flux, measurement, f'{kind}-{window_start}')
+                for window_start, window_stop in self.split_time_range(start, stop, window)
+                for uid_batch in self.split_uid_list(uid_list)
+            ]
+        window = pd.Timedelta(window or (self.daily_chunk if kind == 'daily_info_v2' else self.detail_chunk))
+        units = []
+        if kind == 'daily_info_v2':
+            # the V2 daily info is queried by whole days, the last day of a window is included
+            if window % pd.Timedelta(days=1) != pd.Timedelta(0):
+                raise ValueError(f"Incorrect window({window}), should be a number of days for daily_info_v2")
+            start = start // 86400 * 86400
+            for window_start, window_stop in self.split_time_range(start, stop, window):
+                first_day = pd.Timestamp(window_start, unit='s').strftime('%Y-%m-%d')
+                last_day = pd.Timestamp(window_stop - 1, unit='s').strftime('%Y-%m-%d')
+                requests = self._daily_info_v2_requests(first_day, last_day, uid_list, timeout)
+                units.extend(_ExportUnit([uid], requests[uid], self._parse_daily_info_v2, 'DailyInfoV2',
+                                         f'{kind}-{window_start}') for uid in uid_list)
+            return units
+        for window_start, window_stop in self.split_time_range(start, stop, window):
+            requests = self._daily_data_v2_requests(pd.Timestamp(window_start, unit='s', tz='UTC').isoformat(),
+                                                    pd.Timestamp(window_stop, unit='s', tz='UTC').isoformat(),
+                                                    uid_list, timeout)
+            units.extend(_ExportUnit([uid], requests[uid], self._parse_daily_data_v2, 'DailyDataV2',
+                                     f'{kind}-{window_start}') for uid in uid_list)
+        return units
+
+    def _export_write(self, dataset, unit, df):
+        # writes the rows of a work unit, returning the number of rows written for each uid
+        if df is None or len(df) == 0:
+            return {}
+        df = self._compact(self._to_pandas(df), unit.kind)
+        if len(unit.uids) == 1:
+            dataset.write(df, uid=unit.uids[0], name=unit.name)
+            return {unit.uids[0]: len(df)}
+        dataset.write(df, name=unit.name)
+        return df['uid'].astype(str).value_counts().to_dict()
+
+    def _export_report(self, path, uid_list, units, results, progress):
+        # results are the rows written per uid or the raised exception of each work unit
+        failed = self._failed_uids([unit.uids for unit in units], results)
+        self.failed_uids = {uid: error for uid, error in failed.items() if uid is not None}
+        for uid, error in self.failed_uids.items():
+            print(f"Error in exporting the data (uid: {uid})", error)
+        rows = dict.fromkeys(uid_list, 0)
+        for result in results:
+            if not isinstance(result, Exception):
+                for uid, count in result.items():
+                    rows[uid] = rows.get(uid, 0) + count
+        return ExportReport(path, rows, self.failed_uids, len(units), time.perf_counter() - progress.started)
+
+    def _v2_result(self, uid_list, results, range_name, kind, return_result):
+        # the failed uids are returned with the data, self.failed_uids may be replaced by a concurrent call
+        df = self._output_frame(self._v2_frame(self._collect_per_uid(uid_list, results), range_name, kind))
+        if return_result:
+            failed = {uid: result for uid, result in zip(uid_list, results) if isinstance(result, Exception)}
+            return BatchResult(df, [uid for uid in uid_list if uid not in failed], failed)
         return df
 
+
+class DataLoader(_BaseDataLoader):
+    def __init__(self, token, base_url=DEFAULT_BASE_URL, max_connections=20, max_keepalive_connections=10,
+                 keepalive_expiry=30.0, http2=True, max_workers=8, daily_chunk='90D', detail_chunk='7D',
+                 uid_batch_size=100, cache=None, streaming=False, chunk_rows=100000, compact_dtypes=False,
+                 store=None, retry=None, hooks=None, memo=None,
+                 compression=True, output='pandas'):
+        """
+        Initializes an instance of the class.
+
+        Parameters:
+        token (str): The token used for authentication, please go to https://soxai-web-api-tiufu2wgva-df.a.run.app/ and login to generate one token.
+        base_url (str, optional): The base URL of the API.
+        max_connections (int, optional): The maximum number of concurrent connections kept by the HTTP client.
+        max_keepalive_connections (int, optional): The maximum number of idle connections kept alive for reuse.
+        keepalive_expiry (float, optional): The seconds an idle connection is kept alive.
+        http2 (bool, optional): Use HTTP/2 when the `h2` package is installed (`pip install httpx[http2]`).
+        max_workers (int, optional): The maximum number of requests in flight when fetching several uids or time windows.
+        daily_chunk (str, optional): The window length a long getDailyData range is split into. None disables the split.
+        detail_chunk (str, optional): The window length a long getDetailData range is split into. None disables the split.
+        uid_batch_size (int, optional): The maximum number of uids filtered by one Flux query. Longer uid lists are sent as several concurrent queries.
+        cache (DiskCache, optional): The on-disk cache of the query results, the getDailyData and getDetailData ones per uid and bucket of `chunk`. None (default) disables the cache.
+        compression (bool, optional): Ask for compressed responses, gzip and deflate, and brotli and zstd with `pip install soxai_data[compression]`. Defaults to True, False may be faster on a fast local network.
+        streaming (bool, optional): Parse the responses incrementally while they are downloaded, which bounds the peak memory of large responses.
+        chunk_rows (int, optional): The number of rows parsed at once when streaming.
+        compact_dtypes (bool, optional): Build the DataFrames with compact dtypes (float32 where exact and small integers, categorical uid, UTC datetimes) instead of the inferred ones, see `soxai_data.schema`.
+        store (LocalStore, optional): The local copy of the data getDailyData and getDetailData answer from when given a uid_list, fetching only the ranges it lacks. None (default) always queries the API.
+        retry (RetryPolicy, optional): How the requests failing with a connection error, a timeout or a transient status (429, 5xx) are retried, with exponential backoff, jitter, `Retry-After` and an optional deadline. None (default) does not retry.
+        hooks (list, optional): The callables receiving an `Event` for each request, DataFrame building step and method call, with the timings of their phases, the bytes, rows, retries and cache hits, e.g. an `EventRecorder` or a `JsonlExporter`. Hooks may be appended to `self.hooks` later.
+        memo (MemoryCache, optional): The in-memory cache of the request results, which also coalesces the identical requests sent concurrently into one. It may be shared by several loaders. None (default) disables it.
+        output (str, optional): The type of the query results: 'pandas' (default) for NumPy-backed DataFrames, 'arrow' for DataFrames with Arrow-backed dtypes (`pd.ArrowDtype`) or 'table' for `pyarrow.Table` (requires `pyarrow`). With 'arrow' and 'table' the results are built as Arrow tables from the decoded responses and the local time is computed on the Arrow timestamps, `compact_dtypes` does not apply.
+
+        Attributes:
+        url (str): The base URL of the API.
+        headers (dict): The headers used for the API requests.
+        org_id (str): The ID of the organization. Will be none for normal users.
+        client (httpx.Client): The pooled HTTP client shared by all the methods.
+        failed_uids (dict): The uids that failed in the last multi-uid call, mapped to their error.
+        cache (DiskCache): The on-disk cache of the query results, or None.
+        store (LocalStore): The local copy of the daily and detail data, or None.
+        retry (RetryPolicy): The retry policy of the requests, or None.
+        hooks (list): The instrumentation hooks.
+        memo (MemoryCache): The in-memory cache of the request results, or None.
+
+        Usage:
+
+        ##Plot the daily info data
+        ```python
+        from soxai_data import DataLoader
+
+        sx_data = DataLoader(token=<Your-soxai-api-token>)
+        df = sx_data.getDailyData()
+        df.plot()
+        ```
+
+        The connections are reused between the calls. Close the loader when it is no longer needed,
+        or use it as a context manager:
+
+        ```python
+        with DataLoader(token=<Your-soxai-api-token>) as sx_data:
+            df = sx_data.getDailyData()
+        ```
+        """
+        super().__init__(token, base_url=base_url, max_connections=max_connections,
+                         max_keepalive_connections=max_keepalive_connections, keepalive_expiry=keepalive_expiry,
+                         http2=http2, max_workers=max_workers, daily_chunk=daily_chunk, detail_chunk=detail_chunk,
+                         uid_batch_size=uid_batch_size, cache=cache, streaming=streaming, chunk_rows=chunk_rows,
+                         compact_dtypes=compact_dtypes, store=store, retry=retry, hooks=hooks,
+                         memo=memo, compression=compression, output=output)
+
+    def _create_client(self, **kwargs):
+        return httpx.Client(**kwargs)
+
+    def close(self):
+        """
+        Close the HTTP client and release the pooled connections.
+        """
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _send(self, request, stream=False, stats=None):
+        # sends the request, retrying the transient failures as configured by self.retry
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt_started = time.perf_counter()
+            http_request = self.client.build_request(request.method, request.url, params=request.params,
+                                                     content=request.content, headers=self.headers,
+                                                     timeout=self._attempt_timeout(request, started))
+            try:
+                response = self.client.send(http_request, stream=stream)
+            except httpx.TransportError as e:
+                delay = self._retry_delay(attempt, started, error=e)
+                if delay is None:
+                    self._record_attempt(stats, attempt, attempt_started)
+                    raise
+            else:
+                delay = self._retry_delay(attempt, started, response=response)
+                if delay is None:
+                    self._record_attempt(stats, attempt, attempt_started, response)
+                    if self._exhausted(response):
+                        response.close()
+                        response.raise_for_status()
+                    return response
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _iter_frames(self, request, chunk_rows=None, stats=None):
+        # sends the request and parses the response while it is downloaded,
+        # only the opening of the response is retried
+        stream = self._frame_stream(request, chunk_rows)
+        response = self._send(request, stream=True, stats=stats)
+        started = time.perf_counter()
+        try:
+            response.raise_for_status()
+            for text in response.iter_text():
+                yield from stream.feed(text)
+        finally:
+            response.close()
+        yield from stream.close()
+        if stats is not None:
+            stats['bytes'] = response.num_bytes_downloaded
+            stats['phases']['stream'] = time.perf_counter() - started
+
+    def _fetch(self, request, parse):
+        # sends the request and parses its response, unless the result is cached or the same request is in flight
+        key = self._memo_key(request)
+        if key is None:
+            return (self._fetch_once(request, parse))[0]
+        return self.memo.call(key, self._fetch_once, request, parse)
+
+    def _fetch_once(self, request, parse):
+        # returns the result and whether it was successfully fetched
+        stats = self._request_stats()
+        try:
+            result, success = self._fetch_result(request, parse, stats)
+        except Exception as e:
+            self._emit_request(request, stats, error=e)
+            raise
+        self._emit_request(request, stats, result)
+        return result, success
+
+    def _fetch_result(self, request, parse, stats):
+        key, result = self._cache_lookup(request)
+        self._record_cache(stats, key, result)
+        if result is not None:
+            return result, True
+        if self.streaming and request.stream is not None:
+            result = self._as_table(self._concat_frames(list(self._iter_frames(request, stats=stats))))
+            if key is not None:
+                self.cache.put(key, result, recent=request.cache == 'recent')
+            return result, True
+        response = self._send(request, stream=stats is not None, stats=stats)
+        if stats is not None:
+            # the body is read here to time its download apart from the wait for the response
+            started = time.perf_counter()
+            try:
+                response.read()
+            finally:
+                response.close()
+            stats['phases']['download'] = time.perf_counter() - started
+        result = self._parse(response, parse, stats)
+        self._cache_store(key, request, response, result)
+        return result, response.is_success
+
+    def iterQueryData(self, query, chunk_rows=None, timeout=60.0):
+        """
+        Runs a Flux query and yields the result as DataFrames of at most `chunk_rows` rows, parsed while the
+        response is downloaded.
+
+        Args:
+            query (str): The Flux query, e.g. built like the one of `getDetailData`.
+            chunk_rows (int, optional): The maximum number of rows of each DataFrame. Defaults to `self.chunk_rows`.
+            timeout (float, optional): The timeout in seconds. (Up to 120.0)
+
+        Yields:
+            pandas.DataFrame: The next rows of the result, with the raw `_time` column.
+        """
+        for df in self._iter_frames(self._query_request(query, timeout), chunk_rows):
+            yield self._output_frame(df)
+
+    def map_concurrently(self, fn, items, max_workers=None):
+        """
+        Calls `fn(item)` for every item with at most `max_workers` calls in flight.
+
+        Args:
+            fn (callable): The function to call.
+            items (list): The arguments of the calls.
+            max_workers (int, optional): The maximum number of calls in flight. Defaults to `self.max_workers`.
+
+        Returns:
+            list: The return value, or the raised exception, of each call in the order of `items`.
+        """
+        max_workers = self.max_workers if max_workers is None else max_workers
+        if len(items) == 0:
+            return []
+        if len(items) == 1:
+            # no thread is needed for a single call
+            try:
+                return [fn(items[0])]
+            except Exception as e:
+                return [e]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+            futures = [executor.submit(fn, item) for item in items]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    @instrumented
+    def getMyInfo(self):
+        """
+        Get the account information.
+
+        Returns:
+        dict: my personal information.
+        """
+        return self._read_org_id(self._fetch(self._my_info_request(), self._parse_my_info))
+
+
+    @instrumented
+    def getMyOrgUsers(self, org_id=None):
+        """
+        Retrieves the users associated with the specified organization.
+
+        Args:
+            org_id (str, optional): The ID of the organization. If not provided, the method will use the default organization ID.
+
+        Returns:
+            pd.DataFrame: The DataFrame containing the users associated with the specified organization.
+
+        Raises:
+            None
+
+        """
+        if org_id is None and self.org_id is None:
+            _ = self.getMyInfo()
+            if self.org_id is None:
+                return None
+        return self._output_frame(self._fetch(self._org_users_request(org_id), self._parse_org_users))
+
+    def _flux_data(self, measurement, start_date, end_date, default_start, convert_to_local_time, uid_list, timeout,
+                   chunk, max_workers, fields, every, agg, return_result):
+        fields = self._query_fields(fields, convert_to_local_time)
+        # the store keeps the full resolution rows, the aggregations are always queried
+        if self.store is None or len(uid_list) == 0 or every is not None:
+            if self._bucket_cached(start_date, uid_list, chunk):
+                span, keys, found, requests, request_buckets = self._bucket_requests(
+                    measurement, start_date, end_date, uid_list, timeout, chunk, fields, every, agg)
+                results = self.map_concurrently(lambda request: self._fetch(request, self._parse_flux), requests,
+                                                max_workers)
+                return self._bucket_frame(results, convert_to_local_time, measurement, span, uid_list, keys, found,
+                                          request_buckets, return_result)
+            requests = self._flux_requests(measurement, start_date, end_date, default_start, uid_list, timeout, chunk,
+                                           fields, every, agg)
+            results = self.map_concurrently(lambda request: self._fetch(request, self._parse_flux), requests,
+                                            max_workers)
+            return self._flux_frame(results, convert_to_local_time, measurement, uid_list, return_result)
+        span, covered, requests, request_uids = self._store_requests(measurement, start_date, end_date, default_start,
+                                                                     uid_list, timeout, chunk)
+        results = self.map_concurrently(lambda request: self._fetch(request, self._parse_flux), requests, max_workers)
+        return self._store_frame(results, convert_to_local_time, measurement, span, uid_list, covered, request_uids,
+                                 fields, return_result)
+
+    @instrumented
+    def getDailyData(self, start_date=None, end_date=None, convert_to_local_time=True, uid_list:list = [], timeout=60.0,
+                     chunk=None, max_workers=None, fields=None, every=None, agg='mean', return_result=False):
+        """
+        Retrieves daily data from the SOXAI database within the specified date range.
+
+        Args:
+            start_date (str, optional): The start date of the data range. Defaults to '-7d'.
+            end_date (str, optional): The end date of the data range. Defaults to 'now()'.
+            convert_to_local_time (booleanm, optional): The flag to change to local time.
+            uid_list (list): The uid to specify in the condition. Long lists are queried in batches of `self.uid_batch_size`.
+            timeout (float, optional): The timeout in seconds of each window query. (Up to 120.0)
+            chunk (str, optional): The length of the windows a long range is split into, e.g. '30D'. Defaults to `self.daily_chunk` ('90D').
+            max_workers (int, optional): The maximum number of windows and uid batches queried concurrently. Defaults to `self.max_workers`.
+            fields (list, optional): The fields to return besides `_time` and `uid`, e.g. ['heart_rate', 'steps']. The other fields and the `_start`, `_stop` and `_measurement` columns are dropped by the server. Defaults to all the fields.
+            every (str, optional): Downsample the fields on the server into windows of this length, e.g. '1h' or '15min', each row stamped with the start of its window. Defaults to the full resolution.
+            agg (str, optional): The aggregate function of the `every` windows: 'mean' (default), 'min', 'max', 'first', 'last', 'count', 'sum' or 'median'.
+            return_result (bool, optional): Return a `BatchResult` holding the rows of the uids fetched and the errors of the failed ones, instead of None as soon as one request fails.
+
+        Returns:
+            pandas.DataFrame: A DataFrame containing the retrieved data. A `BatchResult` with `return_result`.
+
+        Raises:
+            Exception: If there is an error in querying the data.
+
+        """
+        chunk = self.daily_chunk if chunk is None else chunk
+        return self._flux_data('SX_Daily_Prod', start_date, end_date, '-7d', convert_to_local_time, uid_list,
+                               timeout, chunk, max_workers, fields, every, agg, return_result)
+
+    @instrumented
+    def getDetailData(self, start_date=None, end_date=None, convert_to_local_time=True, uid_list:list = [], timeout=60.0,
+                     chunk=None, max_workers=None, fields=None, every=None, agg='mean', return_result=False):
+        """
+        Retrieves daily detail data from the SOXAI database.
+
+        Args:
+            start_date (str or None): The start date of the data range in the format 'YYYY-MM-DD'. If None, the default is '-1d' (one day ago).
+            end_date (str or None): The end date of the data range in the format 'YYYY-MM-DD'. If None, the default is 'now()' (current date and time).
+            convert_to_local_time (booleanm, optional): The flag to change to local time.
+            uid_list (list): The uid to specify in the condition. Long lists are queried in batches of `self.uid_batch_size`.
+            timeout (float, optional): The timeout in seconds of each window query. (Up to 120.0)
+            chunk (str, optional): The length of the windows a long range is split into, e.g. '1D'. Defaults to `self.detail_chunk` ('7D').
+            max_workers (int, optional): The maximum number of windows and uid batches queried concurrently. Defaults to `self.max_workers`.
+            fields (list, optional): The fields to return besides `_time` and `uid`, e.g. ['heart_rate', 'steps']. The other fields and the `_start`, `_stop` and `_measurement` columns are dropped by the server. Defaults to all the fields.
+            every (str, optional): Downsample the fields on the server into windows of this length, e.g. '1h' or '15min', each row stamped with the start of its window. Defaults to the full resolution.
+            agg (str, optional): The aggregate function of the `every` windows: 'mean' (default), 'min', 'max', 'first', 'last', 'count', 'sum' or 'median'.
+            return_result (bool, optional): Return a `BatchResult` holding the rows of the uids fetched and the errors of the failed ones, instead of None as soon as one request fails.
+
+        Returns:
+            pandas.DataFrame or None: The retrieved data as a pandas DataFrame, or None if an error occurred during the data retrieval. A `BatchResult` with `return_result`.
+
+        """
+        chunk = self.detail_chunk if chunk is None else chunk
+        return self._flux_data('SX_Detail_Prod', start_date, end_date, '-1d', convert_to_local_time, uid_list,
+                               timeout, chunk, max_workers, fields, every, agg, return_result)
+
+    def iterRawData(self, uid, start_date=None, end_date=None, timeout=5.0, prefetch=True, max_pages=None,
+                    format='json'):
+        """
+        Retrieves raw data page by page and yields the DataFrame of each page, so only one or two pages
+        are held in memory at a time.
+
+        Args:
+            uid (str): The uid to specify in the condition
+            start_date (str, optional): The start date of the data range. Defaults to '-7d'.
+            end_date (str, optional): The end date of the data range. Defaults to 'now()'.
+            timeout (float, optional): The timeout in seconds of each page (Up to 60.0)
+            prefetch (bool, optional): Request the next page while the current one is processed. Defaults to True.
+            max_pages (int, optional): The maximum number of pages to request. Defaults to all the pages.
+            format (str, optional): The format of the responses, 'json' (default), 'csv' (parsed by the pandas C engine)
+                or 'arrow' (Arrow IPC, requires `pyarrow`). A server answering JSON instead is parsed as JSON.
+
+        Yields:
+            pandas.DataFrame: The rows of the next page. The pages are requested until one is empty.
+        """
+        self._check_format(format)
+        parse = self._format_parser(format, self._parse_raw_data)
+
+        def fetch(page):
+            return self._fetch(self._raw_data_request(uid, start_date, end_date, timeout, page, format), parse)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page, pending = 0, None
+            while max_pages is None or page < max_pages:
+                df = fetch(page) if pending is None else pending.result()
+                if len(df) == 0:
+                    return
+                page += 1
+                if prefetch and (max_pages is None or page < max_pages):
+                    pending = executor.submit(fetch, page)
+                yield self._output_frame(df)
+
+    @instrumented
+    def getRawData(self, uid, start_date=None, end_date=None, timeout=5.0, prefetch=True, max_pages=None,
+                   format='json'):
+        """
+        Retrieves raw data from the SOXAI database within the specified date range.
+
+        Args:
+            uid (str): The uid to specify in the condition
+            start_date (str, optional): The start date of the data range. Defaults to '-7d'.
+            end_date (str, optional): The end date of the data range. Defaults to 'now()'.
+            timeout (float, optional): The timeout in seconds of each page (Up to 60.0)
+            prefetch (bool, optional): Request the next page while the current one is parsed. Defaults to True.
+            max_pages (int, optional): The maximum number of pages to request. Defaults to all the pages.
+            format (str, optional): The format of the responses, 'json' (default), 'csv' (parsed by the pandas C engine)
+                or 'arrow' (Arrow IPC, requires `pyarrow`). A server answering JSON instead is parsed as JSON.
+
+        Returns:
+            pandas.DataFrame: A DataFrame containing the rows of all the pages.
+
+        Raises:
+            Exception: If there is an error in querying the data.
+
+        """
+        try:
+            return self._concat_frames(list(self.iterRawData(uid, start_date, end_date, timeout, prefetch, max_pages,
+                                                             format)))
+        except Exception as e:
+            print("Error in querying the data", e)
+            return None
+
+    def _sync(self, measurement, get_data, data_dir, uid_list, start_date, timeout, max_workers):
+        dataset = SyncedDataset(data_dir, measurement)
+
+        def sync(uid):
+            # the rows from the high-water mark, which may have changed since, are fetched again and replaced
+            start = dataset.high_water_mark(uid) or start_date
+            # the uids are fetched concurrently, the windows of one uid one after the other
+            df = get_data(start_date=start, convert_to_local_time=False, uid_list=[uid], timeout=timeout, max_workers=1)
+            if df is None:
+                raise Exception(f"Error in querying the data since {start}")
+            return dataset.append(uid, self._to_pandas(df))
+
+        return self._collect_sync(uid_list, self.map_concurrently(sync, uid_list, max_workers))
+
+    @instrumented
+    def syncDailyData(self, data_dir, uid_list:list, start_date='2022-03-01', timeout=60.0, max_workers=None):
+        """
+        Downloads the daily data of each uid newer than the last synced row into a local dataset.
+
+        The first sync of a uid fetches everything since `start_date`; the next ones only fetch the rows
+        from the uid's high-water mark (the last day, which may still change, is fetched again and replaced),
+        so a daily job transfers days of data instead of years.
+        Read the dataset back with `SyncedDataset(data_dir, 'SX_Daily_Prod').read()`.
+
+        Args:
+            data_dir (str): The directory of the local dataset (requires `pyarrow`).
+            uid_list (list): The uids to sync.
+            start_date (str, optional): The start date of the first sync of a uid. Defaults to '2022-03-01'.
+            timeout (float, optional): The timeout in seconds of each window query. (Up to 120.0)
+            max_workers (int, optional): The maximum number of uids synced concurrently. Defaults to `self.max_workers`.
+
+        Returns:
+            dict: The number of rows appended for each synced uid. The failed uids are stored in `self.failed_uids`
+            and keep their high-water mark.
+        """
+        return self._sync('SX_Daily_Prod', self.getDailyData, data_dir, uid_list, start_date, timeout, max_workers)
+
+    @instrumented
+    def syncDetailData(self, data_dir, uid_list:list, start_date, timeout=60.0, max_workers=None):
+        """
+        Downloads the detail data of each uid newer than the last synced row into a local dataset.
+        See `syncDailyData`, the dataset is read with `SyncedDataset(data_dir, 'SX_Detail_Prod').read()`.
+        """
+        return self._sync('SX_Detail_Prod', self.getDetailData, data_dir, uid_list, start_date, timeout, max_workers)
+
+    @instrumented
+    def exportOrgData(self, path, kind='daily', start_date='2022-03-01', end_date=None, uid_list:list = None,
+                      org_id=None, window=None, format='parquet', partition='month', timeout=60.0, max_workers=None,
+                      progress=True):
+        """
+        Exports the data of all the users of an organization into a local `PartitionedDataset`.
+
+        The org users are fetched once, then the export is split into work units, a uid batch (Flux data) or a
+        uid (V2 data) over a time `window`, fetched with at most `max_workers` in flight. The rows of each unit are
+        written to the dataset as soon as they are received, so the memory used does not grow with the export.
+
+        Args:
+            path (str): The directory of the dataset (requires `pyarrow`).
+            kind (str, optional): 'daily' (getDailyData), 'detail' (getDetailData), 'daily_info_v2' (getDailyInfoV2)
+                or 'daily_data_v2' (getDailyDataV2). Defaults to 'daily'.
+            start_date (str, optional): The start of the export. Defaults to '2022-03-01'.
+            end_date (str, optional): The end of the export (excluded). Defaults to now.
+            uid_list (list, optional): The uids to export. Defaults to the users of the organization.
+            org_id (str, optional): The organization. Defaults to the organization of the account.
+            window (str, optional): The time window of a work unit, e.g. '30D'. Defaults to `self.daily_chunk`
+                ('daily', 'daily_info_v2') or `self.detail_chunk` ('detail', 'daily_data_v2').
+            format (str, optional): The files format, 'parquet' or 'feather'. Defaults to 'parquet'.
+            partition (str, optional): The date partitions of the dataset, see `PartitionedDataset`. Defaults to 'month'.
+            timeout (float, optional): The timeout in seconds of each request. (Up to 120.0)
+            max_workers (int, optional): The maximum number of work units in flight. Defaults to `self.max_workers`.
+            progress (bool or callable, optional): Print the progress and throughput about every second, or call
+                `progress(done_units, total_units, rows, seconds)` instead. Defaults to True.
+
+        Returns:
+            ExportReport: The rows written per uid, the failed uids and the throughput, or None if the users of the
+            organization cannot be fetched. The failed uids are also stored in `self.failed_uids`.
+        """
+        if uid_list is None:
+            org_users = self._to_pandas(self.getMyOrgUsers(org_id))
+            if org_users is None:
+                print("Error in querying the organization users")
+                return None
+            uid_list = list(org_users['uid']) if 'uid' in org_users.columns else []
+        dataset = PartitionedDataset(path, format=format, partition=partition)
+        units = self._export_units(kind, start_date, end_date, uid_list, window, timeout)
+        tracker = _ExportProgress(len(units), progress)
+
+        def export(unit):
+            rows = {}
+            try:
+                rows = self._export_write(dataset, unit, self._fetch(unit.request, unit.parse))
+                return rows
+            finally:
+                tracker.update(sum(rows.values()))
+
+        results = self.map_concurrently(export, units, max_workers)
+        return self._export_report(dataset.path, uid_list, units, results, tracker)
+
+    @instrumented
+    def getDailyInfoV2(self, start_date=None, end_date=None, uid_list:list = [], timeout=60.0, max_workers=None,
+                       return_result=False, format='json'):
+        """
+        Retrieves daily info data from the SOXAI database within the specified date range.
+
+        Args:
+            start_date (str, optional): The start date of the data range. Formats like 'YYYY-MM-DD'. Defaults to 7 days before the current date.
+            end_date (str, optional): The end date of the data range. Formats like 'YYYY-MM-DD'. Defaults to the current date.
+            uid_list (list): The uid to specify in the condition.
+            timeout (float, optional): The timeout in seconds. (Up to 120.0)
+            max_workers (int, optional): The maximum number of uids fetched concurrently. Defaults to `self.max_workers`.
+            return_result (bool, optional): Return a `BatchResult` holding the DataFrame and the errors of the failed uids.
+            format (str, optional): The format of the responses, 'json' (default), 'csv' (parsed by the pandas C engine)
+                or 'arrow' (Arrow IPC, requires `pyarrow`). A server answering JSON instead is parsed as JSON.
+
+        Returns:
+            pandas.DataFrame: A DataFrame containing the retrieved data, rows ordered as `uid_list`.
+            The uids that could not be fetched are skipped and stored in `self.failed_uids`.
+
+        Raises:
+            Exception: If there is an error in querying the data.
+        """
+        self._check_format(format)
+        buckets = [self._daily_info_v2_requests(first_day, last_day, uid_list, timeout, format)
+                   for first_day, last_day in self._daily_info_v2_buckets(start_date, end_date)]
+        parse = self._format_parser(format, self._parse_daily_info_v2)
+
+        # send request for each uid and bucket and combine the data
+        def fetch(item):
+            uid, requests = item
+            return self._fetch(requests[uid], parse)
+
+        results = self.map_concurrently(fetch, [(uid, requests) for uid in uid_list for requests in buckets],
+                                        max_workers)
+        return self._v2_result(uid_list, self._join_buckets(uid_list, results), 'date', 'DailyInfoV2', return_result)
+
+    @instrumented
+    def getDailyDataV2(self, start_datetime: str, end_datetime: str, uid_list: list = [], timeout: float = 60.0,
+                       max_workers: int = None, return_result: bool = False, format: str = 'json'):
+        """
+        Retrieves daily detail data from the SOXAI v2 API within the specified datetime range.
+
+        args:
+            - start_datetime : Start datetime string in 'YYYY-MM-DDThh:mm:ss+HH:MM' format (timezone required). e.g. '2026-01-20T00:00:00+09:00'
+            - end_datetime : End datetime string in 'YYYY-MM-DDThh:mm:ss+HH:MM' format (timezone required). e.g. '2026-01-20T02:00:00+09:00'
+            - uid_list : List of uids to fetch data for.
+            - timeout : Timeout in seconds. (Up to 120.0)
+            - max_workers : Maximum number of uids fetched concurrently. Defaults to `self.max_workers`.
+            - return_result : Return a `BatchResult` holding the DataFrame and the errors of the failed uids.
+            - format : The format of the responses, 'json' (default), 'csv' or 'arrow' (requires `pyarrow`).
+              A server answering JSON instead is parsed as JSON.
+        returns:
+            - pandas.DataFrame containing the retrieved data ordered as `uid_list`, or None if no data.
+              The uids that could not be fetched are skipped and stored in `self.failed_uids`.
+        raises:
+            - ValueError: If the datetime format is invalid, timezone is missing, or start_datetime is not before end_datetime.
+        """
+        self._check_format(format)
+        requests = self._daily_data_v2_requests(start_datetime, end_datetime, uid_list, timeout, format)
+        parse = self._format_parser(format, self._parse_daily_data_v2)
+
+        # send request for each uid and combine the data
+        def fetch(uid):
+            return self._fetch(requests[uid], parse)
+
+        results = self.map_concurrently(fetch, uid_list, max_workers)
+        return self._v2_result(uid_list, results, 'datetime', 'DailyDataV2', return_result)
@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+from .cache import _require_pyarrow
+from .lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+
+def _to_timestamp(value):
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tz is None else value.tz_convert('UTC')
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, stop in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    return merged
+
+
+class LocalStore():
+    def __init__(self, store_dir, settle='1D'):
+        """
+        A local copy of the downloaded measurements that `DataLoader(store=...)` reads from, only querying the API
+        for the time ranges it does not hold yet (requires `pyarrow`).
+
+        The rows of each uid are kept sorted by `_time` in one uncompressed Arrow IPC file,
+        `<store_dir>/<measurement>/<uid>.arrow`, which is memory-mapped when read: a query binary-searches the
+        time column and only copies the rows of its range. `<store_dir>/<measurement>/_coverage.json` records
+        the time ranges fetched for each uid, so a range without rows is not fetched again.
+
+        Parameters:
+        store_dir (str): The root directory of the store. Created if missing.
+        settle (str or pd.Timedelta, optional): Rows more recent than this may still change on the server:
+            their range is not recorded as fetched and is fetched again by the next query. Defaults to '1D'.
+
+        Usage:
+
+        ```python
+        from soxai_data import DataLoader, LocalStore
+
+        sx_data = DataLoader(token=<Your-soxai-api-token>, store=LocalStore('~/soxai/store'))
+        df = sx_data.getDetailData(start_date='2026-01-01', end_date='2026-02-01', uid_list=['uid1'])
+        ```
+        """
+        _require_pyarrow('LocalStore')
+        self.store_dir = os.path.expanduser(store_dir)
+        self.settle = pd.Timedelta(settle)
+        self._lock = threading.Lock()
+
+    def _measurement_dir(self, measurement):
+        return os.path.join(self.store_dir, measurement)
+
+    def _path(self, measurement, uid):
+        return os.path.join(self._measurement_dir(measurement), f'{uid}.arrow')
+
+    def _coverage_path(self, measurement):
+        return os.path.join(self._measurement_dir(measurement), '_coverage.json')
+
+    def _load_coverage(self, measurement):
+        try:
+            with open(self._coverage_path(measurement)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def missing(self, measurement, uid, start, stop):
+        """
+        Returns the parts of the time range [start, stop) that were never fetched for `uid`.
+
+        Args:
+            measurement (str): The measurement, e.g. 'SX_Detail_Prod'.
+            uid (str): The uid.
+            start (datetime): The start of the range.
+            stop (datetime): The end of the range.
+
+        Returns:
+            list: The (start, stop) pd.Timestamp of each missing range, in time order.
+        """
+        start, stop = _to_timestamp(start).timestamp(), _to_timestamp(stop).timestamp()
+        gaps = []
+        for covered_start, covered_stop in self._load_coverage(measurement).get(uid, []):
+            if covered_stop <= start:
+                continue
+            if covered_start >= stop:
+                break
+            if covered_start > start:
+                gaps.append((start, covered_start))
+            start = max(start, covered_stop)
+        if start < stop:
+            gaps.append((start, stop))
+        return [(pd.Timestamp(gap_start, unit='s', tz='UTC'), pd.Timestamp(gap_stop, unit='s', tz='UTC'))
+                for gap_start, gap_stop in gaps]
+
+    def _read_table(self, measurement, uid):
+        import pyarrow as pa
+
+        path = self._path(measurement, uid)
+        if not os.path.exists(path):
+            return None
+        # the buffers of the table point into the mapped file, nothing is read until it is sliced
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def write(self, measurement, uid, df, covered=()):
+        """
+        Merges fetched rows into the store, the rows already stored at the same `_time` are replaced.
+
+        Args:
+            measurement (str): The measurement of the rows.
+            uid (str): The uid of the rows.
+            df (pd.DataFrame): The fetched rows, with the raw `_time` column (not converted to local time).
+            covered (list, optional): The (start, stop) time ranges that were fetched, rows or not.
+        """
+        import pyarrow as pa
+
+        os.makedirs(self._measurement_dir(measurement), exist_ok=True)
+        with self._lock:
+            if len(df) > 0:
+                df = df.assign(_time=pd.to_datetime(df['_time'], utc=True, format='ISO8601'))
+                # the windows of a query share their boundary points
+                df = df.drop_duplicates(subset='_time', keep='last')
+                table = self._read_table(measurement, uid)
+                if table is not None:
+                    stored = table.to_pandas()
+                    df = pd.concat([stored[~stored['_time'].isin(df['_time'])], df], ignore_index=True)
+                df = df.sort_values('_time', kind='stable').reset_index(drop=True)
+                new_table = pa.Table.from_pandas(df, preserve_index=False)
+                path = self._path(measurement, uid)
+                tmp_path = f'{path}.tmp'
+                with pa.OSFile(tmp_path, 'wb') as sink:
+                    with pa.ipc.new_file(sink, new_table.schema) as writer:
+                        writer.write_table(new_table)
+                os.replace(tmp_path, path)
+
+            # the recent rows may still change, their range is fetched again next time
+            settled = (pd.Timestamp.now(tz='UTC') - self.settle).timestamp()
+            intervals = [(_to_timestamp(start).timestamp(), min(_to_timestamp(stop).timestamp(), settled))
+                         for start, stop in covered]
+            intervals = [[start, stop] for start, stop in intervals if start < stop]
+            if len(intervals) == 0:
+                return
+            coverage = self._load_coverage(measurement)
+            coverage[uid] = _merge_intervals(coverage.get(uid, []) + intervals)
+            tmp_path = f'{self._coverage_path(measurement)}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(coverage, f)
+            os.replace(tmp_path, self._coverage_path(measurement))
+
+    def query(self, measurement, start, stop, uid_list, fields=None):
+        """
+        Reads the stored rows of a time range.
+
+        Args:
+            measurement (str): The measurement, e.g. 'SX_Detail_Prod'.
+            start (datetime): The start of the range (included).
+            stop (datetime): The end of the range (excluded).
+            uid_list (list): The uids to read.
+            fields (list, optional): The fields to read besides `_time` and `uid`. Defaults to all the columns.
+
+        Returns:
+            pd.DataFrame: The rows of the uids in the order of `uid_list`, each sorted by `_time`.
+        """
+        start = np.datetime64(_to_timestamp(start).tz_convert(None))
+        stop = np.datetime64(_to_timestamp(stop).tz_convert(None))
+        frames = []
+        for uid in uid_list:
+            table = self._read_table(measurement, uid)
+            if table is None:
+                continue
+            times = table.column('_time')
+            times = (times.combine_chunks() if times.num_chunks > 1 else times.chunk(0)).to_numpy()
+            # the rows are sorted by time, the range is found by binary search
+            first, last = np.searchsorted(times, [start, stop], side='left')
+            if fields is not None:
+                columns = ['_time', 'uid'] + [field for field in fields if field not in ('_time', 'uid')]
+                table = table.select([column for column in columns if column in table.column_names])
+            frames.append(table.slice(first, last - first).to_pandas())
+        if len(frames) == 0:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
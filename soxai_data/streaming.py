@@ -0,0 +1,228 @@
+import json
+import re
+from .lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _is_escaped(text, index):
+    # a character is escaped when it is preceded by an odd number of backslashes
+    first = index
+    while first > 0 and text[first - 1] == '\\':
+        first -= 1
+    return (index - first) % 2 == 1
+
+
+def _complete_escapes_end(text):
+    """
+    Returns the length of the prefix of `text` (the inside of a JSON string) that does not end in
+    the middle of an escape sequence, nor with the high surrogate of a pair.
+    """
+    end = len(text)
+    last = text.rfind('\\', max(0, end - 6))
+    # an escaped backslash is the end of its escape sequence
+    if last != -1 and not _is_escaped(text, last):
+        escape = text[last:]
+        if len(escape) == 1 or (escape[1] == 'u' and len(escape) < 6):
+            end = last
+    # a high surrogate is kept with its low surrogate, which may be cut or in the next chunk
+    high = end - 6
+    if high >= 0 and _is_high_surrogate(text, high):
+        end = high
+    return end
+
+
+def _is_high_surrogate(text, index):
+    # whether text[index:index + 6] is the escape of the high surrogate of a pair, e.g. \ud83d
+    return (text[index] == '\\' and text[index + 1] == 'u' and text[index + 2] in 'dD'
+            and text[index + 3] in '89abAB' and not _is_escaped(text, index))
+
+
+class _JsonStringDecoder():
+    """
+    Incrementally decodes a body made of one JSON string, e.g. the double-encoded RawData response.
+    A body that is not a string is passed through unchanged.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._state = 'start'
+
+    def feed(self, text):
+        buffer = self._buffer + text
+        pos = 0
+        if self._state == 'start':
+            pos = _WHITESPACE.match(buffer).end()
+            if pos == len(buffer):
+                self._buffer = ''
+                return ''
+            self._state = 'string' if buffer[pos] == '"' else 'raw'
+            pos += self._state == 'string'
+        if self._state == 'raw':
+            self._buffer = ''
+            return buffer[pos:]
+        if self._state == 'done':
+            self._buffer = ''
+            return ''
+
+        # only whitespace may follow the closing quote, so it can only be the last character of a chunk
+        stripped = buffer.rstrip(' \t\n\r')
+        if len(stripped) > pos and stripped[-1] == '"' and not _is_escaped(stripped, len(stripped) - 1):
+            end = len(stripped) - 1
+            self._state = 'done'
+            self._buffer = ''
+        else:
+            end = pos + _complete_escapes_end(buffer[pos:])
+            self._buffer = buffer[end:]
+        return json.loads('"' + buffer[pos:end] + '"')
+
+    def close(self):
+        if self._state == 'string':
+            raise ValueError('Incomplete JSON string in the response')
+
+
+class _JsonArrayDecoder():
+    """
+    Incrementally decodes a body made of one JSON array of objects into the objects.
+    A body that is a JSON object instead of an array (e.g. an error message) gives no record.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._state = 'start'
+
+    def feed(self, text):
+        buffer = self._buffer + text
+        pos = 0
+        records = []
+        batch = True
+        while self._state in ('start', 'items'):
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if self._state == 'start':
+                if char == '[':
+                    self._state = 'items'
+                    pos += 1
+                elif char == '{':
+                    self._state = 'object'
+                else:
+                    raise ValueError(f'Unexpected response body starting with {buffer[pos:pos + 20]!r}')
+            elif char == ',':
+                pos += 1
+            elif char == ']':
+                self._state = 'done'
+                pos += 1
+            else:
+                end = buffer.rfind('}', pos) + 1
+                if batch and end > pos:
+                    # decode all the complete records at once; when the last brace does not end a record
+                    # (it is inside a string or a nested object) the slice is invalid and they are decoded one by one
+                    try:
+                        records.extend(json.loads('[' + buffer[pos:end] + ']'))
+                        pos = end
+                        continue
+                    except json.JSONDecodeError:
+                        batch = False
+                try:
+                    record, pos = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # the record continues in the next chunk
+                    break
+                records.append(record)
+        self._buffer = buffer[pos:] if self._state in ('start', 'items') else ''
+        return records
+
+    def close(self):
+        if self._state in ('start', 'items'):
+            raise ValueError('Incomplete JSON array in the response')
+
+
+class _ColumnBuffer():
+    """
+    Accumulates batches of records as small DataFrames and cuts them into DataFrames of `chunk_rows` rows.
+    """
+
+    def __init__(self, chunk_rows):
+        self.chunk_rows = chunk_rows
+        self.frames = []
+        self.rows = 0
+
+    def append(self, records):
+        """
+        Adds a batch of records and returns the DataFrames of `chunk_rows` rows completed by it.
+        """
+        if len(records) == 0:
+            return []
+        self.frames.append(pd.DataFrame(records))
+        self.rows += len(records)
+        completed = []
+        while self.rows >= self.chunk_rows:
+            df = pd.concat(self.frames, ignore_index=True) if len(self.frames) > 1 else self.frames[0]
+            completed.append(df.iloc[:self.chunk_rows].reset_index(drop=True))
+            rest = df.iloc[self.chunk_rows:].reset_index(drop=True)
+            self.frames = [rest] if len(rest) > 0 else []
+            self.rows = len(rest)
+        return completed
+
+    def flush(self):
+        """
+        Returns the DataFrame of the remaining rows, if any.
+        """
+        if self.rows == 0:
+            return []
+        df = pd.concat(self.frames, ignore_index=True) if len(self.frames) > 1 else self.frames[0]
+        self.frames = []
+        self.rows = 0
+        return [df]
+
+
+class FrameStream():
+    def __init__(self, double_encoded=False, chunk_rows=100000):
+        """
+        Parses a JSON response body fed chunk by chunk into DataFrames of at most `chunk_rows` rows.
+
+        Only the records of the current network chunk are held as Python objects, the parsed rows are kept as
+        columns: the body is never held whole, as text nor as a list of dicts, which bounds the peak memory of
+        large responses.
+
+        Parameters:
+        double_encoded (bool, optional): The body is a JSON string containing the JSON array (RawData).
+        chunk_rows (int, optional): The number of rows of the DataFrames returned.
+
+        Usage:
+
+        ```python
+        stream = FrameStream()
+        for text in response.iter_text():
+            for df in stream.feed(text):
+                ...
+        for df in stream.close():
+            ...
+        ```
+        """
+        self.chunk_rows = chunk_rows
+        self._string_decoder = _JsonStringDecoder() if double_encoded else None
+        self._array_decoder = _JsonArrayDecoder()
+        self._columns = _ColumnBuffer(chunk_rows)
+
+    def feed(self, text):
+        """
+        Parses the next chunk of the body and returns the DataFrames completed by it.
+        """
+        if self._string_decoder is not None:
+            text = self._string_decoder.feed(text)
+        return self._columns.append(self._array_decoder.feed(text))
+
+    def close(self):
+        """
+        Checks the body is complete and returns the DataFrame of the remaining rows, if any.
+        """
+        if self._string_decoder is not None:
+            self._string_decoder.close()
+        self._array_decoder.close()
+        return self._columns.flush()
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from .cache import _require_pyarrow
+from .lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+
+# the state files being written, shared by the datasets of the same directory
+_state_locks = {}
+_state_locks_lock = threading.Lock()
+
+
+class SyncedDataset():
+    def __init__(self, data_dir, measurement, settle='1D'):
+        """
+        A local copy of one measurement, appended incrementally by `DataLoader.syncDailyData` and
+        `DataLoader.syncDetailData` (requires `pyarrow`).
+
+        The rows of each uid are stored as Parquet part files under `<data_dir>/<measurement>/<uid>/`,
+        and `<data_dir>/<measurement>/_state.json` records the high-water mark of each uid, so the next sync
+        only fetches the rows from the mark. The mark is the `_time` of the last stored row, but no later than
+        `settle` ago: the recent rows may still change on the server, they are fetched again and replaced.
+
+        Parameters:
+        data_dir (str): The root directory of the local datasets. Created if missing.
+        measurement (str): The measurement stored, e.g. 'SX_Daily_Prod'.
+        settle (str or pd.Timedelta, optional): Rows more recent than this may still change on the server.
+            Defaults to '1D'.
+        """
+        _require_pyarrow('SyncedDataset')
+        self.path = os.path.join(os.path.expanduser(data_dir), measurement)
+        self.state_path = os.path.join(self.path, '_state.json')
+        self.settle = pd.Timedelta(settle)
+        with _state_locks_lock:
+            self._lock = _state_locks.setdefault(os.path.abspath(self.state_path), threading.Lock())
+        os.makedirs(self.path, exist_ok=True)
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def high_water_mark(self, uid):
+        """
+        Returns the time the next sync of `uid` fetches from, or None if nothing is stored yet. The stored rows
+        from this time on are replaced by the next `append`.
+        """
+        return self.state.get(uid)
+
+    def _part_files(self, uid_path):
+        # the part files are named after their write time, so sorted in the order they were written
+        return sorted(name for name in os.listdir(uid_path) if name.startswith('part-') and name.endswith('.parquet'))
+
+    def _trim(self, uid_path, high_water_mark):
+        # removes the stored rows at or after the mark, which the appended rows replace; the parts hold
+        # consecutive time ranges, so only the last ones are read
+        for name in reversed(self._part_files(uid_path)):
+            path = os.path.join(uid_path, name)
+            df = pd.read_parquet(path)
+            kept = pd.to_datetime(df['_time'], utc=True) < high_water_mark
+            if kept.all():
+                break
+            if kept.any():
+                tmp_path = f'{path}.tmp'
+                df[kept].to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+            else:
+                os.remove(path)
+
+    def append(self, uid, df):
+        """
+        Stores the rows of `df` from the high-water mark of `uid` on, replacing the stored rows from the mark,
+        and moves the mark forward.
+
+        The stored rows are trimmed before the new part file is written and the mark is moved last, so an
+        interrupted append is simply done again by the next sync, without duplicating rows.
+
+        Args:
+            uid (str): The uid of the rows.
+            df (pd.DataFrame): The fetched rows, with the raw `_time` column (not converted to local time).
+
+        Returns:
+            int: The number of rows appended, the replaced rows included.
+        """
+        if len(df) == 0:
+            return 0
+        times = pd.to_datetime(df['_time'], utc=True)
+        high_water_mark = self.high_water_mark(uid)
+        if high_water_mark is not None:
+            high_water_mark = pd.Timestamp(high_water_mark)
+            new_rows = times >= high_water_mark
+            df, times = df[new_rows], times[new_rows]
+        if len(df) == 0:
+            return 0
+        uid_path = os.path.join(self.path, uid)
+        os.makedirs(uid_path, exist_ok=True)
+        if high_water_mark is not None:
+            self._trim(uid_path, high_water_mark)
+        df.to_parquet(os.path.join(uid_path, f'part-{time.time_ns()}.parquet'), index=False)
+        # the rows of the last `settle` may still change, the next sync fetches them again
+        mark = min(times.max(), pd.Timestamp.now(tz='UTC') - self.settle)
+        if high_water_mark is not None:
+            mark = max(mark, high_water_mark)
+        with self._lock:
+            # another dataset of the same directory may have synced other uids since this one was loaded
+            self.state = self._load_state()
+            self.state[uid] = mark.isoformat()
+            # the state is replaced atomically, an interrupted sync only refetches the last rows
+            tmp_path = f'{self.state_path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.state, f, indent=1)
+            os.replace(tmp_path, self.state_path)
+        return len(df)
+
+    def read(self, uid_list=None):
+        """
+        Reads the stored rows.
+
+        Args:
+            uid_list (list, optional): The uids to read. Defaults to all the stored uids.
+
+        Returns:
+            pd.DataFrame: The stored rows in the order of the uids and of `_time`, or an empty DataFrame.
+        """
+        uid_list = sorted(self.state) if uid_list is None else uid_list
+        frames = []
+        for uid in uid_list:
+            uid_path = os.path.join(self.path, uid)
+            if not os.path.isdir(uid_path):
+                continue
+            for name in self._part_files(uid_path):
+                frames.append(pd.read_parquet(os.path.join(uid_path, name)))
+        if len(frames) == 0:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        if '_time' not in df.columns:
+            return df
+        # the rows written twice by concurrent syncs of a uid, the last written is kept
+        keys = [column for column in ['uid', '_time'] if column in df.columns]
+        return df.drop_duplicates(subset=keys, keep='last').reset_index(drop=True)
@@ -0,0 +1,44 @@
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soxai_data.soxai_data import DataLoader  # noqa: E402
+
+
+def _aggregates(query):
+    # the fields filtered by each stream of the query and the aggregate function applied to them
+    streams = re.findall(r'filter\(fn: \(r\) => (r\["_field"\] [^)]+)\)\s*\|> aggregateWindow\([^)]*fn: (\w+)', query)
+    return [(re.findall(r'r\["_field"\] (==|!=) "([^"]+)"', fields), agg) for fields, agg in streams]
+
+
+def _query(**kwargs):
+    loader = DataLoader(token='dummy')
+    try:
+        fields = loader._query_fields(kwargs.pop('fields'), kwargs.pop('convert_to_local_time'))
+        return loader._flux_query('SX_Detail_Prod', 0, 'now()', ['uid1'], fields, **kwargs)
+    finally:
+        loader.close()
+
+
+def test_local_time_offsets_aggregated_with_last():
+    for agg in ('sum', 'count', 'mean'):
+        query = _query(fields=['steps'], convert_to_local_time=True, every='1h', agg=agg)
+        assert _aggregates(query) == [([('==', 'steps')], agg), ([('==', 'utc_offset_mins')], 'last')], query
+        assert query.index('union(tables:') < query.index('|> pivot(')
+        assert 'r["uid"] == "uid1"' in query
+
+
+def test_all_fields_offsets_aggregated_with_last():
+    query = _query(fields=None, convert_to_local_time=True, every='1h', agg='sum')
+    assert _aggregates(query) == [([('!=', 'utc_offset_mins')], 'sum'), ([('==', 'utc_offset_mins')], 'last')], query
+
+
+def test_offsets_in_one_stream_when_not_needed():
+    # without the offsets, or when they are aggregated with last anyway, the fields are queried in one stream
+    query = _query(fields=['steps'], convert_to_local_time=False, every='1h', agg='sum')
+    assert _aggregates(query) == [([('==', 'steps')], 'sum')] and 'union' not in query
+    query = _query(fields=['steps'], convert_to_local_time=True, every='1h', agg='last')
+    assert _aggregates(query) == [([('==', 'steps'), ('==', 'utc_offset_mins')], 'last')] and 'union' not in query
+    query = _query(fields=['steps'], convert_to_local_time=True)
+    assert 'aggregateWindow' not in query and 'union' not in query
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from soxai_data.streaming import FrameStream, _JsonArrayDecoder, _JsonStringDecoder  # noqa: E402
+
+# records with escapes of every kind: surrogate pairs (ensure_ascii), quotes, backslashes, braces in strings
+RECORDS = [
+    {'uid': 'uid1', 'text': '😀 smile', 'value': 1.5},
+    {'uid': 'uid2', 'text': 'quote " backslash \\ brace } bracket ]', 'value': -2.0},
+    {'uid': 'uid3', 'text': 'タブ\tと改行\n🎌', 'value': 3.25},
+    {'uid': 'uid4', 'text': '\\u0041 is not an escape', 'value': 0.0},
+]
+
+
+def _splits(body):
+    # the body cut in two at every position, and in chunks of every size up to 8 characters
+    for cut in range(len(body) + 1):
+        yield [body[:cut], body[cut:]]
+    for size in range(1, 9):
+        yield [body[start:start + size] for start in range(0, len(body), size)]
+
+
+def test_string_decoder_chunk_boundaries():
+    for inner, outer in ((True, True), (False, True), (False, False)):
+        body = json.dumps(json.dumps(RECORDS, ensure_ascii=inner), ensure_ascii=outer)
+        expected = json.loads(body)
+        for chunks in _splits(body):
+            decoder = _JsonStringDecoder()
+            decoded = ''.join(decoder.feed(chunk) for chunk in chunks)
+            decoder.close()
+            assert decoded == expected, chunks
+
+
+def test_surrogate_pair_cut_in_low_surrogate():
+    # the chunk ends inside the escape of the low surrogate following a complete high surrogate
+    body = json.dumps(json.dumps([{'s': '😀'}], ensure_ascii=False))
+    start = body.index('\\ud83d')
+    for cut in range(start, start + 16):
+        decoder = _JsonStringDecoder()
+        decoded = decoder.feed(body[:cut]) + decoder.feed(body[cut:])
+        assert decoded == json.loads(body), cut
+        assert json.loads(decoded) == [{'s': '😀'}]
+
+
+def test_array_decoder_chunk_boundaries():
+    body = json.dumps(RECORDS)
+    for chunks in _splits(body):
+        decoder = _JsonArrayDecoder()
+        records = [record for chunk in chunks for record in decoder.feed(chunk)]
+        decoder.close()
+        assert records == json.loads(body), chunks
+
+
+def test_frame_stream_double_encoded():
+    body = json.dumps(json.dumps(RECORDS))
+    expected = pd.DataFrame(json.loads(json.loads(body)))
+    for chunks in _splits(body):
+        stream = FrameStream(double_encoded=True, chunk_rows=3)
+        frames = [df for chunk in chunks for df in stream.feed(chunk)] + stream.close()
+        assert [len(df) for df in frames] == [3, 1]
+        pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), expected)